@@ -0,0 +1,66 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List
+
+import requests
+import uvicorn
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from api import service
+from app import config, inference
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Load the model when the worker starts instead of on its first request
+    inference.load_artifacts()
+    yield
+
+
+app = FastAPI(title="XRP next-day high prediction service", lifespan=lifespan)
+
+
+class BatchRequest(BaseModel):
+    dates: List[str]
+
+
+@app.exception_handler(service.InvalidRequest)
+async def invalid_request(request, exc):
+    return JSONResponse(status_code=422, content={"detail": str(exc)})
+
+
+@app.exception_handler(requests.RequestException)
+async def market_data_unavailable(request, exc):
+    return JSONResponse(status_code=502, content={"detail": f"Market data unavailable: {exc}"})
+
+
+@app.get("/predict/ripple")
+async def predict_ripple(date: str):
+    """Next-day high for one date, in the hosted service's format; concurrent calls share one model call"""
+    prediction = await asyncio.wrap_future(service.predict_date(date))
+    return {"prediction": prediction}
+
+
+# Plain functions: FastAPI runs them on its thread pool, so a long range does not block the event loop
+@app.get("/predict/ripple/range")
+def predict_ripple_range(start: str = Query(..., description="First date, YYYY-MM-DD"), end: str = Query(..., description="Last date, YYYY-MM-DD")):
+    """Next-day highs for every date from start to end, scored with one model call"""
+    return {"predictions": service.predict_dates(service.date_range(start, end))}
+
+
+@app.post("/predict/ripple/batch")
+def predict_ripple_batch(body: BatchRequest):
+    """Next-day highs for a list of dates, in the same order"""
+    return {"predictions": service.predict_dates(service.check_dates(body.dates))}
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok", **service.stats()}
+
+
+if __name__ == "__main__":
+    # Each worker process loads the model and keeps its own memo; the market store on disk is shared
+    uvicorn.run("api.main:app", host=config.API_HOST, port=config.API_PORT, workers=config.API_WORKERS)
@@ -0,0 +1,206 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from app import cache, config, inference, market_store, rollup, tracing
+
+# Coin and window the model predicts from: 29 days before the date plus the date itself, like the Ripple tab
+COIN_ID = "ripple"
+WINDOW_DAYS_BEFORE = 29
+GRANULARITY = "hourly"
+
+
+class InvalidRequest(ValueError):
+    """A date or range the service cannot predict (answered with 422)"""
+
+
+# Cache lifetime of a date: past days do not change any more, the current day gets new hourly candles
+def date_ttl(date):
+    return 24 * 60 * 60 if date < datetime.now().strftime("%Y-%m-%d") else 60 * 60
+
+
+# Memoized per date in each worker process: the model's input row and the prediction
+_features = cache.get_cache("api_features", maxsize=4096, ttl=date_ttl)
+_predictions = cache.get_cache("api_predictions", maxsize=4096, ttl=date_ttl)
+
+
+def check_dates(dates):
+    """The dates as YYYY-MM-DD strings, raising InvalidRequest for malformed, future or too old ones"""
+    today = datetime.now()
+    for date in dates:
+        try:
+            days_back = (today.date() - datetime.strptime(date, "%Y-%m-%d").date()).days
+        except (TypeError, ValueError):
+            raise InvalidRequest(f"Invalid date {date!r}, expected YYYY-MM-DD")
+        if days_back < 0:
+            raise InvalidRequest(f"{date} is in the future")
+        # Same limit as the Ripple tab's History options: the window must start within the key's history
+        if days_back + WINDOW_DAYS_BEFORE >= config.COINGECKO_HISTORY_DAYS:
+            raise InvalidRequest(f"{date} is beyond the {config.COINGECKO_HISTORY_DAYS} days of history the CoinGecko key allows")
+    if len(dates) > config.API_MAX_DATES:
+        raise InvalidRequest(f"At most {config.API_MAX_DATES} dates per request")
+    return list(dates)
+
+
+def date_range(start, end):
+    """Every date from start to end (inclusive)"""
+    check_dates([start, end])
+    if start > end:
+        raise InvalidRequest(f"start {start} is after end {end}")
+    first = datetime.strptime(start, "%Y-%m-%d")
+    days = (datetime.strptime(end, "%Y-%m-%d") - first).days + 1
+    return check_dates([(first + timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(days)])
+
+
+def feature_rows(dates):
+    """Model input row of each date; the missing ones are built from one refresh of the shared hourly points"""
+    rows = {date: _features.peek(date) for date in dates}
+    missing = sorted(date for date, row in rows.items() if row is None)
+    if missing:
+        with tracing.span("api.features", dates=len(missing)):
+            history = rollup.get_rollup(COIN_ID, GRANULARITY, rollup.TIMEZONE)
+            start_ms, _ = market_store.window_bounds(missing[0], WINDOW_DAYS_BEFORE)
+            _, end_ms = market_store.window_bounds(missing[-1], WINDOW_DAYS_BEFORE)
+            history.refresh(start_ms, end_ms)
+            for date in missing:
+                # Same daily frame as fetch_ripple_data(date), so the prediction matches the dashboard's
+                df_daily = history.bars("1D", *market_store.window_bounds(date, WINDOW_DAYS_BEFORE))
+                if df_daily.empty:
+                    raise InvalidRequest(f"No market data for {date}")
+                rows[date] = inference.build_features(df_daily).tail(1)
+                _features.put(date, rows[date], date_ttl(date))
+    return rows
+
+
+def _payload(date, prediction):
+    predicted_date = (datetime.strptime(date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    return {"date": date, "predicted_date": predicted_date, "prediction": prediction}
+
+
+def predict_dates(dates):
+    """Predictions of the dates, in their order: memoized ones are reused, the others scored with one model call"""
+    results = {date: _predictions.peek(date) for date in dates}
+    missing = sorted(date for date, result in results.items() if result is None)
+    if missing:
+        rows = feature_rows(missing)
+        with tracing.span("api.predict", dates=len(missing)):
+            predictions = inference.load_artifacts()["model"].predict(pd.concat([rows[date] for date in missing]))
+        for date, prediction in zip(missing, predictions):
+            results[date] = _payload(date, float(prediction))
+            _predictions.put(date, results[date], date_ttl(date))
+    return [results[date] for date in dates]
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-date requests and answers them with one predict_dates call.
+
+    A batch starts with the first waiting request and takes every request arriving in the next
+    'window' seconds, up to 'max_size' dates. If the batch fails, its dates are retried one by one
+    so that a bad date only fails its own requests.
+    """
+
+    def __init__(self, fn, window, max_size):
+        self.fn = fn
+        self.window = window
+        self.max_size = max_size
+        self.requests = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.batched_requests = 0
+        self.largest_batch = 0
+
+    def submit(self, date):
+        """Future of one date's prediction"""
+        # Started on first use, so every uvicorn worker process runs its own batching thread
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True, name="micro-batcher")
+                self.thread.start()
+        future = Future()
+        self.requests.put((date, future))
+        return future
+
+    def _collect(self):
+        batch = [self.requests.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _answer(self, dates):
+        """date -> prediction or exception"""
+        try:
+            return dict(zip(dates, self.fn(dates)))
+        except Exception as e:
+            if len(dates) == 1:
+                return {dates[0]: e}
+        results = {}
+        for date in dates:
+            try:
+                results[date] = self.fn([date])[0]
+            except Exception as e:
+                results[date] = e
+        return results
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            dates = list(dict.fromkeys(date for date, _ in batch))
+            with tracing.span("api.batch", requests=len(batch), dates=len(dates)):
+                results = self._answer(dates)
+            with self.lock:
+                self.batches += 1
+                self.batched_requests += len(batch)
+                self.largest_batch = max(self.largest_batch, len(batch))
+            for date, future in batch:
+                result = results[date]
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "batches": self.batches,
+                "requests": self.batched_requests,
+                "largest_batch": self.largest_batch,
+                "mean_batch": round(self.batched_requests / self.batches, 2) if self.batches else None,
+            }
+
+
+batcher = MicroBatcher(predict_dates, config.API_BATCH_WINDOW_MS / 1000, config.API_MAX_BATCH)
+
+
+def predict_date(date):
+    """Future of one date's prediction: answered at once when memoized, otherwise by the next micro-batch"""
+    check_dates([date])
+    state = _predictions.freshness(date)
+    if state is not None and not state[1]:
+        result = _predictions.peek(date)
+        if result is not None:
+            future = Future()
+            future.set_result(result)
+            return future
+    return batcher.submit(date)
+
+
+def stats():
+    """Batching and memo counters of this worker process"""
+    return {
+        "batcher": batcher.stats(),
+        "features": _features.stats(),
+        "predictions": _predictions.stats(),
+    }
@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from app import config, inference, market_store, rollup
+
+# Coin and window the Ripple tab predicts from: 29 days before the date plus the date itself
+COIN_ID = "ripple"
+WINDOW_DAYS_BEFORE = 29
+GRANULARITY = market_store.granularity_for_days(WINDOW_DAYS_BEFORE + 2)
+# Number of dates scored by default (the range of the Ripple tab's date picker)
+BACKTEST_DAYS = 335
+# Consecutive dates scored together as one walk-forward fold
+FOLD_DAYS = 30
+
+# Feature rows and previous highs of every date, built once by run() and shared with each worker process
+_matrix = None
+_previous_highs = None
+
+
+def results_path(coin_id=COIN_ID):
+    return os.path.join(config.BACKTEST_DIR, f"{coin_id}.json")
+
+
+def load_history(dates, coin_id=COIN_ID):
+    """Read the hourly points covering the windows of all dates and the day after the last one"""
+    start_ms, _ = market_store.window_bounds(dates[0], WINDOW_DAYS_BEFORE)
+    _, end_ms = market_store.window_bounds(dates[-1], 0)
+    end_ms += market_store.DAY_MS
+    return market_store.load_range(coin_id, start_ms, end_ms, GRANULARITY)
+
+
+def _build_rollup(points, coin_id=COIN_ID):
+    history = rollup.Rollup(coin_id, GRANULARITY)
+    history.ingest(points)
+    return history
+
+
+def feature_matrix(history, dates):
+    """Model input row of every date (indexed by date) and the high of each date, from one pass over the rollup"""
+    rows, previous_highs = [], []
+    for date in dates:
+        # Daily frame for the date, served by the rollup exactly like fetch_ripple_data serves it
+        df_daily = history.bars("1D", *market_store.window_bounds(date, WINDOW_DAYS_BEFORE))
+        rows.append(inference.build_features(df_daily).tail(1))
+        previous_highs.append(float(df_daily["high"].iloc[-1]))
+    matrix = pd.concat(rows)
+    matrix.index = pd.Index(dates, name="date")
+    return matrix, pd.Series(previous_highs, index=matrix.index)
+
+
+def _init_worker(matrix, previous_highs):
+    """Pool initializer: keep the shared feature rows and load the model once per worker process"""
+    global _matrix, _previous_highs
+    _matrix, _previous_highs = matrix, previous_highs
+    inference.load_artifacts()
+
+
+def _run_fold(dates):
+    """Predict the next-day high for each date of a fold, return (date, prediction, previous high) rows"""
+    predictions = inference.load_artifacts()["model"].predict(_matrix.loc[dates])
+    return [(date, float(p), float(_previous_highs[date])) for date, p in zip(dates, predictions)]
+
+
+def score(predicted, actual, previous):
+    """RMSE, MAPE (%) and hit rate (share of correctly predicted up/down moves of the high)"""
+    predicted, actual, previous = (np.asarray(a, dtype=np.float64) for a in (predicted, actual, previous))
+    error = predicted - actual
+    return {
+        "days": int(len(actual)),
+        "rmse": float(np.sqrt(np.mean(error ** 2))),
+        "mape": float(np.mean(np.abs(error / actual)) * 100),
+        "hit_rate": float(np.mean(np.sign(predicted - previous) == np.sign(actual - previous))),
+    }
+
+
+def run(dates, workers=None, fold_days=FOLD_DAYS, coin_id=COIN_ID):
+    """Walk-forward backtest over the given dates (YYYY-MM-DD, ascending), return the results dict"""
+    points = load_history(dates, coin_id)
+    history = _build_rollup(points, coin_id)
+
+    # Realized highs of every day in the history
+    daily = history.bars("1D", int(points["timestamp"].iloc[0]), int(points["timestamp"].iloc[-1]))
+    realized = dict(zip(daily["timestamp"].dt.strftime("%Y-%m-%d"), daily["high"]))
+
+    # Each date's row only uses its own 30-day window, so folds never see later data; the rows are
+    # built once here and sent to each worker once, and the folds are scored in parallel
+    matrix, previous_highs = feature_matrix(history, dates)
+    folds = [dates[i:i + fold_days] for i in range(0, len(dates), fold_days)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(matrix, previous_highs)) as pool:
+        fold_rows = list(pool.map(_run_fold, folds))
+
+    rows, fold_scores = [], []
+    for fold in fold_rows:
+        scored = []
+        for date, prediction, previous_high in fold:
+            predicted_date = (datetime.strptime(date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+            actual = realized.get(predicted_date)
+            if actual is None or np.isnan(actual):
+                continue
+            scored.append({
+                "date": date,
+                "predicted_date": predicted_date,
+                "prediction": prediction,
+                "actual": float(actual),
+                "previous_high": previous_high,
+            })
+        if scored:
+            fold_scores.append({"start": scored[0]["date"], "end": scored[-1]["date"], **_score_rows(scored)})
+        rows.extend(scored)
+
+    return {
+        "coin": coin_id,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "model_dir": config.MODEL_DIR,
+        "metrics": _score_rows(rows) if rows else None,
+        "folds": fold_scores,
+        "rows": rows,
+    }
+
+
+def _score_rows(rows):
+    return score([r["prediction"] for r in rows], [r["actual"] for r in rows], [r["previous_high"] for r in rows])
+
+
+def save_results(results, coin_id=COIN_ID):
+    """Write the results atomically so the dashboard never reads a half-written file"""
+    path = results_path(coin_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(results, f)
+    os.replace(tmp_path, path)
+
+
+def load_results(coin_id=COIN_ID):
+    """Return the stored backtest results, or None when no backtest has been run"""
+    try:
+        with open(results_path(coin_id)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def default_dates(days=BACKTEST_DAYS):
+    """
+    Dates whose next day is complete: from 'days' days ago up to the day before yesterday, keeping
+    only the dates whose window starts within the key's history limit (like the Ripple tab's History options)
+    """
+    today = datetime.now()
+    offsets = [offset for offset in range(days + 1, 1, -1) if offset + WINDOW_DAYS_BEFORE < config.COINGECKO_HISTORY_DAYS]
+    return [(today - timedelta(days=offset)).strftime("%Y-%m-%d") for offset in offsets]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the next-day high model")
+    parser.add_argument("--days", type=int, default=BACKTEST_DAYS, help="Number of past dates to score")
+    parser.add_argument("--fold-days", type=int, default=FOLD_DAYS, help="Dates per fold")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (defaults to the CPU count)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = run(default_dates(args.days), workers=args.workers, fold_days=args.fold_days)
+    save_results(results)
+
+    for fold in results["folds"]:
+        print(f"{fold['start']} - {fold['end']}  RMSE={fold['rmse']:.4f}  MAPE={fold['mape']:.2f}%  hit rate={fold['hit_rate']:.1%}")
+    metrics = results["metrics"]
+    if metrics is None:
+        print("No dates could be scored")
+        sys.exit(1)
+    print(f"Overall ({metrics['days']} days)  RMSE={metrics['rmse']:.4f}  MAPE={metrics['mape']:.2f}%  hit rate={metrics['hit_rate']:.1%}")
+    print(f"Saved to {results_path()} in {time.perf_counter() - started:.1f}s")
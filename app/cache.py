@@ -0,0 +1,237 @@
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class TTLCache:
+    """Process-wide LRU cache with per-entry TTL, single-flight loading and stale-while-revalidate"""
+
+    # 'ttl' is either a number of seconds or a function of the cached call's arguments;
+    # 'stale' is how long after its TTL an entry is still served while it is refreshed in the background
+    def __init__(self, name, maxsize, ttl, stale=0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale = stale
+        # key -> (monotonic expiry, value, wall-clock time it was loaded)
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.refresh_errors = 0
+
+    # Return the cached value for key, or load it once no matter how many callers ask concurrently
+    def get_or_load(self, key, loader, ttl):
+        with self.lock:
+            entry = self.entries.get(key)
+            now = time.monotonic()
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            future = self.inflight.get(key)
+            # Expired but still within the stale window: answer now, refresh in the background
+            if entry is not None and entry[0] + self.stale > now:
+                self.entries.move_to_end(key)
+                self.stale_hits += 1
+                revalidate = future is None
+                if revalidate:
+                    future = self.inflight[key] = Future()
+            else:
+                revalidate = None
+                leader = future is None
+                if leader:
+                    self.misses += 1
+                    future = Future()
+                    self.inflight[key] = future
+                else:
+                    self.coalesced += 1
+
+        if revalidate is not None:
+            if revalidate:
+                # Imported here: the fetch stage's tracing imports this module
+                from app import fetch_stage
+
+                fetch_stage.submit(self._load, key, loader, ttl, future)
+            return entry[1]
+
+        # Followers wait for the request already in flight
+        if not leader:
+            return future.result()
+        return self._load(key, loader, ttl, future)
+
+    def _load(self, key, loader, ttl, future):
+        """Run the loader for an in-flight key and publish its value (the previous entry is served until then)"""
+        try:
+            value = loader()
+        except BaseException as e:
+            with self.lock:
+                del self.inflight[key]
+                # A failed background refresh keeps serving the previous entry
+                if key in self.entries:
+                    self.refresh_errors += 1
+            future.set_exception(e)
+            raise
+
+        with self.lock:
+            self._store(key, value, ttl)
+            del self.inflight[key]
+        future.set_result(value)
+        return value
+
+    def _store(self, key, value, ttl):
+        # Failed lookups (None) are not kept so they are retried on the next call
+        if value is not None:
+            self.entries[key] = (time.monotonic() + ttl, value, time.time())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def peek(self, key):
+        """The value of key if it is cached and fresh, otherwise None; never loads (for callers loading many keys at once)"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, ttl):
+        """Store a value loaded by the caller, e.g. one of a batch (None is not kept)"""
+        with self.lock:
+            self._store(key, value, ttl)
+
+    def refresh(self, key, loader, ttl):
+        """Load key again now, even if it is fresh; readers keep getting the current entry meanwhile"""
+        with self.lock:
+            future = self.inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self.inflight[key] = Future()
+        if not leader:
+            return future.result()
+        return self._load(key, loader, ttl, future)
+
+    def freshness(self, key):
+        """(wall-clock time the entry was loaded, whether it is past its TTL), None when key is not cached"""
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None:
+            return None
+        return entry[2], entry[0] <= time.monotonic()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "stale": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "refresh_errors": self.refresh_errors,
+                "hit_ratio": round((self.hits + self.stale_hits + self.coalesced) / lookups, 3) if lookups else None,
+            }
+
+
+# Caches live in this module so they survive Streamlit reruns and are shared by all sessions
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name, maxsize, ttl, stale=0):
+    """Return the named cache, creating it on first use"""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = TTLCache(name, maxsize, ttl, stale)
+        return _caches[name]
+
+
+def cached(name, ttl, maxsize=128, stale=0):
+    """
+    Decorator caching a function's results in the named process-wide cache.
+
+    With 'stale' seconds, an expired result is still returned for that long while a background call
+    refreshes it. The wrapper also has refresh(*args) to reload a result now, warm(*args) to load it
+    only when it is missing or expired (True when it loaded one), and freshness(*args) for the
+    "data as of" indicators.
+    """
+    def decorator(fn):
+        cache = get_cache(name, maxsize, ttl, stale)
+        signature = inspect.signature(fn)
+
+        def call(args, kwargs):
+            # Normalise positional/keyword/default arguments into one key
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(bound.arguments.items())
+            entry_ttl = cache.ttl(**bound.arguments) if callable(cache.ttl) else cache.ttl
+            return key, lambda: fn(*args, **kwargs), entry_ttl
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return cache.get_or_load(*call(args, kwargs))
+
+        def refresh(*args, **kwargs):
+            return cache.refresh(*call(args, kwargs))
+
+        def warm(*args, **kwargs):
+            key, loader, entry_ttl = call(args, kwargs)
+            state = cache.freshness(key)
+            if state is not None and not state[1]:
+                return False
+            return cache.refresh(key, loader, entry_ttl) is not None
+
+        def freshness(*args, **kwargs):
+            return cache.freshness(call(args, kwargs)[0])
+
+        wrapper.cache = cache
+        wrapper.refresh = refresh
+        wrapper.warm = warm
+        wrapper.freshness = freshness
+        return wrapper
+    return decorator
+
+
+def clear_all():
+    """Drop every cached entry (counters are kept)"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.clear()
+
+
+def stats():
+    """Return hit/miss/eviction counters of every cache"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.name: cache.stats() for cache in caches}
+
+
+def describe_age(loaded_at):
+    """How long ago a cached result was loaded, for the "data as of" captions"""
+    seconds = max(0, time.time() - loaded_at)
+    if seconds < 60:
+        return "just now"
+    if seconds < 60 * 60:
+        return f"{seconds // 60:.0f} min ago"
+    if seconds < 48 * 60 * 60:
+        return f"{seconds // 3600:.0f} h ago"
+    return f"{seconds // 86400:.0f} days ago"
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from app import config
+
+
+def _as_float(x):
+    """Numeric view of an x axis (datetimes become epoch nanoseconds)"""
+    if isinstance(x, (pd.Series, pd.Index)) and pd.api.types.is_datetime64_any_dtype(x):
+        return np.asarray(x.astype("int64"), dtype=np.float64)
+    return np.asarray(x, dtype=np.float64)
+
+
+def _take(values, idx):
+    """Select positions from a Series/Index (keeping dtype and timezone) or an array"""
+    if isinstance(values, pd.Series):
+        return values.iloc[idx]
+    if isinstance(values, pd.Index):
+        return values[idx]
+    return np.asarray(values)[idx]
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the positions of the n_out points that best preserve the visual shape of a line.
+    The first and last points are always kept.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+    every = (n - 2) / (n_out - 2)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0] = 0
+    idx[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        # Average of the next bucket
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        next_y = y[end:next_end]
+        avg_y = np.nanmean(next_y) if not np.isnan(next_y).all() else y[a]
+
+        # Keep the point forming the largest triangle with the previous pick and the next average
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(np.where(np.isnan(area), -1.0, area)))
+        idx[i + 1] = a
+    return idx
+
+
+def minmax_indices(y, n_buckets):
+    """Positions of the minimum and maximum of each of n_buckets equal buckets, in order"""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_buckets <= 0 or 2 * n_buckets >= n:
+        return np.arange(n)
+
+    bucket = (np.arange(n) * n_buckets) // n
+    order = np.lexsort((y, bucket))
+    last_of_bucket = np.flatnonzero(np.diff(bucket[order]))
+    firsts = np.concatenate(([0], last_of_bucket + 1))
+    lasts = np.concatenate((last_of_bucket, [n - 1]))
+    return np.unique(np.concatenate((order[firsts], order[lasts])))
+
+
+def up_down_colors(open_, close, up="green", down="red"):
+    """Per-bar colour array: 'up' when the period closed at or above its open"""
+    return np.where(np.asarray(close) >= np.asarray(open_), up, down)
+
+
+def line_trace(x, y, budget=None, **kwargs):
+    """Line trace downsampled with LTTB to the point budget, drawn with WebGL when still large"""
+    budget = config.CHART_POINT_BUDGET if budget is None else budget
+    idx = lttb_indices(x, y, budget)
+    trace = go.Scattergl if len(idx) > config.CHART_WEBGL_THRESHOLD else go.Scatter
+    return trace(x=_take(x, idx), y=_take(y, idx), **kwargs)
+
+
+def bar_trace(x, y, budget=None, marker_color=None, **kwargs):
+    """Bar trace reduced to the min/max bar of each bucket so spikes survive downsampling"""
+    budget = config.CHART_POINT_BUDGET if budget is None else budget
+    idx = minmax_indices(y, budget // 2)
+    if marker_color is not None and not isinstance(marker_color, str):
+        marker_color = _take(marker_color, idx)
+    return go.Bar(x=_take(x, idx), y=_take(y, idx), marker_color=marker_color, **kwargs)
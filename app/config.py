@@ -0,0 +1,58 @@
+import os
+
+# Root of the repository (one level above the app folder)
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Folder for locally persisted market data (can be overridden for deployments)
+DATA_DIR = os.environ.get("XRP_DATA_DIR", os.path.join(REPO_ROOT, "data"))
+
+# Coingecko API settings
+COINGECKO_API_BASE = os.environ.get("COINGECKO_API_BASE", "https://api.coingecko.com/api/v3")
+COINGECKO_API_KEY = os.environ.get("COINGECKO_API_KEY", "CG-vwVud1BDECZZ8XoTFsN4RGhJ")
+# Calls per minute allowed by the key (30 for demo keys)
+COINGECKO_RATE_LIMIT = float(os.environ.get("XRP_COINGECKO_RATE_LIMIT", 30))
+# Days of history the key can request (365 for demo keys, raise it for a paid key)
+COINGECKO_HISTORY_DAYS = int(os.environ.get("XRP_COINGECKO_HISTORY_DAYS", 365))
+
+# Model prediction settings
+MODEL_API_URL = os.environ.get("XRP_MODEL_API_URL", "https://fastapi-25548684-at3-latest.onrender.com/predict/ripple")
+# "remote" calls the hosted FastAPI model, "local" loads the exported artifacts into this process
+INFERENCE_MODE = os.environ.get("XRP_INFERENCE_MODE", "remote")
+# Folder holding cleaning_pipeline.pkl, eng_pipeline.pkl, transform_pipeline.pkl and model.joblib
+MODEL_DIR = os.environ.get("XRP_MODEL_DIR", os.path.join(REPO_ROOT, "models", "Ripple"))
+# "auto" loads the portable pipeline.json + model.json when present and the pickles otherwise; "portable" or "pickle" force one
+MODEL_FORMAT = os.environ.get("XRP_MODEL_FORMAT", "auto")
+
+# Prediction service (api/, run with `python -m api.main`): address, uvicorn worker processes,
+# how long (ms) single-date requests are collected into one model call, the largest batch and date range
+API_HOST = os.environ.get("XRP_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("XRP_API_PORT", 8000))
+API_WORKERS = int(os.environ.get("XRP_API_WORKERS", 4))
+API_BATCH_WINDOW_MS = float(os.environ.get("XRP_API_BATCH_WINDOW_MS", 10))
+API_MAX_BATCH = int(os.environ.get("XRP_API_MAX_BATCH", 256))
+# A date's window reaches 29 days further back, so a range cannot hold more dates than the key's history allows
+API_MAX_DATES = min(int(os.environ.get("XRP_API_MAX_DATES", 1100)), COINGECKO_HISTORY_DAYS - 29)
+# Base URL of that service; when set, the Ripple tab charts the predictions of its whole window
+PREDICTION_SERVICE_URL = os.environ.get("XRP_PREDICTION_SERVICE_URL")
+
+# Chart settings: points kept per trace after downsampling and the size from which WebGL is used
+CHART_POINT_BUDGET = int(os.environ.get("XRP_CHART_POINT_BUDGET", 1000))
+CHART_WEBGL_THRESHOLD = int(os.environ.get("XRP_CHART_WEBGL_THRESHOLD", 800))
+
+# Tracing of the rerun stages ("1" to enable); the metrics are written to a file and/or served on a port
+TRACING = os.environ.get("XRP_TRACING", "0") == "1"
+METRICS_FILE = os.environ.get("XRP_METRICS_FILE")
+METRICS_PORT = int(os.environ["XRP_METRICS_PORT"]) if os.environ.get("XRP_METRICS_PORT") else None
+
+# Folder where the walk-forward backtest stores its results for the dashboard
+BACKTEST_DIR = os.environ.get("XRP_BACKTEST_DIR", os.path.join(DATA_DIR, "backtest"))
+
+# Expired responses are still served for this long (seconds) while they are refreshed in the background
+STALE_SECONDS = float(os.environ.get("XRP_STALE_SECONDS", 24 * 60 * 60))
+
+# Background warm-up ("0" to disable): newest candles and the Ripple predictions of the whole date picker
+# are refreshed every N seconds, and again this many seconds after each Australia/Sydney midnight
+WARMUP = os.environ.get("XRP_WARMUP", "1") == "1"
+WARMUP_CANDLES_SECONDS = float(os.environ.get("XRP_WARMUP_CANDLES_SECONDS", 5 * 60))
+WARMUP_PREDICTIONS_SECONDS = float(os.environ.get("XRP_WARMUP_PREDICTIONS_SECONDS", 60 * 60))
+WARMUP_DAY_OFFSET_SECONDS = float(os.environ.get("XRP_WARMUP_DAY_OFFSET_SECONDS", 60))
@@ -0,0 +1,105 @@
+import numpy as np
+
+from app import indicators
+
+# Raw daily columns the model pipelines start from
+RAW_COLUMNS = ["open", "high", "low", "close", "volume", "marketCap"]
+# Columns added by the notebook's eng_pipeline, in the order its steps add them
+ENGINEERED_COLUMNS = ["volatility_bin", "daily_return", "range_ratio", "delta", "rsi", "macd_hist"]
+# Full model feature matrix layout
+FEATURE_COLUMNS = RAW_COLUMNS + ENGINEERED_COLUMNS
+
+# Volatility (high - low) / close bins: low <= 0.02 < medium <= 0.08 < high, encoded 0 / 1 / 2
+VOLATILITY_BIN_EDGES = (0.02, 0.08)
+VOLATILITY_LEVELS = ("low", "medium", "high")
+# Columns log1p-transformed by the notebook's LogWrapper
+LOG_COLUMNS = ["volume", "marketCap"]
+# Columns min-max scaled by the notebook's MinMaxScalerWrapper (everything numeric except the bin)
+SCALED_COLUMNS = [column for column in FEATURE_COLUMNS if column != "volatility_bin"]
+
+# These functions are numpy-only so the model can be served without importing scikit-learn.
+# Every formula mirrors the notebook transformer it replaces, operation for operation.
+
+
+def _ffill(values):
+    """Forward-fill NaNs (pct_change pads missing closes before dividing)"""
+    mask = np.isnan(values)
+    if not mask.any():
+        return values
+    # Index of the last non-missing value so far (leading NaNs point at row 0 and stay NaN)
+    idx = np.where(mask, 0, np.arange(len(values)))
+    np.maximum.accumulate(idx, out=idx)
+    return values[idx]
+
+
+def volatility_bins(high, low, close, edges=VOLATILITY_BIN_EDGES):
+    """Ordinal volatility bin per row (NaN where the volatility is undefined)"""
+    volatility = (high - low) / close
+    low_edge, high_edge = edges
+    bins = np.full(len(volatility), np.nan)
+    bins[(volatility > -np.inf) & (volatility <= low_edge)] = 0.0
+    bins[(volatility > low_edge) & (volatility <= high_edge)] = 1.0
+    bins[volatility > high_edge] = 2.0
+    return bins
+
+
+def engineer(open_, high, low, close, volume, market_cap, log_columns=LOG_COLUMNS, bin_edges=VOLATILITY_BIN_EDGES):
+    """
+    Build the unscaled model feature matrix in one pass over the raw daily columns.
+
+    Returns the (n_rows, len(FEATURE_COLUMNS)) float64 matrix and the boolean mask of rows
+    kept by the notebook (rows without an RSI or daily return are dropped).
+    """
+    columns = {"open": open_, "high": high, "low": low, "close": close, "volume": volume, "marketCap": market_cap}
+    close = np.asarray(close, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    n = len(close)
+
+    matrix = np.empty((n, len(FEATURE_COLUMNS)), dtype=np.float64)
+    for position, name in enumerate(RAW_COLUMNS):
+        values = np.asarray(columns[name], dtype=np.float64)
+        if name in log_columns:
+            # LogWrapper: log1p of the values clipped at zero (NaN kept)
+            values = np.log1p(np.where(values < 0, 0.0, values))
+        matrix[:, position] = values
+
+    # Previous close, as used by diff() and pct_change()
+    filled = _ffill(close)
+    previous_close = np.concatenate(([np.nan], close[:-1]))
+    previous_filled = np.concatenate(([np.nan], filled[:-1]))
+
+    rsi = indicators.RSI(indicators.MODEL_RSI_PERIOD).batch(close)
+    _, _, macd_hist = indicators.MACD(*indicators.MODEL_MACD_SPANS).batch(close)
+
+    base = len(RAW_COLUMNS)
+    matrix[:, base + 0] = volatility_bins(high, low, close, bin_edges)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        matrix[:, base + 1] = filled / previous_filled - 1
+        matrix[:, base + 2] = (close - low) / (high - low + 1e-6)
+    matrix[:, base + 3] = close - previous_close
+    matrix[:, base + 4] = rsi
+    matrix[:, base + 5] = macd_hist
+
+    keep = ~(np.isnan(matrix[:, base + 4]) | np.isnan(matrix[:, base + 1]))
+    return matrix, keep
+
+
+def fit_min_max(values, feature_range=(0, 1)):
+    """Return the (scale, offset) MinMaxScaler would learn from the given columns"""
+    data_min = np.nanmin(values, axis=0)
+    data_range = np.nanmax(values, axis=0) - data_min
+    # Constant columns are left unscaled, as in scikit-learn
+    data_range[data_range < 10 * np.finfo(data_range.dtype).eps] = 1.0
+    scale = (feature_range[1] - feature_range[0]) / data_range
+    offset = feature_range[0] - data_min * scale
+    return scale, offset
+
+
+def apply_min_max(matrix, positions, scale, offset):
+    """Min-max scale the given columns of the matrix in place"""
+    block = matrix[:, positions]
+    block *= scale
+    block += offset
+    matrix[:, positions] = block
+    return matrix
@@ -0,0 +1,20 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from app import tracing
+
+# Shared pool for upstream I/O; the threads spend almost all their time waiting on the network
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="fetch")
+
+
+def submit(fn, *args, **kwargs):
+    """Start fn in the background and return its future"""
+    # Spans opened by fn belong to the rerun that submitted it
+    return _executor.submit(tracing.propagate(fn), *args, **kwargs)
+
+
+def resolve(future):
+    """Wait for a future and return (result, error) so a failure only degrades its own panel"""
+    try:
+        return future.result(), None
+    except Exception as e:
+        return None, e
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+# Frames handed to sessions are views of process-wide arrays: they are never copied per session,
+# and the arrays are read-only so that a session writing into one raises instead of changing
+# what every other session sees. Columns are added to a frame without touching the shared ones.
+
+
+def readonly(values, dtype=None):
+    """The values as an array that can no longer be written to (no copy when the dtype already matches)"""
+    values = np.asarray(values, dtype=dtype)
+    values.setflags(write=False)
+    return values
+
+
+def compact(values):
+    """Derived values (indicators, ratios) as read-only float32: half the memory, ~7 significant digits"""
+    return readonly(np.asarray(values, dtype=np.float32))
+
+
+def column_values(df, name):
+    """A column's values without a copy: a NumPy array, or a pandas array for tz-aware timestamps"""
+    values = df[name].array
+    return values.to_numpy() if isinstance(values, pd.arrays.NumpyExtensionArray) else values
+
+
+def view(columns, index=None):
+    """Frame over read-only arrays without copying them; pandas keeps every column as its own block"""
+    return pd.DataFrame(
+        {name: values if isinstance(values, pd.api.extensions.ExtensionArray) else readonly(values) for name, values in columns.items()},
+        index=index,
+        copy=False,
+    )
+
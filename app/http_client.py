@@ -0,0 +1,154 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app import config, tracing
+
+logger = logging.getLogger(__name__)
+
+# Per-endpoint settings: (connect, read) timeout in seconds and number of retries
+ENDPOINTS = {
+    "coingecko": {"timeout": (3.05, 15), "retries": 3},
+    # The model service cold-starts slowly on Render, so it gets a longer read timeout
+    "model": {"timeout": (3.05, 45), "retries": 1},
+    # A window's first request may fetch and score years of dates on the prediction service
+    "prediction_service": {"timeout": (3.05, 120), "retries": 1},
+}
+DEFAULT_ENDPOINT = {"timeout": (3.05, 30), "retries": 2}
+
+# Responses worth retrying: rate limited or upstream failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+
+# Number of recent calls kept per endpoint for the latency summary
+LATENCY_WINDOW = 1000
+
+
+class TokenBucket:
+    """Thread-safe token bucket used to stay under an upstream request quota"""
+
+    # Refill 'rate' tokens per second up to 'capacity' tokens
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    # Block until a token is available and take it
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# Coingecko demo keys allow 30 calls per minute
+_limiters = {"coingecko": TokenBucket(rate=config.COINGECKO_RATE_LIMIT / 60, capacity=10)}
+
+_session = None
+_session_lock = threading.Lock()
+
+_latencies = {}
+_latencies_lock = threading.Lock()
+
+
+def _get_session():
+    """Return the process-wide session that keeps connections alive between reruns"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=32)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _backoff(attempt):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def _retry_delay(response, attempt):
+    """Honour a numeric Retry-After header, otherwise fall back to jittered backoff"""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is not None and retry_after.isdigit():
+        return min(BACKOFF_CAP, float(retry_after))
+    return _backoff(attempt)
+
+
+def _record(endpoint, url, status, elapsed, size=None):
+    tracing.record_upstream(endpoint, status, elapsed, size)
+    with _latencies_lock:
+        _latencies.setdefault(endpoint, deque(maxlen=LATENCY_WINDOW)).append(elapsed)
+    logger.info("%s GET %s -> %s in %.0f ms", endpoint, url, status, elapsed * 1000)
+
+
+def get(endpoint, url, params=None, headers=None):
+    """
+    Send a GET request through the shared session.
+
+    Applies the endpoint timeout, the client-side rate limit and retries connection errors,
+    timeouts and 429/5xx responses with jittered backoff. The last response is returned
+    so callers can keep checking the status code themselves.
+    """
+    settings = ENDPOINTS.get(endpoint, DEFAULT_ENDPOINT)
+    limiter = _limiters.get(endpoint)
+    session = _get_session()
+
+    for attempt in range(settings["retries"] + 1):
+        if limiter is not None:
+            limiter.acquire()
+
+        start = time.perf_counter()
+        with tracing.span(f"http.{endpoint}", attempt=attempt) as call:
+            try:
+                response = session.get(url, params=params, headers=headers, timeout=settings["timeout"])
+            except (requests.ConnectionError, requests.Timeout) as e:
+                _record(endpoint, url, type(e).__name__, time.perf_counter() - start)
+                if attempt == settings["retries"]:
+                    raise
+                call.set(status=type(e).__name__)
+                time.sleep(_backoff(attempt))
+                continue
+            call.set(status=response.status_code, bytes=len(response.content))
+
+        _record(endpoint, url, response.status_code, time.perf_counter() - start, len(response.content))
+        if response.status_code in RETRY_STATUSES and attempt < settings["retries"]:
+            time.sleep(_retry_delay(response, attempt))
+            continue
+        return response
+
+
+def latency_summary():
+    """Return call count and p50/p95/p99/max latency (ms) of the recent calls per endpoint"""
+    with _latencies_lock:
+        samples = {endpoint: sorted(values) for endpoint, values in _latencies.items()}
+
+    summary = {}
+    for endpoint, values in samples.items():
+        if not values:
+            continue
+        pick = lambda q: values[min(len(values) - 1, int(q * len(values)))] * 1000
+        summary[endpoint] = {
+            "count": len(values),
+            "p50_ms": round(pick(0.50), 1),
+            "p95_ms": round(pick(0.95), 1),
+            "p99_ms": round(pick(0.99), 1),
+            "max_ms": round(values[-1] * 1000, 1),
+        }
+    return summary
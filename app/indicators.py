@@ -0,0 +1,250 @@
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# Indicator settings shown on the dashboard
+DASHBOARD_RSI_PERIOD = 14
+DASHBOARD_MACD_SPANS = (12, 26, 9)
+
+# Indicator settings used as model features in the experiment notebook
+MODEL_RSI_PERIOD = 7
+MODEL_MACD_SPANS = (6, 13, 5)
+
+# The classes below keep the running state of an indicator so that a new candle can be added in O(1).
+# Each recurrence is evaluated with exactly the same floating point operations, in the same order,
+# as pandas' rolling().mean() and ewm(adjust=False).mean(), so the results are bit-for-bit equal.
+# A batch on a fresh indicator is computed by pandas itself (vectorised), and the running state is
+# taken from its result so that update() can continue from there. Below this many values the
+# per-value recurrences are faster than pandas' call overhead.
+PANDAS_BATCH_MIN = 128
+
+
+def _prep(values):
+    """Convert to float64 and turn +/-inf into NaN like pandas does before windowed aggregations"""
+    values = np.asarray(values, dtype=np.float64)
+    inf = np.isinf(values)
+    if inf.any():
+        values = np.where(inf, np.nan, values)
+    return values
+
+
+class RollingMean:
+    """Fixed-window rolling mean with pandas' compensated (Kahan) running sum"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.seen = 0
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.neg_ct = 0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.num_consecutive_same_value = 0
+        self.prev_value = math.nan
+        # Values of the batches computed by pandas, not yet folded into the running state
+        self.pending = None
+
+    def _replay(self):
+        """Build the running state from the batched values (on the first update() after a batch)"""
+        pending, self.pending = self.pending, None
+        for value in pending.tolist():
+            self.update(value)
+
+    def _add(self, val):
+        if val == val:
+            self.nobs += 1
+            y = val - self.compensation_add
+            t = self.sum_x + y
+            self.compensation_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct += 1
+            # Count repeated values so a constant window returns that value exactly
+            if val == self.prev_value:
+                self.num_consecutive_same_value += 1
+            else:
+                self.num_consecutive_same_value = 1
+            self.prev_value = val
+
+    def _remove(self, val):
+        if val == val:
+            self.nobs -= 1
+            y = -val - self.compensation_remove
+            t = self.sum_x + y
+            self.compensation_remove = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct -= 1
+
+    # Add one value and return the mean of the current window
+    def update(self, value):
+        if self.pending is not None:
+            # pandas carries the compensated sum from the first value, so only a replay gives the exact state
+            self._replay()
+        value = float(value)
+        if math.isinf(value):
+            value = math.nan
+
+        if self.seen == 0 or self.window == 1:
+            # First window (or a window that shares nothing with the previous one) starts from scratch
+            self.nobs = 0
+            self.sum_x = 0.0
+            self.neg_ct = 0
+            self.compensation_add = 0.0
+            self.compensation_remove = 0.0
+            self.num_consecutive_same_value = 0
+            self.prev_value = value
+            self.values.clear()
+        elif len(self.values) == self.window:
+            self._remove(self.values.popleft())
+
+        self._add(value)
+        self.values.append(value)
+        self.seen += 1
+
+        if self.nobs >= self.window and self.nobs > 0:
+            result = self.sum_x / self.nobs
+            if self.num_consecutive_same_value >= self.nobs:
+                result = self.prev_value
+            elif self.neg_ct == 0 and result < 0:
+                result = 0.0
+            elif self.neg_ct == self.nobs and result > 0:
+                result = 0.0
+            return result
+        return math.nan
+
+    # Add many values at once and return the rolling means as an array
+    def batch(self, values):
+        values = _prep(values)
+        if len(values) == 0:
+            return values
+        if self.seen == 0 and (self.pending is not None or len(values) >= PANDAS_BATCH_MIN):
+            # No running state yet: pandas computes the whole series, the state is built only if update() follows
+            history = values if self.pending is None else np.concatenate((self.pending, values))
+            self.pending = history
+            return pd.Series(history).rolling(self.window).mean().to_numpy()[-len(values):]
+        return np.fromiter((self.update(v) for v in values.tolist()), dtype=np.float64, count=len(values))
+
+
+class EMA:
+    """Exponential moving average matching pandas' ewm(span=..., adjust=False).mean()"""
+
+    def __init__(self, span):
+        self.span = span
+        com = (span - 1) / 2.0
+        self.alpha = 1.0 / (1.0 + com)
+        self.old_wt_factor = 1.0 - self.alpha
+        self.new_wt = self.alpha
+        self.weighted = None
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    # Add one value and return the current average
+    def update(self, value):
+        cur = float(value)
+        if math.isinf(cur):
+            cur = math.nan
+        is_observation = cur == cur
+
+        if self.weighted is None:
+            self.weighted = cur
+            self.nobs = int(is_observation)
+        else:
+            self.nobs += is_observation
+            if self.weighted == self.weighted:
+                self.old_wt *= self.old_wt_factor
+                if is_observation:
+                    # pandas skips the update on an unchanged value to avoid rounding drift
+                    if self.weighted != cur:
+                        self.weighted = self.old_wt * self.weighted + self.new_wt * cur
+                        self.weighted /= (self.old_wt + self.new_wt)
+                    self.old_wt = 1.0
+            elif is_observation:
+                self.weighted = cur
+
+        return self.weighted if self.nobs >= 1 else math.nan
+
+    # Add many values at once and return the averages as an array
+    def batch(self, values):
+        values = _prep(values)
+        if len(values) == 0:
+            return values
+        if self.weighted is not None or len(values) < PANDAS_BATCH_MIN:
+            return np.fromiter((self.update(v) for v in values.tolist()), dtype=np.float64, count=len(values))
+
+        # No running state yet: pandas computes the series and the state is read from its end
+        result = pd.Series(values).ewm(span=self.span, adjust=False).mean().to_numpy()
+        observed = np.flatnonzero(~np.isnan(values))
+        self.nobs = len(observed)
+        if self.nobs == 0:
+            self.weighted = float(values[0])
+            return result
+        self.weighted = float(result[-1])
+        # The weight of the average decays once per missing value after the last observation
+        self.old_wt = 1.0
+        for _ in range(len(values) - 1 - int(observed[-1])):
+            self.old_wt *= self.old_wt_factor
+        return result
+
+
+class RSI:
+    """Relative Strength Index over simple rolling means of gains and losses"""
+
+    def __init__(self, period=DASHBOARD_RSI_PERIOD):
+        self.period = period
+        self.gains = RollingMean(period)
+        self.losses = RollingMean(period)
+        self.prev_close = math.nan
+
+    # Add one closing price and return the RSI
+    def update(self, close):
+        close = float(close)
+        delta = close - self.prev_close
+        self.prev_close = close
+        gain = delta if delta > 0 else 0.0
+        loss = -(delta if delta < 0 else 0.0)
+        avg_gain = np.float64(self.gains.update(gain))
+        avg_loss = np.float64(self.losses.update(loss))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = avg_gain / avg_loss
+            return float(100 - (100 / (1 + rs)))
+
+    # Add many closing prices at once and return the RSI values as an array
+    def batch(self, closes):
+        closes = np.asarray(closes, dtype=np.float64)
+        if len(closes) == 0:
+            return np.empty(0, dtype=np.float64)
+        previous = np.concatenate(([self.prev_close], closes[:-1]))
+        self.prev_close = float(closes[-1])
+        delta = closes - previous
+        gains = np.where(delta > 0, delta, 0.0)
+        losses = -np.where(delta < 0, delta, 0.0)
+        avg_gain = self.gains.batch(gains)
+        avg_loss = self.losses.batch(losses)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = avg_gain / avg_loss
+            return 100 - (100 / (1 + rs))
+
+
+class MACD:
+    """MACD line, signal line and histogram from fast/slow/signal EMAs"""
+
+    def __init__(self, fast=DASHBOARD_MACD_SPANS[0], slow=DASHBOARD_MACD_SPANS[1], signal=DASHBOARD_MACD_SPANS[2]):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    # Add one closing price and return (macd, signal, histogram)
+    def update(self, close):
+        macd = self.fast.update(close) - self.slow.update(close)
+        signal_line = self.signal.update(macd)
+        return macd, signal_line, macd - signal_line
+
+    # Add many closing prices at once and return (macd, signal, histogram) arrays
+    def batch(self, closes):
+        macd = self.fast.batch(closes) - self.slow.batch(closes)
+        signal_line = self.signal.batch(macd)
+        return macd, signal_line, macd - signal_line
@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from app import config, http_client, portable
+
+# Raw daily columns the notebook pipelines were fitted on
+FEATURE_COLUMNS = ["open", "high", "low", "close", "volume", "marketCap"]
+
+_artifacts = None
+_artifacts_lock = threading.Lock()
+
+
+def load_pickled_artifacts(model_dir=None):
+    """Load the cloudpickled pipelines and the joblib XGBoost model exported by the notebook"""
+    model_dir = model_dir or config.MODEL_DIR
+    # Only needed for the pickled artifacts, so they are imported here and the portable files load without them
+    try:
+        import cloudpickle
+        import joblib
+    except ImportError as e:
+        raise ImportError("Pickled artifacts need scikit-learn, xgboost and cloudpickle installed") from e
+
+    artifacts = {}
+    for name in ("cleaning_pipeline", "eng_pipeline", "transform_pipeline"):
+        with open(os.path.join(model_dir, f"{name}.pkl"), "rb") as f:
+            artifacts[name] = cloudpickle.load(f)
+    artifacts["model"] = joblib.load(os.path.join(model_dir, "model.joblib"))
+
+    # Engineering and transform steps run as one fused pass with the pipelines' fitted parameters
+    from app.transformers import FusedFeatureBuilder
+    artifacts["features"] = FusedFeatureBuilder.from_pipelines(
+        artifacts["eng_pipeline"], artifacts["transform_pipeline"]
+    )
+    return artifacts
+
+
+def load_artifacts():
+    """
+    Load the model artifacts once per process.
+
+    The portable files (pipeline.json + model.json, see app/portable.py) are preferred when they exist:
+    they load without scikit-learn, xgboost or unpickling. XRP_MODEL_FORMAT forces one format.
+    """
+    global _artifacts
+    with _artifacts_lock:
+        if _artifacts is None:
+            use_portable = config.MODEL_FORMAT == "portable" or (
+                config.MODEL_FORMAT == "auto" and portable.exists(config.MODEL_DIR)
+            )
+            _artifacts = portable.load(config.MODEL_DIR) if use_portable else load_pickled_artifacts()
+        return _artifacts
+
+
+def _run_pipeline(pipeline, X):
+    """Apply the steps of a fitted pipeline one by one"""
+    # The stateless notebook transformers have no fitted attributes, which newer
+    # scikit-learn versions reject when Pipeline.transform checks the pipeline is fitted
+    for _, step in pipeline.steps:
+        X = step.transform(X)
+    return X
+
+
+def build_features(df_daily, artifacts=None):
+    """Run the notebook's cleaning pipeline and the fused feature builder on a daily OHLCV frame"""
+    artifacts = artifacts or load_artifacts()
+    if "pipeline" in artifacts:
+        # Portable artifacts: cleaning, features and the model's column order in one NumPy pass
+        return artifacts["pipeline"].transform(df_daily)
+
+    X = df_daily[FEATURE_COLUMNS]
+    X = _run_pipeline(artifacts["cleaning_pipeline"], X)
+    X = artifacts["features"].transform(X)
+
+    # Keep the column order the model was trained with
+    feature_names = getattr(artifacts["model"], "feature_names_in_", None)
+    if feature_names is not None:
+        X = X[list(feature_names)]
+    return X
+
+
+def predict(date, df_daily):
+    """Predict the next-day high for 'date' from the daily frame ending on that date"""
+    X = build_features(df_daily)
+    prediction = float(load_artifacts()["model"].predict(X.tail(1))[0])
+    predicted_date = (datetime.strptime(date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    return {"predicted_date": predicted_date, "prediction": prediction}
+
+
+def matches(local, remote, tolerance=1e-6):
+    """Whether a local prediction is within the relative tolerance of the hosted one"""
+    return remote is not None and abs(local - remote) <= tolerance * max(1.0, abs(remote))
+
+
+def _remote_prediction(body):
+    return body["prediction"]["prediction"]
+
+
+def compare_with_remote(dates, tolerance=1e-6):
+    """Predict each date locally and with the hosted model, return (date, local, remote, matches) rows"""
+    # The daily frame is built exactly like the Ripple tab builds it
+    from students.ripple_25548684 import fetch_ripple_data
+
+    rows = []
+    for date in dates:
+        local = predict(date, fetch_ripple_data(date, days_before=29))["prediction"]
+        response = http_client.get("model", config.MODEL_API_URL, params={"date": date})
+        remote = _remote_prediction(response.json()) if response.status_code == 200 else None
+        rows.append((date, local, remote, matches(local, remote, tolerance)))
+    return rows
+
+
+def record_remote(dates, path):
+    """Save the daily candles and the hosted model's response of each date as a parity fixture"""
+    from students.ripple_25548684 import fetch_ripple_data
+
+    recordings = []
+    for date in dates:
+        df_daily = fetch_ripple_data(date, days_before=29)
+        response = http_client.get("model", config.MODEL_API_URL, params={"date": date})
+        response.raise_for_status()
+        candles = {column: df_daily[column].tolist() for column in FEATURE_COLUMNS}
+        candles["timestamp"] = [timestamp.isoformat() for timestamp in df_daily["timestamp"]]
+        recordings.append({"date": date, "candles": candles, "response": response.json()})
+
+    with open(path, "w") as f:
+        json.dump({"model_api_url": config.MODEL_API_URL, "recordings": recordings}, f, indent=1)
+
+
+def load_recording(path):
+    """(date, daily frame, hosted prediction) of each date saved by record_remote"""
+    with open(path) as f:
+        recordings = json.load(f)["recordings"]
+    rows = []
+    for recording in recordings:
+        df_daily = pd.DataFrame(recording["candles"])
+        df_daily["timestamp"] = pd.to_datetime(df_daily["timestamp"], utc=True)
+        rows.append((recording["date"], df_daily, _remote_prediction(recording["response"])))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that local inference matches the hosted model")
+    parser.add_argument("dates", nargs="*", help="Dates (YYYY-MM-DD) to compare, defaults to the last 7 full days")
+    parser.add_argument("--tolerance", type=float, default=1e-6, help="Allowed relative difference")
+    parser.add_argument("--record", metavar="PATH", help="Save the candles and hosted responses of the dates to PATH instead of comparing")
+    args = parser.parse_args()
+
+    today = datetime.now()
+    dates = args.dates or [(today - timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(7, 0, -1)]
+    if args.record:
+        record_remote(dates, args.record)
+        print(f"Recorded {len(dates)} dates to {args.record}")
+        sys.exit(0)
+    rows = compare_with_remote(dates, args.tolerance)
+    for date, local, remote, matches in rows:
+        print(f"{date}  local={local:.6f}  remote={remote}  {'OK' if matches else 'MISMATCH'}")
+    sys.exit(0 if all(matches for *_, matches in rows) else 1)
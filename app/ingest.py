@@ -0,0 +1,173 @@
+import argparse
+import itertools
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.json as pa_json
+
+try:
+    import orjson
+except ImportError:  # optional: the standard library decoder is used without it
+    orjson = None
+
+# Series of a market_chart payload and the column each one becomes
+SERIES = {"prices": "price", "total_volumes": "volume", "market_caps": "market_cap"}
+COLUMNS = ["timestamp", "price", "volume", "market_cap"]
+
+
+def loads(raw):
+    """Decode a JSON body (bytes or str), with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _pairs(values):
+    """[[timestamp, value], ...] as an (n, 2) float64 array"""
+    try:
+        flat = np.fromiter(itertools.chain.from_iterable(values), dtype=np.float64, count=2 * len(values))
+    except TypeError:
+        # A null value somewhere: the slower conversion turns it into NaN
+        flat = np.array(values, dtype=np.float64)
+    return flat.reshape(-1, 2)
+
+
+def _arrow_pairs(raw, memory_pool=None):
+    """
+    Decode the three series of a raw market_chart body with Arrow's JSON reader.
+
+    The numbers go straight into Arrow buffers without creating a Python object per value.
+    Returns None when the body does not have the expected shape, so the caller can fall back.
+    """
+    try:
+        table = pa_json.read_json(
+            pa.BufferReader(raw),
+            # One block for the whole body: a market_chart payload is a single JSON object
+            read_options=pa_json.ReadOptions(block_size=max(len(raw) + 1, 1 << 16)),
+            memory_pool=memory_pool,
+        )
+        pairs = []
+        for key in SERIES:
+            series = table.column(key).combine_chunks()
+            # Expect list<list<number>>; empty or odd shaped series go through the fallback
+            if not (pa.types.is_list(series.type) and pa.types.is_list(series.type.value_type)):
+                return None
+            values = series.flatten().flatten()
+            if not (pa.types.is_floating(values.type) or pa.types.is_integer(values.type)) or len(values) % 2:
+                return None
+            pairs.append(values.to_numpy(zero_copy_only=False).astype(np.float64, copy=False).reshape(-1, 2))
+        return pairs
+    except (pa.ArrowInvalid, KeyError):
+        return None
+
+
+def _frame(pairs):
+    """One frame from the three series, joining them only when their timestamps differ"""
+    timestamps = pairs[0][:, 0]
+    aligned = all(len(p) == len(timestamps) and np.array_equal(p[:, 0], timestamps) for p in pairs[1:])
+    if not aligned:
+        return _join(pairs)
+
+    columns = {"timestamp": timestamps.astype(np.int64)}
+    columns.update((column, np.ascontiguousarray(p[:, 1])) for column, p in zip(SERIES.values(), pairs))
+    return pd.DataFrame(columns, copy=False)
+
+
+def _join(pairs):
+    """Inner join of series whose timestamps do not line up"""
+    frames = [
+        pd.DataFrame({"timestamp": p[:, 0].astype(np.int64), column: p[:, 1]})
+        for column, p in zip(SERIES.values(), pairs)
+    ]
+    df = frames[0].merge(frames[1], on="timestamp").merge(frames[2], on="timestamp")
+    return df[COLUMNS]
+
+
+def parse_market_chart(data):
+    """
+    Turn a decoded market_chart payload into one frame of timestamp/price/volume/market_cap points.
+
+    Coingecko returns the three series on the same timestamps, so they are used as columns directly.
+    Only if the timestamps differ are the series inner-joined on the timestamp, as before.
+    The frame has an int64 epoch-ms 'timestamp' column and float64 values.
+    """
+    return _frame([_pairs(data.get(key, [])) for key in SERIES])
+
+
+def parse_market_chart_bytes(raw, memory_pool=None):
+    """Same frame as parse_market_chart, decoded from the raw body without building Python lists"""
+    pairs = _arrow_pairs(raw, memory_pool)
+    if pairs is None:
+        return parse_market_chart(loads(raw))
+    return _frame(pairs)
+
+
+def parse_response(response):
+    """Decode a market_chart HTTP response body straight into the points frame"""
+    return parse_market_chart_bytes(response.content)
+
+
+def merge_frames(data):
+    """The previous parser (three DataFrames and two merges), kept as the reference for compare()"""
+    prices = pd.DataFrame(data.get("prices", []), columns=["timestamp", "price"])
+    volumes = pd.DataFrame(data.get("total_volumes", []), columns=["timestamp", "volume"])
+    market_caps = pd.DataFrame(data.get("market_caps", []), columns=["timestamp", "market_cap"])
+    df = prices.merge(volumes, on="timestamp").merge(market_caps, on="timestamp")
+    df["timestamp"] = df["timestamp"].astype("int64")
+    return df
+
+
+def _profile(fn, raw, repeat):
+    """Fastest of 'repeat' calls in ms and the peak memory of one call in bytes (Python heap plus Arrow pool)"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(raw, None)
+        times.append((time.perf_counter() - start) * 1000)
+    pool = pa.proxy_memory_pool(pa.default_memory_pool())
+    tracemalloc.start()
+    result = fn(raw, pool)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, min(times), peak + pool.max_memory()
+
+
+def compare(raw, repeat=20):
+    """
+    Ingest a raw payload with the previous path (json + three frames + two merges) and the new one.
+
+    Returns whether both frames are identical, then (ms, peak bytes) of the previous and of the new path.
+    """
+    old, old_ms, old_peak = _profile(lambda body, pool: merge_frames(json.loads(body)), raw, repeat)
+    new, new_ms, new_peak = _profile(parse_market_chart_bytes, raw, repeat)
+    equal = old.dtypes.equals(new.dtypes) and old.equals(new)
+    return equal, (old_ms, old_peak), (new_ms, new_peak)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the market_chart ingestion with the previous merge-based parser")
+    parser.add_argument("payload", nargs="?", help="Saved market_chart JSON (defaults to 365 days of hourly stub points)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.payload:
+        with open(args.payload, "rb") as f:
+            raw = f.read()
+    else:
+        from benchmarks import stub
+
+        end_ms = int(time.time() * 1000)
+        raw = json.dumps(stub.market_chart("ripple", end_ms - 365 * stub.DAY_MS, end_ms, "hourly")).encode()
+
+    # Warm up lazy imports and allocator pools so they are not counted in the first measurement
+    compare(raw, 1)
+    equal, (old_ms, old_peak), (new_ms, new_peak) = compare(raw, args.repeat)
+    print(f"Payload {len(raw) / 1e6:.2f} MB")
+    print(f"merge:  {old_ms:7.2f} ms  peak {old_peak / 1e6:5.2f} MB")
+    print(f"ingest: {new_ms:7.2f} ms  peak {new_peak / 1e6:5.2f} MB  "
+          f"(x{old_ms / new_ms:.1f} faster, x{old_peak / new_peak:.1f} less memory)")
+    print("Identical frames" if equal else "Frames differ")
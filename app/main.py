@@ -1,6 +1,5 @@
 import streamlit as st
 import pandas as pd
-import requests
 
 import plotly.graph_objects as go
 import plotly.express as px
@@ -10,6 +9,8 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 # Import student modules
 from students import ripple_25548684
+# Local market data store, response cache and shared HTTP client
+from app import cache, charts, config, fetch_stage, http_client, market_store, markets, rollup, scheduler, tracing
 
 # Page configuration
 st.set_page_config(
@@ -22,31 +23,87 @@ st.set_page_config(
 # Cryptocurrency options
 CRYPTOS = {
     'Ripple': 'XRP',
+    'Bitcoin': 'BTC',
+    'Ethereum': 'ETH',
+    'Solana': 'SOL',
+    'BNB': 'BNB',
+    'Cardano': 'ADA',
+    'Dogecoin': 'DOGE',
+    'Tron': 'TRX',
+    'Chainlink': 'LINK',
+    'Polkadot': 'DOT',
+    'Litecoin': 'LTC',
+    'Avalanche': 'AVAX',
 }
 
-def fetch_coingecko_data(coin_id, days=30):
-    """Fetch market data from CoinGecko API"""
-    try:
-        url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"       
-        headers = {"x-cg-demo-api-key": "CG-vwVud1BDECZZ8XoTFsN4RGhJ"}
-        params = {'vs_currency': 'usd', 'days': days}
-        response = requests.get(url, params=params, headers=headers)
-        if response.status_code == 200:
-            data = response.json()
-            prices = pd.DataFrame(data['prices'], columns=['timestamp', 'price'])
-            volumes = pd.DataFrame(data['total_volumes'], columns=['timestamp', 'volume'])
-            market_caps = pd.DataFrame(data['market_caps'], columns=['timestamp', 'market_cap'])
-            
-            prices['timestamp'] = pd.to_datetime(prices['timestamp'], unit='ms')
-            volumes['timestamp'] = pd.to_datetime(volumes['timestamp'], unit='ms')
-            market_caps['timestamp'] = pd.to_datetime(market_caps['timestamp'], unit='ms')
+# Coingecko ids that are not simply the lower-cased name
+COINGECKO_IDS = {
+    'BNB': 'binancecoin',
+    'Avalanche': 'avalanche-2',
+}
 
-            df = prices.merge(volumes, on='timestamp').merge(market_caps, on='timestamp')
-            return df
-    except Exception as e:
-        st.error(f"Error fetching CoinGecko data: {e}")
-        return None
+# Sections of the page, selected with a navigation bar instead of st.tabs so that only the active one runs
+TABS = ["📊 Overview", "🪙 RIPPLE"]
+# Widgets drawn by only one section: Streamlit drops the state of widgets that are not drawn in a run,
+# so their values are written back on every run to survive a visit to the other section
+SECTION_WIDGET_KEYS = ["compare_coins", ripple_25548684.DATE_KEY, ripple_25548684.HISTORY_KEY, ripple_25548684.INDICATOR_KEY]
+
+# Coins shown in the comparison grid until the user picks others
+DEFAULT_COMPARISON = ['Ripple', 'Bitcoin', 'Ethereum', 'Solana', 'Cardano', 'Dogecoin']
+# Days of data shown until the user moves the slider
+DEFAULT_DAYS = 30
+
+def coingecko_id_for(token):
+    return COINGECKO_IDS.get(token, token.lower())
+
+def warm_latest_candles():
+    """Warm-up job: load the newest candles of the default pages if they are missing or expired"""
+    coingecko_id = coingecko_id_for(list(CRYPTOS)[0])
+    compare_ids = [coingecko_id_for(token) for token in DEFAULT_COMPARISON]
+    # Same arguments as the Overview uses, so the job fills exactly the entries a first visitor reads
+    markets.fetch_markets.warm(tuple(dict.fromkeys([coingecko_id] + compare_ids)))
+    refreshed = sum(markets.fetch_history.warm(coin_id, DEFAULT_DAYS) for coin_id in dict.fromkeys([coingecko_id] + compare_ids))
+    return f"{refreshed} histories refreshed, {ripple_25548684.warm_latest()}"
+
+def warmup_jobs():
+    return [
+        scheduler.Job("candles", config.WARMUP_CANDLES_SECONDS, warm_latest_candles),
+        scheduler.Job("predictions", config.WARMUP_PREDICTIONS_SECONDS, ripple_25548684.warm_predictions),
+    ]
+
+@tracing.traced("fetch_coingecko_data")
+def fetch_coingecko_data(coin_id, days=30):
+    """Fetch market data from CoinGecko API (runs on the fetch stage, errors are raised to the caller)"""
+    return markets.fetch_history(coin_id, days)
+
+def trace_panel():
+    """Waterfall of the spans of the previous rerun, with the upstream calls made in background threads"""
+    with st.expander("🐞 Rerun Trace", expanded=True):
+        traces = tracing.recent_traces()
+        if not traces:
+            st.caption("Tracing is off (set XRP_TRACING=1)" if not tracing.enabled() else "No finished rerun yet")
+            return
+
+        spans = pd.DataFrame(traces[-1].waterfall())
+        fig_trace = go.Figure(go.Bar(
+            x=spans["duration_ms"],
+            base=spans["start_ms"],
+            y=spans["name"] + " #" + spans["id"].astype(str),
+            orientation='h',
+            customdata=spans["thread"],
+            hovertemplate="%{y}<br>start %{base:.1f} ms, %{x:.1f} ms<br>%{customdata}<extra></extra>"
+        ))
+        fig_trace.update_layout(
+            xaxis_title="ms since rerun start",
+            yaxis=dict(autorange="reversed"),
+            template='plotly_dark',
+            height=max(250, 22 * len(spans)),
+            margin=dict(l=0, r=0, t=10, b=0)
+        )
+        st.plotly_chart(fig_trace, use_container_width=True)
+        st.dataframe(spans.drop(columns=["id", "parent"]).round(1), hide_index=True, use_container_width=True)
 
+@tracing.traced("main")
 def main():
     # Main Header
     st.markdown('<h1 class="main-header">📈 Cryptocurrency Investment Dashboard</h1>', unsafe_allow_html=True)
@@ -67,7 +124,7 @@ def main():
 
         # Select Date Range
         allowed_days = [1, 7, 14, 30, 90, 180, 365]
-        selected_days = st.sidebar.select_slider("Select Days of Data", options = allowed_days, value = 30)
+        selected_days = st.sidebar.select_slider("Select Days of Data", options = allowed_days, value = DEFAULT_DAYS)
 
         # Get the selected cryptocurrency symbol
         selected_crypto = CRYPTOS[selected_crypto_token]
@@ -78,30 +135,91 @@ def main():
 
         # Data refresh
         if st.button("🔄 Refresh Data"):
+            cache.clear_all()
             st.cache_data.clear()
             st.rerun()
 
+        # Upstream latency of the recent API calls in this process
+        with st.expander("📡 API Latency"):
+            latency = http_client.latency_summary()
+            if latency:
+                st.dataframe(pd.DataFrame(latency).T, use_container_width=True)
+            else:
+                st.caption("No API calls yet")
+
+        # Response cache counters, used to size the caches
+        with st.expander("🗄️ Cache Statistics"):
+            cache_stats = cache.stats()
+            if cache_stats:
+                st.dataframe(pd.DataFrame(cache_stats).T, use_container_width=True)
+            else:
+                st.caption("Nothing cached yet")
+
+        # Background warm-up jobs keeping the default pages and the predictions loaded
+        with st.expander("⏱️ Warm-up Schedule"):
+            jobs = scheduler.status()
+            if jobs:
+                st.dataframe(pd.DataFrame(jobs), hide_index=True, use_container_width=True)
+            else:
+                st.caption("Warm-up is off (XRP_WARMUP=0)")
+
+        # Hidden debug panel: open the app with ?debug=1 to see where the last rerun spent its time
+        if st.query_params.get("debug") == "1":
+            trace_panel()
+
         st.markdown("---")
-    
-    # Main tabs
-    tabs = st.tabs(["📊 Overview", "🪙 RIPPLE"])
+
+    # Coins of the comparison grid, read before the widget is drawn so their fetches can start now
+    if "compare_coins" not in st.session_state:
+        st.session_state["compare_coins"] = DEFAULT_COMPARISON
+    compare_tokens = st.session_state["compare_coins"]
+
+    for key in SECTION_WIDGET_KEYS:
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
+    # Main tabs: only the active one is executed, so widgets of one tab never refetch or recompute the other
+    active_tab = st.radio("Section", TABS, horizontal=True, key="active_tab", label_visibility="collapsed")
 
     # Overview Tab
-    with tabs[0]:
+    if active_tab == TABS[0]:
+        # Start every network call of the tab up front so their latencies overlap
+        with tracing.span("submit_fetches"):
+            coingecko_id = coingecko_id_for(selected_crypto_token)
+            compare_ids = [coingecko_id_for(token) for token in compare_tokens]
+            # One batched call carries the headline metrics of the selected coin and of the whole grid
+            markets_future = fetch_stage.submit(markets.fetch_markets, tuple(dict.fromkeys([coingecko_id] + compare_ids)))
+            overview_future = fetch_stage.submit(fetch_coingecko_data, coingecko_id, days = selected_days)
+            # Comparison histories go last so they queue behind the calls this page needs first
+            history_futures = markets.start_histories(compare_ids, selected_days)
+
         st.header(f"{selected_crypto_token} Overview Dashboard")
         
         
-        # Fetch data
-        with st.spinner("Fetching data..."):
-            coingecko_id = selected_crypto_token.lower()
-            df = fetch_coingecko_data(coingecko_id, days = selected_days)
+        # Wait for the data fetched in the background
+        with tracing.span("overview.wait"), st.spinner("Fetching data..."):
+            df, error = fetch_stage.resolve(overview_future)
+
+            market_data, market_error = fetch_stage.resolve(markets_future)
+
+        if error is not None:
+            st.error(f"Error fetching CoinGecko data: {error}")
         
         if df is not None:           
 
-            current_price = df['price'].iloc[-1]
-            prev_price = df['price'].iloc[-2]
-            price_change = (current_price - prev_price) / prev_price * 100
-            print(f"Current Price: {current_price}, Previous Price: {prev_price}")
+            # Headline metrics from the batched markets call, computed from the history if it failed
+            headline = market_data.loc[coingecko_id] if market_data is not None else None
+            if headline is not None and pd.notna(headline['current_price']):
+                current_price = headline['current_price']
+                price_change = headline['price_change_percentage_24h']
+                high_24h, low_24h = headline['high_24h'], headline['low_24h']
+                market_cap = headline['market_cap']
+            else:
+                current_price = df['price'].iloc[-1]
+                prev_price = df['price'].iloc[-2]
+                price_change = (current_price - prev_price) / prev_price * 100
+                high_24h, low_24h = df['price'].tail(24).max(), df['price'].tail(24).min()
+                market_cap = df['market_cap'].iloc[-1]
 
             st.markdown("---")
 
@@ -120,21 +238,30 @@ def main():
             with col2:
                 st.metric(
                     label = "24h High (USD)",
-                    value = f"${df['price'].tail(24).max():,.2f}"
+                    value = f"${high_24h:,.2f}"
                 )
 
             # 24h Low
             with col3:
                 st.metric(
                     label = "24h Low (USD)",
-                    value = f"${df['price'].tail(24).min():,.2f}"
+                    value = f"${low_24h:,.2f}"
                 )
 
             # Market Cap
             with col4:
                 st.metric(
                     label = "Market Cap (USD)",
-                    value = f"${df['market_cap'].iloc[-1]/1e9:,.2f}B"
+                    value = f"${market_cap/1e9:,.2f}B"
+                )
+
+            # Freshness of the history: newest candle and when it was fetched (expired data is shown while it refreshes)
+            freshness = markets.fetch_history.freshness(coingecko_id, selected_days)
+            if freshness is not None:
+                loaded_at, stale = freshness
+                st.caption(
+                    f"🕒 Data as of {df['timestamp'].iloc[-1]:%Y-%m-%d %H:%M} UTC · fetched {cache.describe_age(loaded_at)}"
+                    + (" · refreshing in the background" if stale else "")
                 )
 
             st.markdown("---")
@@ -142,44 +269,46 @@ def main():
             # Price chart
             st.subheader(f"Price History ({selected_days} Days)")
 
-            # Create price line chart
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=df['timestamp'], 
-                y=df['price'], 
-                mode='lines',
-                name='Price (USD)',
-                line=dict(color='royalblue', width=2)
-            ))
-            fig.update_layout(
-                title=f"{selected_crypto_token} Price Over Last {selected_days} Days",
-                xaxis_title="Date",
-                yaxis_title="Price (USD)",
-                hovermode="x unified",
-                template='plotly_dark',
-                height=500
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            # Create price line chart (downsampled to the point budget, WebGL for long windows)
+            with tracing.span("overview.price_chart"):
+                fig = go.Figure()
+                fig.add_trace(charts.line_trace(
+                    df['timestamp'], 
+                    df['price'], 
+                    mode='lines',
+                    name='Price (USD)',
+                    line=dict(color='royalblue', width=2)
+                ))
+                fig.update_layout(
+                    title=f"{selected_crypto_token} Price Over Last {selected_days} Days",
+                    xaxis_title="Date",
+                    yaxis_title="Price (USD)",
+                    hovermode="x unified",
+                    template='plotly_dark',
+                    height=500
+                )
+                st.plotly_chart(fig, use_container_width=True)
 
             st.markdown("---")
 
             # Volume chart
             st.subheader(f"Trading Volume History ({selected_days} Days)")
-            fig_volume = go.Figure()
-            fig_volume.add_trace(go.Bar(
-                x=df['timestamp'], 
-                y=df['volume'], 
-                name='Volume (USD)',
-                marker_color="#6D44CB"
-            ))
-            fig_volume.update_layout(
-                title=f"{selected_crypto_token} Trading Volume Over Last {selected_days} Days",
-                xaxis_title="Date",
-                yaxis_title="Volume (USD)",
-                hovermode="x unified",
-                height=500
-            )
-            st.plotly_chart(fig_volume, use_container_width=True)
+            with tracing.span("overview.volume_chart"):
+                fig_volume = go.Figure()
+                fig_volume.add_trace(charts.bar_trace(
+                    df['timestamp'], 
+                    df['volume'], 
+                    name='Volume (USD)',
+                    marker_color="#6D44CB"
+                ))
+                fig_volume.update_layout(
+                    title=f"{selected_crypto_token} Trading Volume Over Last {selected_days} Days",
+                    xaxis_title="Date",
+                    yaxis_title="Volume (USD)",
+                    hovermode="x unified",
+                    height=500
+                )
+                st.plotly_chart(fig_volume, use_container_width=True)
 
             st.markdown("---")
 
@@ -205,42 +334,97 @@ def main():
             with col2:
                 st.subheader(f"Daily Aggregate for last 10 Days")
 
-                # Convert timestamp to datetime
-                df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-
-                # Resample to daily frequency
-                df_daily = (
-                    df.set_index("timestamp")
-                    .resample("1D")
-                    .agg({
-                        "price": ["first", "max", "min", "last"],
-                        "volume": "sum",
-                        "market_cap": "mean"
-                    })
-                )
+                # Daily bars (Australia/Sydney days, as on the Ripple tab) served by the rollup of this window
+                with tracing.span("overview.daily_table"):
+                    start_ms, end_ms = df["timestamp"].iloc[[0, -1]].astype("int64") // 10**6
+                    df_daily = (
+                        rollup.get_rollup(coingecko_id, market_store.granularity_for_days(selected_days))
+                        .bars("1D", start_ms, end_ms)
+                        .set_index("timestamp")
+                    )
 
-                # Convert to billions for readability
-                df_daily["volume"] = (df_daily["volume"] / 1e9).round(2)
-                df_daily["market_cap"] = (df_daily["market_cap"] / 1e9).round(2)
+                    # Convert to billions for readability
+                    df_daily["volume"] = (df_daily["volume"] / 1e9).round(2)
+                    df_daily["marketCap"] = (df_daily["marketCap"] / 1e9).round(2)
 
-                # Flatten MultiIndex columns
-                df_daily.columns = ["Open($)", "High($)", "Low($)", "Close($)", "Volume(B$)", "Market Cap(B$)"]
+                    # Rename columns
+                    df_daily.columns = ["Open($)", "High($)", "Low($)", "Close($)", "Volume(B$)", "Market Cap(B$)"]
 
-                # Round values for better readability
-                df_daily['Open($)'] = df_daily['Open($)'].round(2)
-                df_daily['High($)'] = df_daily['High($)'].round(2)
-                df_daily['Low($)'] = df_daily['Low($)'].round(2)
-                df_daily['Close($)'] = df_daily['Close($)'].round(2)
+                    # Round values for better readability
+                    df_daily['Open($)'] = df_daily['Open($)'].round(2)
+                    df_daily['High($)'] = df_daily['High($)'].round(2)
+                    df_daily['Low($)'] = df_daily['Low($)'].round(2)
+                    df_daily['Close($)'] = df_daily['Close($)'].round(2)
 
-                # Display last 10 days - Daily aggregates as dataframe
-                st.dataframe(df_daily.tail(10).reset_index(), hide_index = True, use_container_width=True)
+                    # Display last 10 days - Daily aggregates as dataframe
+                    st.dataframe(df_daily.tail(10).reset_index(), hide_index = True, use_container_width=True)
+
+        st.markdown("---")
+
+        # Comparison grid: one batched call for the metrics, histories fetched in parallel
+        st.subheader("Market Comparison")
+        st.multiselect("Coins to compare", options=list(CRYPTOS.keys()), key="compare_coins")
+
+        if market_error is not None:
+            st.error(f"Error fetching CoinGecko market data: {market_error}")
+
+        if market_data is not None and compare_ids:
+            grid = market_data.loc[compare_ids]
+            st.dataframe(pd.DataFrame({
+                'Coin': compare_tokens,
+                'Symbol': [CRYPTOS[token] for token in compare_tokens],
+                'Price($)': grid['current_price'].round(4).values,
+                '24h Change(%)': grid['price_change_percentage_24h'].round(2).values,
+                '24h High($)': grid['high_24h'].round(4).values,
+                '24h Low($)': grid['low_24h'].round(4).values,
+                'Market Cap(B$)': (grid['market_cap'] / 1e9).round(2).values,
+                'Volume(B$)': (grid['total_volume'] / 1e9).round(2).values,
+            }), hide_index = True, use_container_width = True)
+
+        # Relative performance over the window, rebased to 100 at its first point
+        with tracing.span("comparison.wait"), st.spinner("Fetching comparison histories..."):
+            histories, pending = markets.collect_histories(history_futures)
+
+        with tracing.span("comparison.chart"):
+            if histories:
+                fig_compare = go.Figure()
+                for token, compare_id in zip(compare_tokens, compare_ids):
+                    if compare_id not in histories:
+                        continue
+                    history = histories[compare_id]
+                    fig_compare.add_trace(charts.line_trace(
+                        history['timestamp'],
+                        history['price'] / history['price'].iloc[0] * 100,
+                        mode='lines',
+                        name=token
+                    ))
+                fig_compare.update_layout(
+                    title=f"Relative Performance Over Last {selected_days} Days (start = 100)",
+                    xaxis_title="Date",
+                    yaxis_title="Rebased Price",
+                    hovermode="x unified",
+                    template='plotly_dark',
+                    height=500
+                )
+                st.plotly_chart(fig_compare, use_container_width=True)
+
+        if pending:
+            loading = [token for token, compare_id in zip(compare_tokens, compare_ids) if compare_id in pending]
+            st.caption(f"Still loading: {', '.join(loading)}. They will appear on the next refresh.")
 
     # Ripple Tab
-    with tabs[1]:
+    else:
         ripple_25548684.render()
 
         
 
 
 if __name__ == "__main__":
-    main()
+    # Warm-up jobs start with the first rerun of the process and keep running between reruns
+    scheduler.start(warmup_jobs())
+    # Every rerun gets its own trace (nothing is recorded unless XRP_TRACING=1)
+    trace = tracing.start_trace("rerun")
+    try:
+        main()
+    finally:
+        tracing.finish_trace(trace)
@@ -0,0 +1,281 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import numpy as np
+import pyarrow as pa
+import requests
+
+from app import config, http_client, ingest, tracing
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the threads of one process are serialised
+    fcntl = None
+
+# Location of the local market data store: one Arrow file per granularity and coin
+STORE_DIR = os.path.join(config.DATA_DIR, "market")
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+# Spacing between two Coingecko points for each granularity (milliseconds)
+GRANULARITY_STEP_MS = {
+    "5m": 5 * 60 * 1000,
+    "hourly": 60 * 60 * 1000,
+    "daily": DAY_MS,
+}
+
+# Coingecko picks the granularity from the length of the requested window:
+# up to 1 day -> 5 minutely, 2 to 90 days -> hourly, above 90 days -> daily.
+# Gaps are padded / split so that every request comes back at the granularity we store.
+MIN_REQUEST_MS = {"5m": 0, "hourly": 2 * DAY_MS, "daily": 91 * DAY_MS}
+MAX_REQUEST_MS = {"5m": DAY_MS, "hourly": 90 * DAY_MS, "daily": None}
+
+# One lock per (coin, granularity) so that two sessions never fill the same gap twice; a lock file next to
+# the partition does the same for other processes (uvicorn workers of the prediction service, app replicas)
+_locks = {}
+_locks_guard = threading.Lock()
+
+# Request windows of a long gap are fetched concurrently on their own pool (the callers already run on
+# the fetch stage, so sharing its threads could leave every one of them waiting for a chunk).
+# The shared Coingecko rate limit in http_client still paces them.
+CHUNK_WORKERS = 8
+_chunk_executor = ThreadPoolExecutor(max_workers=CHUNK_WORKERS, thread_name_prefix="chunk")
+# (coin, granularity) -> [windows written, windows planned] of the loads in progress
+_progress = {}
+
+# Columns of a stored partition, epoch-ms timestamps first
+COLUMNS = ["timestamp", "price", "volume", "market_cap"]
+_SCHEMA = pa.schema([
+    ("timestamp", pa.int64()),
+    ("price", pa.float64()),
+    ("volume", pa.float64()),
+    ("market_cap", pa.float64()),
+])
+
+
+def granularity_for_days(days):
+    """Return the Coingecko granularity served for a window of the given length"""
+    if days <= 1:
+        return "5m"
+    if days <= 90:
+        return "hourly"
+    return "daily"
+
+
+def window_bounds(date, days_before):
+    """Epoch-ms bounds of the window from 'days_before' days before 'date' (YYYY-MM-DD) to the end of that date"""
+    target_date = datetime.strptime(date, "%Y-%m-%d")
+    start_date = target_date - timedelta(days=days_before)
+    start_ms = int(start_date.timestamp()) * 1000
+    end_ms = int((target_date + timedelta(days=1)).timestamp()) * 1000
+    return start_ms, end_ms
+
+
+@contextmanager
+def _series_lock(coin_id, granularity):
+    """Hold a partition for a read-fetch-write cycle, against the other threads and the other processes"""
+    with _locks_guard:
+        lock = _locks.setdefault((coin_id, granularity), threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        path = f"{partition_path(coin_id, granularity)}.lock"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def partition_path(coin_id, granularity):
+    return os.path.join(STORE_DIR, granularity, f"{coin_id}.arrow")
+
+
+def _read_partition(coin_id, granularity):
+    """
+    Return the stored points table of a coin and its covered intervals (empty when nothing is stored).
+
+    The file is memory-mapped: the table's buffers are the page cache pages of the file, which every
+    process of the host reading the same partition shares, instead of a private copy per reader.
+    """
+    try:
+        with pa.memory_map(partition_path(coin_id, granularity), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+    except FileNotFoundError:
+        return _SCHEMA.empty_table(), []
+    covered = json.loads(table.schema.metadata.get(b"covered", b"[]"))
+    return table, [tuple(interval) for interval in covered]
+
+
+def _merge_intervals(intervals):
+    """Merge overlapping or touching [start, end] intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _missing_ranges(covered, start_ms, end_ms, tolerance_ms):
+    """Return the parts of [start_ms, end_ms] not covered, ignoring gaps shorter than tolerance_ms"""
+    gaps = []
+    cursor = start_ms
+    for cov_start, cov_end in covered:
+        if cov_end <= cursor:
+            continue
+        if cov_start >= end_ms:
+            break
+        if cov_start - cursor > tolerance_ms:
+            gaps.append((cursor, cov_start))
+        cursor = max(cursor, cov_end)
+    if end_ms - cursor > tolerance_ms:
+        gaps.append((cursor, end_ms))
+    return gaps
+
+
+def _plan_requests(gap_start, gap_end, granularity):
+    """Split a gap into request windows that Coingecko answers at the wanted granularity"""
+    max_len = MAX_REQUEST_MS[granularity]
+    windows = []
+    cursor = gap_end
+    # Walk backwards from the newest data so that padding always lands in the past
+    while cursor > gap_start:
+        window_start = gap_start if max_len is None else max(gap_start, cursor - max_len)
+        window_start = min(window_start, cursor - MIN_REQUEST_MS[granularity])
+        windows.append((window_start, cursor))
+        cursor = window_start
+    return windows
+
+
+def _fetch_range(coin_id, start_ms, end_ms):
+    """Fetch raw price/volume/market cap points between two timestamps from Coingecko"""
+    url = f"{config.COINGECKO_API_BASE}/coins/{coin_id}/market_chart/range"
+    headers = {"x-cg-demo-api-key": config.COINGECKO_API_KEY}
+    params = {
+        "vs_currency": "usd",
+        "from": start_ms // 1000,
+        "to": end_ms // 1000,
+    }
+    response = http_client.get("coingecko", url, params=params, headers=headers)
+
+    # Check for error response
+    if response.status_code != 200:
+        # Refused ranges (e.g. beyond the key's history limit) come with CoinGecko's explanation
+        detail = f" {response.text[:200]}" if response.status_code in (401, 403) else ""
+        raise requests.HTTPError(f"Error fetching data from CoinGecko: {response.status_code}{detail}", response=response)
+
+    # Decoded straight into aligned columns (no per-series frames or joins)
+    with tracing.span("coingecko.parse", bytes=len(response.content)):
+        return ingest.parse_response(response)
+
+
+def _write_window(table, covered, coin_id, granularity, start_ms, end_ms, df):
+    """
+    Replace the stored points of a fetched window and record it as covered.
+
+    Points and coverage are written to one file that atomically replaces the previous one,
+    so readers always see a consistent partition. Returns the new (table, covered).
+    """
+    timestamps = table.column("timestamp").to_numpy()
+    kept = table.filter(pa.array((timestamps < start_ms) | (timestamps > end_ms)))
+    fetched = pa.Table.from_pandas(df[COLUMNS], schema=_SCHEMA, preserve_index=False)
+    table = pa.concat_tables([kept, fetched]).sort_by("timestamp")
+
+    covered = _merge_intervals(covered + [(start_ms, end_ms)])
+    table = table.replace_schema_metadata({"covered": json.dumps(covered)})
+
+    path = partition_path(coin_id, granularity)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    # Uncompressed so the file can later be memory-mapped without decoding
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+    return table, covered
+
+
+def _read_points(table, start_ms, end_ms):
+    """Slice the sorted partition to [start_ms, end_ms] without scanning it"""
+    timestamps = table.column("timestamp").to_numpy()
+    lo = int(np.searchsorted(timestamps, start_ms, side="left"))
+    hi = int(np.searchsorted(timestamps, end_ms, side="right"))
+    # One block per column so the (null-free) columns are read-only views of the mapped file, not copies
+    return table.slice(lo, hi - lo).combine_chunks().to_pandas(split_blocks=True)
+
+
+def _fetch_windows(table, covered, coin_id, granularity, windows):
+    """
+    Fetch request windows concurrently and write each one as soon as it arrives.
+
+    Neighbouring windows share their boundary timestamp; writing a window replaces the stored points
+    inside it, so the boundary point is kept once. Windows that failed are left uncovered (they are
+    requested again next time) and the first error is raised once the others are stored.
+    """
+    # Every chunk gets its own copy of the trace context
+    futures = {
+        _chunk_executor.submit(tracing.propagate(_fetch_range), coin_id, window_start, window_end): (window_start, window_end)
+        for window_start, window_end in windows
+    }
+    progress = _progress[(coin_id, granularity)] = [0, len(windows)]
+    error = None
+    try:
+        for future in as_completed(futures):
+            window_start, window_end = futures[future]
+            try:
+                df = future.result()
+            except Exception as e:
+                error = error or e
+                continue
+            with tracing.span("store.write", coin=coin_id):
+                table, covered = _write_window(table, covered, coin_id, granularity, window_start, window_end, df)
+            progress[0] += 1
+    finally:
+        _progress.pop((coin_id, granularity), None)
+    if error is not None:
+        raise error
+    return table, covered
+
+
+def load_range(coin_id, start_ms, end_ms, granularity):
+    """
+    Return the points of a coin between two epoch-ms timestamps.
+
+    Only the parts of the window that are not in the local store yet are requested from Coingecko,
+    the rest is served from disk. Long gaps are split into windows Coingecko answers at the stored
+    granularity and fetched in parallel. The returned frame has an int64 epoch-ms 'timestamp' column
+    plus 'price', 'volume' and 'market_cap'.
+    """
+    # Nothing can be fetched beyond the current time
+    now_ms = int(time.time() * 1000)
+    fetch_end = min(end_ms, now_ms)
+
+    with _series_lock(coin_id, granularity):
+        with tracing.span("store.read", coin=coin_id):
+            table, covered = _read_partition(coin_id, granularity)
+        gaps = _missing_ranges(covered, start_ms, fetch_end, GRANULARITY_STEP_MS[granularity])
+        windows = [window for gap_start, gap_end in gaps for window in _plan_requests(gap_start, gap_end, granularity)]
+        if windows:
+            table, covered = _fetch_windows(table, covered, coin_id, granularity, windows)
+        return _read_points(table, start_ms, end_ms)
+
+
+def load_progress(coin_id, granularity):
+    """(windows stored, windows planned) of a load in progress, None when nothing is being fetched"""
+    progress = _progress.get((coin_id, granularity))
+    return tuple(progress) if progress is not None else None
+
+
+def read_stored(coin_id, start_ms, end_ms, granularity):
+    """Points of a window already in the store, without fetching (partitions are replaced atomically, so no lock)"""
+    table, _ = _read_partition(coin_id, granularity)
+    return _read_points(table, start_ms, end_ms)
@@ -0,0 +1,101 @@
+import time
+from concurrent.futures import wait
+
+import pandas as pd
+
+from app import cache, config, fetch_stage, frames, http_client, market_store, rollup, tracing
+
+# /coins/markets returns at most 250 coins per page, so N coins cost ceil(N / 250) calls
+MARKETS_BATCH = 250
+# Headline metrics are refreshed once a minute, like Coingecko updates them
+MARKETS_TTL = 60
+# Fields of /coins/markets kept for the headline metrics and the comparison grid
+MARKET_FIELDS = [
+    "symbol", "name", "current_price", "price_change_percentage_24h",
+    "high_24h", "low_24h", "market_cap", "total_volume", "last_updated",
+]
+# Longest a rerun waits for comparison histories; the rest are shown once they are cached
+HISTORY_WAIT_SECONDS = 3
+
+
+def history_ttl(coin_id, days):
+    """Keep a window for one step of the granularity Coingecko serves it at"""
+    return market_store.GRANULARITY_STEP_MS[market_store.granularity_for_days(days)] / 1000
+
+
+@cache.cached("coingecko_data", ttl=history_ttl, maxsize=32, stale=config.STALE_SECONDS)
+def fetch_history(coin_id, days=30):
+    """Price/volume/market cap points of the last 'days' days, or None when Coingecko has none"""
+    # Serve the window from the shared rollup, only points it does not hold yet are read from the local store
+    end_ms = int(time.time() * 1000)
+    start_ms = end_ms - days * market_store.DAY_MS
+    coin_rollup = rollup.get_rollup(coin_id, market_store.granularity_for_days(days))
+    with tracing.span("rollup.refresh", coin=coin_id):
+        coin_rollup.refresh(start_ms, end_ms)
+    with tracing.span("rollup.points", coin=coin_id):
+        df = coin_rollup.points(start_ms, end_ms)
+    if df.empty:
+        return None
+
+    # Shared by every session: the value columns stay views of the rollup, only the datetimes are new
+    return frames.view({
+        "timestamp": pd.to_datetime(df["timestamp"], unit="ms").to_numpy(),
+        "price": df["price"].to_numpy(),
+        "volume": df["volume"].to_numpy(),
+        "market_cap": df["market_cap"].to_numpy(),
+    })
+
+
+@cache.cached("coingecko_markets", ttl=MARKETS_TTL, maxsize=8, stale=config.STALE_SECONDS)
+def fetch_markets(coin_ids):
+    """
+    Headline metrics of many coins from the batched /coins/markets endpoint.
+
+    'coin_ids' is a tuple of Coingecko ids. One call carries price, 24h change, 24h high/low,
+    market cap and volume for up to MARKETS_BATCH coins, so the cost does not grow with the grid.
+    Returns a frame indexed by id in the requested order (missing coins are all-NaN rows).
+    """
+    url = f"{config.COINGECKO_API_BASE}/coins/markets"
+    headers = {"x-cg-demo-api-key": config.COINGECKO_API_KEY}
+    rows = []
+    for i in range(0, len(coin_ids), MARKETS_BATCH):
+        params = {
+            "vs_currency": "usd",
+            "ids": ",".join(coin_ids[i:i + MARKETS_BATCH]),
+            "per_page": MARKETS_BATCH,
+            "price_change_percentage": "24h",
+        }
+        response = http_client.get("coingecko", url, params=params, headers=headers)
+
+        # Check for error response
+        if response.status_code != 200:
+            raise Exception(f"Error fetching data from CoinGecko: {response.status_code}")
+        rows.extend(response.json())
+
+    df = pd.DataFrame(rows, columns=["id"] + MARKET_FIELDS).set_index("id")
+    return df.reindex(list(coin_ids))
+
+
+def start_histories(coin_ids, days):
+    """Start the history fetches of several coins on the fetch stage, return {id: future}"""
+    # All of them draw from the same Coingecko rate budget in http_client
+    return {coin_id: fetch_stage.submit(fetch_history, coin_id, days) for coin_id in coin_ids}
+
+
+def collect_histories(futures, timeout=HISTORY_WAIT_SECONDS):
+    """
+    Wait up to 'timeout' seconds for the history futures.
+
+    Returns ({id: frame} of the histories ready in time, [ids still loading]). Failed or empty
+    histories are left out; the pending ones keep running and land in the cache for the next rerun.
+    """
+    wait(futures.values(), timeout=timeout)
+    ready, pending = {}, []
+    for coin_id, future in futures.items():
+        if not future.done():
+            pending.append(coin_id)
+            continue
+        df, error = fetch_stage.resolve(future)
+        if error is None and df is not None:
+            ready[coin_id] = df
+    return ready, pending
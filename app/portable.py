@@ -0,0 +1,297 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from app import features
+
+# Files of the portable artifacts: the fitted pipeline parameters and the booster in XGBoost's JSON format
+SPEC_FILE = "pipeline.json"
+MODEL_FILE = "model.json"
+FORMAT_VERSION = 1
+
+# Step names of the notebook's cleaning pipeline the spec replaces
+CLEANING_STEPS = ["imputer", "remove_duplicates", "outlier_handler_vol_cap"]
+# Objectives whose prediction is the raw sum of the trees (no link function)
+IDENTITY_OBJECTIVES = {"reg:squarederror", "reg:absoluteerror", "reg:pseudohubererror"}
+
+# Nothing in this module imports scikit-learn or xgboost except export(), which needs the pickled artifacts.
+
+
+def pipeline_spec(artifacts):
+    """Declarative spec of the fitted cleaning, engineering and transform pipelines of the pickled artifacts"""
+    cleaning = artifacts["cleaning_pipeline"]
+    steps = [name for name, _ in cleaning.steps]
+    if steps != CLEANING_STEPS:
+        raise ValueError(f"Unexpected cleaning steps: {steps}")
+
+    imputer = cleaning.named_steps["imputer"]
+    outliers = cleaning.named_steps["outlier_handler_vol_cap"]
+    encoder = artifacts["transform_pipeline"].named_steps["vol_bin_encoder"].encoder
+    # The fused builder already checked the engineering/transform steps and holds their fitted parameters
+    builder = artifacts["features"]
+    model = artifacts["model"]
+    feature_names = getattr(model, "feature_names_in_", None)
+
+    return {
+        "format": FORMAT_VERSION,
+        "raw_columns": list(features.RAW_COLUMNS),
+        "imputer": {"columns": list(imputer.features), "medians": [float(v) for v in imputer.imputer.statistics_]},
+        "drop_duplicates": {"reset_index": bool(cleaning.named_steps["remove_duplicates"].reset_index)},
+        "clip": {column: [float(lower), float(upper)] for column, (lower, upper) in outliers.bounds_.items()},
+        "volatility_bin": {
+            "edges": list(features.VOLATILITY_BIN_EDGES),
+            "categories": [str(category) for category in encoder.categories_[0]],
+        },
+        "log_columns": list(builder.log_features),
+        "min_max": {
+            "columns": list(builder.scaled_features),
+            "scale": [float(v) for v in builder.scale_],
+            "min": [float(v) for v in builder.min_],
+        },
+        "feature_columns": list(feature_names) if feature_names is not None else list(features.FEATURE_COLUMNS),
+        "model": MODEL_FILE,
+    }
+
+
+def export(artifacts, output_dir):
+    """Write the portable spec and the booster (XGBoost JSON) of loaded pickled artifacts to output_dir"""
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, SPEC_FILE), "w") as f:
+        json.dump(pipeline_spec(artifacts), f, indent=2)
+    artifacts["model"].get_booster().save_model(os.path.join(output_dir, MODEL_FILE))
+
+
+class PortablePipeline:
+    """Cleaning, feature engineering and scaling rebuilt from the spec, in one NumPy pass"""
+
+    def __init__(self, spec):
+        if spec.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported pipeline spec format: {spec.get('format')}")
+        self.raw_columns = spec["raw_columns"]
+        self.impute_positions = [self.raw_columns.index(c) for c in spec["imputer"]["columns"]]
+        self.medians = np.array(spec["imputer"]["medians"], dtype=np.float64)
+        self.reset_index = spec["drop_duplicates"]["reset_index"]
+        self.clip = [(self.raw_columns.index(c), lower, upper) for c, (lower, upper) in spec["clip"].items()]
+        self.bin_edges = tuple(spec["volatility_bin"]["edges"])
+        # Ordinal code of each volatility level in the encoder's category order
+        categories = spec["volatility_bin"]["categories"]
+        self.bin_codes = np.array([categories.index(level) for level in features.VOLATILITY_LEVELS], dtype=np.float64)
+        self.log_columns = spec["log_columns"]
+        self.scaled_positions = [features.FEATURE_COLUMNS.index(c) for c in spec["min_max"]["columns"]]
+        self.scale = np.array(spec["min_max"]["scale"], dtype=np.float64)
+        self.min = np.array(spec["min_max"]["min"], dtype=np.float64)
+        self.feature_columns = spec["feature_columns"]
+
+    def transform(self, X):
+        """Model feature frame of a daily OHLCV frame (rows without indicators dropped, model column order)"""
+        raw = X[self.raw_columns].to_numpy(dtype=np.float64, copy=True)
+
+        # Median imputation of the fitted columns
+        block = raw[:, self.impute_positions]
+        missing = np.isnan(block)
+        block[missing] = np.take(self.medians, np.nonzero(missing)[1])
+        raw[:, self.impute_positions] = block
+
+        # Exact duplicate rows are dropped (and the rows renumbered when the step resets the index)
+        unique = ~pd.DataFrame(raw).duplicated().to_numpy()
+        raw = raw[unique]
+        labels = np.arange(len(raw)) if self.reset_index else np.flatnonzero(unique)
+
+        # IQR clipping with the fitted bounds
+        for position, lower, upper in self.clip:
+            raw[:, position] = np.clip(raw[:, position], lower, upper)
+
+        matrix, keep = features.engineer(*raw.T, log_columns=self.log_columns, bin_edges=self.bin_edges)
+        matrix = matrix[keep]
+        bins = matrix[:, len(features.RAW_COLUMNS)]
+        valid = ~np.isnan(bins)
+        bins[valid] = self.bin_codes[bins[valid].astype(np.int64)]
+        features.apply_min_max(matrix, self.scaled_positions, self.scale, self.min)
+
+        df = pd.DataFrame(matrix, index=labels[keep], columns=features.FEATURE_COLUMNS)
+        return df[self.feature_columns]
+
+
+class PortableModel:
+    """
+    XGBoost regressor evaluated in NumPy from the booster's JSON dump.
+
+    All trees are walked at once level by level; leaves are added tree after tree in float32 on top of
+    the base score, the order and precision of XGBoost's CPU predictor.
+    """
+
+    def __init__(self, model):
+        learner = model["learner"]
+        objective = learner["objective"]["name"]
+        if objective not in IDENTITY_OBJECTIVES:
+            raise ValueError(f"Unsupported objective for the portable model: {objective}")
+        param = learner["learner_model_param"]
+        if int(param.get("num_target", "1")) != 1 or int(param.get("num_class", "0")) != 0:
+            raise ValueError("Only single-target regression models are supported")
+        booster = learner["gradient_booster"]
+        if booster["name"] != "gbtree":
+            raise ValueError(f"Unsupported booster: {booster['name']}")
+
+        # base_score is "[2.7E-1]" since XGBoost 2.1 and "2.7E-1" before
+        self.base_score = np.float32(float(param["base_score"].strip("[]")))
+        self.feature_names_in_ = np.asarray(learner["feature_names"], dtype=object)
+
+        trees = booster["model"]["trees"]
+        # Models trained with early stopping predict with the best iteration only, like XGBRegressor.predict
+        best_iteration = learner.get("attributes", {}).get("best_iteration")
+        if best_iteration is not None:
+            per_round = int(booster["model"]["gbtree_model_param"]["num_parallel_tree"])
+            trees = trees[:(int(best_iteration) + 1) * per_round]
+        if any(any(tree["split_type"]) for tree in trees):
+            raise ValueError("Categorical splits are not supported by the portable model")
+
+        # Node arrays of all trees, padded to the largest tree
+        n_nodes = max(len(tree["left_children"]) for tree in trees)
+        self.left = np.full((len(trees), n_nodes), -1, dtype=np.int32)
+        self.right = np.full((len(trees), n_nodes), -1, dtype=np.int32)
+        self.feature = np.zeros((len(trees), n_nodes), dtype=np.int32)
+        self.threshold = np.zeros((len(trees), n_nodes), dtype=np.float32)
+        self.default_left = np.zeros((len(trees), n_nodes), dtype=bool)
+        for i, tree in enumerate(trees):
+            n = len(tree["left_children"])
+            self.left[i, :n] = tree["left_children"]
+            self.right[i, :n] = tree["right_children"]
+            self.feature[i, :n] = tree["split_indices"]
+            # Leaves keep their value in split_conditions
+            self.threshold[i, :n] = tree["split_conditions"]
+            self.default_left[i, :n] = tree["default_left"]
+
+    def predict(self, X):
+        """Predictions (float32) for a frame holding the model's feature columns"""
+        values = X[list(self.feature_names_in_)].to_numpy(dtype=np.float32)
+        rows = np.arange(len(values))[:, None]
+        trees = np.arange(len(self.left))[None, :]
+        node = np.zeros((len(values), len(self.left)), dtype=np.int32)
+
+        while True:
+            left = self.left[trees, node]
+            inner = left >= 0
+            if not inner.any():
+                break
+            value = values[rows, self.feature[trees, node]]
+            # NaN goes the default way; otherwise left when value < threshold
+            go_left = np.where(np.isnan(value), self.default_left[trees, node], value < self.threshold[trees, node])
+            node = np.where(inner, np.where(go_left, left, self.right[trees, node]), node)
+
+        leaves = self.threshold[trees, node]
+        prediction = np.full(len(values), self.base_score, dtype=np.float32)
+        for column in leaves.T:
+            prediction += column
+        return prediction
+
+
+def load(model_dir):
+    """Artifacts rebuilt from the portable files of a model folder (no scikit-learn, xgboost or unpickling)"""
+    with open(os.path.join(model_dir, SPEC_FILE)) as f:
+        spec = json.load(f)
+    with open(os.path.join(model_dir, spec["model"])) as f:
+        model = json.load(f)
+    return {"pipeline": PortablePipeline(spec), "model": PortableModel(model)}
+
+
+def exists(model_dir):
+    return os.path.exists(os.path.join(model_dir, SPEC_FILE))
+
+
+def windows(history, size=30):
+    """Daily frames of 'size' consecutive rows, like the window the Ripple tab predicts from"""
+    return [history.iloc[end - size:end].reset_index(drop=True) for end in range(size, len(history) + 1)]
+
+
+def compare(pickled, portable, frames):
+    """Predict each frame's next-day high with both artifact sets, return (pickled, portable) arrays"""
+    from app import inference
+
+    predictions = []
+    for artifacts in (pickled, portable):
+        rows = pd.concat([inference.build_features(frame, artifacts).tail(1) for frame in frames])
+        predictions.append(np.asarray(artifacts["model"].predict(rows), dtype=np.float64))
+    return predictions[0], predictions[1]
+
+
+# Child process measuring one cold start: imports, artifact loading and the first prediction.
+# numpy and pandas are imported first since the dashboard has them loaded anyway. Memory is read
+# from /proc (Linux): resident set growth and the new high-water mark of this process.
+COLD_START_SCRIPT = """
+import json, sys, time
+import numpy as np, pandas as pd
+
+def memory():
+    with open("/proc/self/status") as f:
+        fields = dict(line.split(":", 1) for line in f)
+    return {key: int(fields[key].split()[0]) * 1024 for key in ("VmRSS", "VmHWM")}
+
+history = pd.read_csv(sys.argv[1], sep=sys.argv[2])
+before = memory()
+start = time.perf_counter()
+from app import inference
+artifacts = inference.load_artifacts()
+loaded = time.perf_counter()
+X = inference.build_features(history.tail(30).reset_index(drop=True))
+prediction = float(artifacts["model"].predict(X.tail(1))[0])
+done = time.perf_counter()
+after = memory()
+print(json.dumps({
+    "load_s": loaded - start,
+    "first_prediction_s": done - loaded,
+    "rss_growth_mb": (after["VmRSS"] - before["VmRSS"]) / 1e6,
+    "peak_growth_mb": (after["VmHWM"] - before["VmHWM"]) / 1e6,
+    "sklearn_imported": "sklearn" in sys.modules,
+    "xgboost_imported": "xgboost" in sys.modules,
+    "prediction": prediction,
+}))
+"""
+
+
+def cold_start(model_dir, model_format, history_csv, sep=","):
+    """Measure a cold start with the given artifact format in a fresh interpreter"""
+    env = {**os.environ, "XRP_MODEL_DIR": model_dir, "XRP_MODEL_FORMAT": model_format, "XRP_INFERENCE_MODE": "local"}
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_START_SCRIPT, history_csv, sep],
+        cwd=repo_root, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    from app import config, inference
+
+    parser = argparse.ArgumentParser(description="Export the model as portable files and check them against the pickles")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="Write pipeline.json and model.json next to the pickles")
+    export_parser.add_argument("--output", help="Folder for the portable files (defaults to the model folder)")
+    check_parser = subparsers.add_parser("check", help="Compare predictions, cold start and memory of both formats")
+    check_parser.add_argument("csv", help="Daily history CSV with open, high, low, close, volume and marketCap columns")
+    check_parser.add_argument("--sep", default=",", help="CSV separator (the raw Kaggle file uses ';')")
+    check_parser.add_argument("--tolerance", type=float, default=0.0, help="Allowed absolute prediction difference")
+    check_parser.add_argument("--runs", type=int, default=3, help="Cold starts measured per format")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        output_dir = args.output or config.MODEL_DIR
+        export(inference.load_pickled_artifacts(), output_dir)
+        print(f"Wrote {SPEC_FILE} and {MODEL_FILE} to {output_dir}")
+        sys.exit(0)
+
+    history = pd.read_csv(args.csv, sep=args.sep)
+    expected, actual = compare(inference.load_pickled_artifacts(), load(config.MODEL_DIR), windows(history))
+    difference = np.abs(expected - actual)
+    print(f"{len(expected)} windows: max abs diff {difference.max():.3g}, {int((difference == 0).sum())} identical")
+
+    for model_format in ("pickle", "portable"):
+        runs = [cold_start(config.MODEL_DIR, model_format, os.path.abspath(args.csv), args.sep) for _ in range(args.runs)]
+        best = min(runs, key=lambda run: run["load_s"])
+        print(f"{model_format:>8}: load {best['load_s'] * 1000:7.1f} ms  first prediction {best['first_prediction_s'] * 1000:6.1f} ms  "
+              f"RSS +{best['rss_growth_mb']:6.1f} MB (peak +{best['peak_growth_mb']:6.1f} MB)  sklearn={best['sklearn_imported']}  xgboost={best['xgboost_imported']}")
+    sys.exit(0 if difference.max() <= args.tolerance else 1)
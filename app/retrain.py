@@ -0,0 +1,271 @@
+import argparse
+import copy
+import glob
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from app import features, inference, portable
+
+TARGET = "high_next_day"
+
+# Search space of the notebook's RandomizedSearchCV. n_estimators (500 to 3000) is no longer sampled:
+# every candidate may boost up to MAX_ROUNDS and early stopping on the validation fold picks the count.
+MAX_ROUNDS = 3000
+EARLY_STOPPING_ROUNDS = 50
+N_CANDIDATES = 30
+N_SPLITS = 5
+# Successive halving: each rung keeps the best 1/HALVING_FACTOR candidates and multiplies their budget by it
+HALVING_FACTOR = 3
+MIN_ROUNDS = 100
+
+
+def sample_candidates(n, seed=42):
+    """Draw hyperparameter sets from the notebook's distributions"""
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "max_depth": int(rng.integers(3, 10)),
+            "learning_rate": float(0.005 + 0.095 * rng.random()),
+            "subsample": float(0.5 + 0.5 * rng.random()),
+            "colsample_bytree": float(0.5 + 0.5 * rng.random()),
+            "colsample_bylevel": float(0.5 + 0.5 * rng.random()),
+            "gamma": float(1.5 * rng.random()),
+            "reg_alpha": float(2 * rng.random()),
+            "reg_lambda": float(10 * rng.random()),
+            "min_child_weight": int(rng.integers(1, 10)),
+        }
+        for _ in range(n)
+    ]
+
+
+def load_history(paths, sep=";"):
+    """Read the daily CoinMarketCap CSV exports, oldest first, with the next-day high as target"""
+    files = sorted(f for path in paths for f in glob.glob(path))
+    if not files:
+        raise FileNotFoundError(f"No history files match {paths}")
+    df = pd.concat([pd.read_csv(f, sep=sep) for f in files], ignore_index=True)
+    df = df.sort_values("timeOpen").drop_duplicates(subset="timeOpen").reset_index(drop=True)
+    df[TARGET] = df["high"].shift(-1)
+    return df
+
+
+def _clip_bounds(values, factor=6.0):
+    """IQR clipping bounds of the notebook's OutlierHandler"""
+    q1, q3 = np.nanquantile(values, 0.25), np.nanquantile(values, 0.75)
+    return q1 - factor * (q3 - q1), q3 + factor * (q3 - q1)
+
+
+def build_folds(history, n_splits=N_SPLITS):
+    """
+    Clean, engineer and scale the expanding-window folds once.
+
+    Fold k trains on every row before its validation block, so no future row reaches a training set.
+    Medians, outlier bounds and min-max ranges are fitted on the training rows of each fold only.
+    Returns a list of (dtrain, dval) pairs of quantised XGBoost matrices shared by all candidates.
+    """
+    import xgboost as xgb
+
+    history = history.drop_duplicates(subset=features.RAW_COLUMNS + [TARGET]).reset_index(drop=True)
+    raw = history[features.RAW_COLUMNS].to_numpy(dtype=np.float64)
+    target = history[TARGET].to_numpy(dtype=np.float64)
+    block = len(history) // (n_splits + 1)
+    scaled_positions = [features.FEATURE_COLUMNS.index(column) for column in features.SCALED_COLUMNS]
+
+    folds = []
+    for k in range(n_splits):
+        train_end = len(history) - (n_splits - k) * block
+        val_end = train_end + block
+        part = raw[:val_end].copy()
+
+        # Cleaning: median imputation and IQR clipping of volume/market cap, fitted on the training rows
+        medians = np.nanmedian(part[:train_end], axis=0)
+        missing = np.isnan(part)
+        part[missing] = np.take(medians, np.nonzero(missing)[1])
+        for column in ("volume", "marketCap"):
+            position = features.RAW_COLUMNS.index(column)
+            part[:, position] = np.clip(part[:, position], *_clip_bounds(part[:train_end, position]))
+
+        # Features are engineered over the whole past, so the first validation rows get full indicator windows
+        matrix, keep = features.engineer(*part.T)
+        rows = np.arange(val_end)
+        is_train = rows < train_end
+        usable = keep & ~np.isnan(target[:val_end])
+        scale, offset = features.fit_min_max(matrix[usable & is_train][:, scaled_positions])
+        features.apply_min_max(matrix, scaled_positions, scale, offset)
+
+        train_rows, val_rows = usable & is_train, usable & ~is_train
+        dtrain = xgb.QuantileDMatrix(matrix[train_rows], label=target[:val_end][train_rows], feature_names=features.FEATURE_COLUMNS)
+        dval = xgb.QuantileDMatrix(matrix[val_rows], label=target[:val_end][val_rows], ref=dtrain, feature_names=features.FEATURE_COLUMNS)
+        folds.append((dtrain, dval))
+    return folds
+
+
+class _Trial:
+    """Boosting state of one candidate on one fold, resumed from rung to rung"""
+
+    def __init__(self, params, fold, early_stopping_rounds):
+        import xgboost as xgb
+
+        self.params = {**params, "objective": "reg:squarederror", "eval_metric": "rmse", "seed": 42, "nthread": 1}
+        self.dtrain, self.dval = fold
+        self.booster = None
+        # The same callback instance is kept so that patience and best score carry over between rungs
+        self.early_stopping = xgb.callback.EarlyStopping(rounds=early_stopping_rounds) if early_stopping_rounds else None
+        self.stopped = False
+
+    def advance(self, budget):
+        """Boost up to 'budget' rounds in total (less if early stopping triggers) and return the best RMSE"""
+        import xgboost as xgb
+
+        done = self.booster.num_boosted_rounds() if self.booster is not None else 0
+        if not self.stopped and budget > done:
+            self.booster = xgb.train(
+                self.params,
+                self.dtrain,
+                num_boost_round=budget - done,
+                evals=[(self.dval, "val")],
+                callbacks=[self.early_stopping] if self.early_stopping else None,
+                xgb_model=self.booster,
+                verbose_eval=False,
+            )
+            if self.early_stopping is not None:
+                self.stopped = self.early_stopping.current_rounds >= self.early_stopping.rounds
+        return self.best_score, self.best_rounds
+
+    @property
+    def best_score(self):
+        if self.early_stopping is not None:
+            return float(self.booster.attr("best_score"))
+        # Without early stopping the score is the RMSE after the last round
+        predictions = self.booster.predict(self.dval)
+        return float(np.sqrt(np.mean((predictions - self.dval.get_label()) ** 2)))
+
+    @property
+    def best_rounds(self):
+        if self.early_stopping is not None:
+            return int(self.booster.attr("best_iteration")) + 1
+        return self.booster.num_boosted_rounds()
+
+
+def _rungs(max_rounds, factor, min_rounds):
+    """Round budgets of the successive halving rungs, ending at max_rounds"""
+    n_rungs = max(1, int(math.log(max_rounds / min_rounds, factor)) + 1)
+    return [int(max_rounds / factor ** (n_rungs - 1 - i)) for i in range(n_rungs)]
+
+
+def successive_halving(folds, candidates, max_rounds=MAX_ROUNDS, factor=HALVING_FACTOR, min_rounds=MIN_ROUNDS,
+                       early_stopping_rounds=EARLY_STOPPING_ROUNDS, workers=None):
+    """
+    Successive halving over boosting rounds with early stopping on every fold.
+
+    All (candidate, fold) trials of a rung run concurrently, one XGBoost thread each, on the shared fold
+    matrices. Surviving trials resume from their boosters instead of starting over.
+    Returns (best params, best number of rounds, mean validation RMSE, log of every evaluation).
+    """
+    trials = {i: [_Trial(params, fold, early_stopping_rounds) for fold in folds] for i, params in enumerate(candidates)}
+    alive = list(trials)
+    log = []
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for rung, budget in enumerate(_rungs(max_rounds, factor, min_rounds)):
+            jobs = {(i, f): pool.submit(trial.advance, budget) for i in alive for f, trial in enumerate(trials[i])}
+            scores = {}
+            for i in alive:
+                results = [jobs[(i, f)].result() for f in range(len(folds))]
+                scores[i] = float(np.mean([score for score, _ in results]))
+                rounds = int(np.mean([r for _, r in results]))
+                log.append({"rung": rung, "budget": budget, "candidate": i, "rmse": scores[i], "rounds": rounds})
+            # Keep the best 1/factor of the candidates for the next, larger budget
+            alive = sorted(alive, key=scores.get)[:max(1, len(alive) // factor)]
+
+    best = alive[0]
+    best_rounds = int(np.mean([trial.best_rounds for trial in trials[best]]))
+    best_rmse = float(np.mean([trial.best_score for trial in trials[best]]))
+    return candidates[best], best_rounds, best_rmse, log
+
+
+def random_search(folds, candidates, seed=42, workers=None):
+    """The notebook's approach on the same folds: every candidate trains its sampled n_estimators in full"""
+    rng = np.random.default_rng(seed)
+    rounds = [int(rng.integers(500, MAX_ROUNDS)) for _ in candidates]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        jobs = [
+            [pool.submit(_Trial(params, fold, None).advance, n) for fold in folds]
+            for params, n in zip(candidates, rounds)
+        ]
+        scores = [float(np.mean([job.result()[0] for job in fold_jobs])) for fold_jobs in jobs]
+    best = int(np.argmin(scores))
+    return candidates[best], rounds[best], scores[best]
+
+
+def refit(history, params, n_estimators, output_dir):
+    """Refit the notebook pipelines and an XGBoost model on the whole history and save them as model artifacts"""
+    import cloudpickle
+    import joblib
+    import xgboost as xgb
+
+    # Fresh copies of the deployed pipelines, so their fitted parameters are learned again on the new data
+    artifacts = inference.load_pickled_artifacts()
+    pipelines = {name: copy.deepcopy(artifacts[name]) for name in ("cleaning_pipeline", "eng_pipeline", "transform_pipeline")}
+
+    data = history[features.RAW_COLUMNS + [TARGET]]
+    data = pipelines["cleaning_pipeline"].fit_transform(data)
+    data = pipelines["eng_pipeline"].fit_transform(data)
+    y = data.pop(TARGET)
+    X, y = data[y.notna()], y[y.notna()]
+    X = pipelines["transform_pipeline"].fit_transform(X)
+
+    model = xgb.XGBRegressor(random_state=42, n_estimators=n_estimators, **params).fit(X, y)
+
+    os.makedirs(output_dir, exist_ok=True)
+    for name, pipeline in pipelines.items():
+        with open(os.path.join(output_dir, f"{name}.pkl"), "wb") as f:
+            cloudpickle.dump(pipeline, f)
+    joblib.dump(model, os.path.join(output_dir, "model.joblib"))
+
+    # Portable copy (pipeline spec + booster JSON) that the app loads without scikit-learn or unpickling
+    from app.transformers import FusedFeatureBuilder
+    refitted = {**pipelines, "model": model}
+    refitted["features"] = FusedFeatureBuilder.from_pipelines(pipelines["eng_pipeline"], pipelines["transform_pipeline"])
+    portable.export(refitted, output_dir)
+    return model
+
+
+def _timed(fn, *args, **kwargs):
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - wall, time.process_time() - cpu
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune and retrain the next-day high model")
+    parser.add_argument("history", nargs="+", help="Daily CoinMarketCap CSV files (globs allowed)")
+    parser.add_argument("--sep", default=";", help="CSV separator")
+    parser.add_argument("--candidates", type=int, default=N_CANDIDATES, help="Hyperparameter sets to try")
+    parser.add_argument("--splits", type=int, default=N_SPLITS, help="Expanding-window folds")
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent trainings (defaults to the CPU count)")
+    parser.add_argument("--baseline", action="store_true", help="Also run the notebook's full random search for comparison")
+    parser.add_argument("--output", help="Write refitted artifacts to this folder")
+    args = parser.parse_args()
+
+    history = load_history(args.history, sep=args.sep)
+    candidates = sample_candidates(args.candidates)
+    folds, wall, cpu = _timed(build_folds, history, args.splits)
+    print(f"Built {len(folds)} folds from {len(history)} days in {wall:.2f}s")
+
+    (params, rounds, rmse, _), wall, cpu = _timed(successive_halving, folds, candidates, workers=args.workers)
+    print(f"Successive halving: RMSE={rmse:.5f}  rounds={rounds}  wall={wall:.1f}s  cpu={cpu:.1f}s")
+    print(f"Best parameters: {params}")
+
+    if args.baseline:
+        (_, base_rounds, base_rmse), wall, cpu = _timed(random_search, folds, candidates, workers=args.workers)
+        print(f"Random search:      RMSE={base_rmse:.5f}  rounds={base_rounds}  wall={wall:.1f}s  cpu={cpu:.1f}s")
+
+    if args.output:
+        refit(history, params, rounds, args.output)
+        print(f"Saved artifacts to {args.output}")
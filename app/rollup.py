@@ -0,0 +1,301 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from app import frames, market_store
+
+# Day boundaries used by both dashboard tabs
+TIMEZONE = "Australia/Sydney"
+
+HOUR_MS = 60 * 60 * 1000
+WEEK_MS = 7 * market_store.DAY_MS
+
+# Bar sizes kept by every rollup. Intraday bars are fixed UTC intervals (labelled in the rollup's timezone),
+# daily and weekly bars follow the local calendar, including DST changes; weeks start on Monday.
+RESOLUTIONS = ["1h", "4h", "1D", "1W"]
+_INTRADAY_MS = {"1h": HOUR_MS, "4h": 4 * HOUR_MS}
+
+BAR_COLUMNS = ["open", "high", "low", "close", "volume", "marketCap"]
+_FIELDS = ["key", "start", "stop", "open", "high", "low", "close", "volume", "cap_sum", "cap_count"]
+
+
+def _segment_sums(values, starts, stops):
+    """Per-segment sums and non-NaN counts, with the compensated summation pandas' groupby uses"""
+    total = np.zeros(len(starts))
+    compensation = np.zeros(len(starts))
+    count = np.zeros(len(starts), dtype=np.int64)
+    lengths = stops - starts
+    # One vectorised step per position inside the segments, so each segment is summed in order
+    for j in range(int(lengths.max(initial=0))):
+        active = np.flatnonzero(lengths > j)
+        value = values[starts[active] + j]
+        valid = ~np.isnan(value)
+        active, value = active[valid], value[valid]
+        y = value - compensation[active]
+        t = total[active] + y
+        c = t - total[active] - y
+        # An infinite value makes the compensation NaN, pandas resets it to keep the infinite sum
+        c[np.isnan(c)] = 0.0
+        compensation[active] = c
+        total[active] = t
+        count[active] += 1
+    return total, count
+
+
+def _first_valid(values, starts, stops, last=False):
+    """First (or last) non-NaN value of every segment, NaN when a segment has none"""
+    valid = ~np.isnan(values)
+    positions = np.arange(len(values))
+    if last:
+        candidates = np.where(valid, positions, -1)
+        picked = np.maximum.reduceat(candidates, starts)
+        ok = picked >= starts
+    else:
+        candidates = np.where(valid, positions, len(values))
+        picked = np.minimum.reduceat(candidates, starts)
+        ok = picked < stops
+    out = np.full(len(starts), np.nan)
+    out[ok] = values[picked[ok]]
+    return out
+
+
+def _aggregate(keys, price, volume, market_cap, offset=0):
+    """Bars of consecutive points sharing a bucket key (points must be sorted by time)"""
+    if len(keys) == 0:
+        return {field: np.empty(0, dtype=np.int64 if field in ("key", "start", "stop", "cap_count") else np.float64) for field in _FIELDS}
+    boundaries = np.flatnonzero(np.diff(keys)) + 1
+    starts = np.concatenate(([0], boundaries))
+    stops = np.concatenate((boundaries, [len(keys)]))
+    volume_sum, _ = _segment_sums(volume, starts, stops)
+    cap_sum, cap_count = _segment_sums(market_cap, starts, stops)
+    return {
+        "key": keys[starts],
+        "start": starts + offset,
+        "stop": stops + offset,
+        "open": _first_valid(price, starts, stops),
+        "high": np.fmax.reduceat(price, starts),
+        "low": np.fmin.reduceat(price, starts),
+        "close": _first_valid(price, starts, stops, last=True),
+        "volume": volume_sum,
+        "cap_sum": cap_sum,
+        "cap_count": cap_count,
+    }
+
+
+class Rollup:
+    """OHLCV and market cap bars of one coin's price points at every resolution, updated incrementally"""
+
+    def __init__(self, coin_id, granularity, tz=TIMEZONE):
+        self.coin_id = coin_id
+        self.granularity = granularity
+        self.tz = tz
+        self.lock = threading.RLock()
+        # Raw points sorted by time
+        self.ts = np.empty(0, dtype=np.int64)
+        self.price = np.empty(0)
+        self.volume = np.empty(0)
+        self.market_cap = np.empty(0)
+        # Bucket key of every point and the bars for each resolution
+        self.keys = {resolution: np.empty(0, dtype=np.int64) for resolution in RESOLUTIONS}
+        self.bars_by_resolution = {resolution: _aggregate(self.keys[resolution], self.price, self.volume, self.market_cap) for resolution in RESOLUTIONS}
+        # Sorted, disjoint [start, end] epoch-ms windows read from the market store. Windows the user
+        # jumped between stay separate segments, so the time in between is never read; the end of the
+        # newest read is the newest point held, from which the next refresh reads again
+        self.segments = []
+
+    def _bucket_keys(self, ts, resolution):
+        """Intraday buckets are UTC epoch-ms starts, daily/weekly buckets are local wall-clock starts"""
+        if resolution in _INTRADAY_MS:
+            return ts - ts % _INTRADAY_MS[resolution]
+        wall = pd.to_datetime(ts, unit="ms", utc=True).tz_convert(self.tz).tz_localize(None).asi8 // 1_000_000
+        day = wall - wall % market_store.DAY_MS
+        if resolution == "1D":
+            return day
+        # 1970-01-01 was a Thursday: shift so that weeks start on Monday
+        weekday = (day // market_store.DAY_MS + 3) % 7
+        return day - weekday * market_store.DAY_MS
+
+    def _rebuild_from(self, point_index):
+        """Recompute the bars from the given point index onwards (including the open bar before it), older bars are kept"""
+        for resolution in RESOLUTIONS:
+            bars = self.bars_by_resolution[resolution]
+            # Bars ending before the point are complete; the open bar ending at it takes the new points
+            kept = int(np.searchsorted(bars["stop"], point_index, side="left"))
+            first_point = int(bars["start"][kept]) if kept < len(bars["start"]) else point_index
+            fresh = _aggregate(
+                self.keys[resolution][first_point:],
+                self.price[first_point:],
+                self.volume[first_point:],
+                self.market_cap[first_point:],
+                offset=first_point,
+            )
+            self.bars_by_resolution[resolution] = {field: np.concatenate((bars[field][:kept], fresh[field])) for field in _FIELDS}
+
+    def ingest(self, points, replace=None):
+        """
+        Add points (frame with int64 epoch-ms 'timestamp', 'price', 'volume', 'market_cap') to the rollup.
+
+        Points at timestamps already held are kept as they are. With 'replace' (a (start_ms, end_ms) range),
+        the points held in that range are dropped first and replaced by the new ones (the store rewrites the
+        newest points, e.g. the live one, when it fetches again).
+        """
+        ts = points["timestamp"].to_numpy(dtype=np.int64)
+        columns = [points[name].to_numpy(dtype=np.float64) for name in ("price", "volume", "market_cap")]
+        with self.lock:
+            held = [self.ts, self.price, self.volume, self.market_cap]
+            keys = dict(self.keys)
+            # Index of the first point that moved: the bars before it are kept
+            changed = None
+            if replace is not None:
+                lo = int(np.searchsorted(self.ts, replace[0], side="left"))
+                hi = int(np.searchsorted(self.ts, replace[1], side="right"))
+                if lo < hi:
+                    held = [np.concatenate((values[:lo], values[hi:])) for values in held]
+                    keys = {resolution: np.concatenate((k[:lo], k[hi:])) for resolution, k in keys.items()}
+                    changed = lo
+
+            new = ~np.isin(ts, held[0])
+            if new.any():
+                ts, columns = ts[new], [c[new] for c in columns]
+                # New points can land before, between or after the held ones (e.g. in a gap between segments)
+                positions = np.searchsorted(held[0], ts)
+                held = [np.insert(values, positions, added) for values, added in zip(held, [ts, *columns])]
+                keys = {resolution: np.insert(keys[resolution], positions, self._bucket_keys(ts, resolution)) for resolution in RESOLUTIONS}
+                changed = int(positions[0]) if changed is None else min(changed, int(positions[0]))
+
+            if changed is None:
+                return
+            # Arrays are replaced, never written in place, so frames already handed out stay valid
+            self.ts, self.price, self.volume, self.market_cap = (frames.readonly(values) for values in held)
+            self.keys = keys
+            # Only the bar holding the first moved point and the bars after it are recomputed
+            self._rebuild_from(changed)
+
+    def refresh(self, start_ms, end_ms):
+        """Pull the points of the window that the rollup does not hold yet from the market store"""
+        with self.lock:
+            # Parts of the window outside every segment; a gap ending at a segment is bounded by it
+            gaps, cursor = [], start_ms
+            for segment_start, segment_end in self.segments:
+                if segment_end < cursor:
+                    continue
+                if segment_start > end_ms:
+                    break
+                if segment_start > cursor:
+                    gaps.append((cursor, segment_start, True))
+                cursor = max(cursor, segment_end)
+            if cursor < end_ms or not self.segments:
+                gaps.append((cursor, end_ms, False))
+
+            for gap_start, gap_end, bounded in gaps:
+                # Read again from a segment's end: the store decides whether the time since its last fetch
+                # needs a new request, and the points it rewrote (the live one) replace the ones held
+                points = market_store.load_range(self.coin_id, gap_start, gap_end, self.granularity)
+                self.ingest(points, replace=(gap_start, gap_end))
+                if bounded or points.empty:
+                    covered_end = gap_end if bounded else gap_start
+                else:
+                    covered_end = min(gap_end, int(points["timestamp"].iloc[-1]))
+                self._cover(gap_start, covered_end)
+
+    def _cover(self, start_ms, end_ms):
+        """Add a window to the segments, merging it with the ones it touches"""
+        segments = sorted(self.segments + [(start_ms, end_ms)])
+        merged = [segments[0]]
+        for segment_start, segment_end in segments[1:]:
+            if segment_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], segment_end))
+            else:
+                merged.append((segment_start, segment_end))
+        self.segments = merged
+
+    def points(self, start_ms, end_ms):
+        """
+        Raw points between two epoch-ms timestamps (inclusive), as returned by the market store.
+
+        The frame is a read-only view of the rollup's arrays, not a copy.
+        """
+        with self.lock:
+            lo, hi = np.searchsorted(self.ts, start_ms, side="left"), np.searchsorted(self.ts, end_ms, side="right")
+            return frames.view({
+                "timestamp": self.ts[lo:hi],
+                "price": self.price[lo:hi],
+                "volume": self.volume[lo:hi],
+                "market_cap": self.market_cap[lo:hi],
+            })
+
+    def bars(self, resolution, start_ms, end_ms):
+        """
+        Bars of the points between two epoch-ms timestamps (inclusive).
+
+        Bars fully inside the window are served as stored. The bars cut by the window edges are
+        aggregated from the points inside the window, so the result equals resampling those points.
+        Buckets without points are included with NaN prices and zero volume, like pandas' resample.
+        """
+        with self.lock:
+            lo, hi = np.searchsorted(self.ts, start_ms, side="left"), np.searchsorted(self.ts, end_ms, side="right")
+            if lo >= hi:
+                return self._frame(resolution, _aggregate(self.keys[resolution][:0], self.price[:0], self.volume[:0], self.market_cap[:0]))
+
+            bars = self.bars_by_resolution[resolution]
+            # Bars holding the first and the last point of the window
+            first = int(np.searchsorted(bars["stop"], lo, side="right"))
+            last = int(np.searchsorted(bars["stop"], hi - 1, side="right"))
+            if first == last:
+                full = bars["start"][first] >= lo and bars["stop"][first] <= hi
+                parts = [{field: bars[field][first:first + 1] for field in _FIELDS}] if full else [self._partial(resolution, lo, hi)]
+            else:
+                head = tail = None
+                if bars["start"][first] < lo:
+                    head = self._partial(resolution, lo, int(bars["stop"][first]))
+                    first += 1
+                if bars["stop"][last] > hi:
+                    tail = self._partial(resolution, int(bars["start"][last]), hi)
+                    last -= 1
+                parts = [head, {field: bars[field][first:last + 1] for field in _FIELDS}, tail]
+            parts = [part for part in parts if part is not None]
+            return self._frame(resolution, {field: np.concatenate([part[field] for part in parts]) for field in _FIELDS})
+
+    def _partial(self, resolution, lo, hi):
+        return _aggregate(self.keys[resolution][lo:hi], self.price[lo:hi], self.volume[lo:hi], self.market_cap[lo:hi], offset=lo)
+
+    def _frame(self, resolution, bars):
+        """Bars as a frame with a tz-aware 'timestamp' column, empty buckets filled in"""
+        step = _INTRADAY_MS.get(resolution) or (WEEK_MS if resolution == "1W" else market_store.DAY_MS)
+        keys = np.arange(bars["key"][0], bars["key"][-1] + step, step) if len(bars["key"]) else bars["key"]
+        positions = np.searchsorted(keys, bars["key"])
+
+        values = {column: np.full(len(keys), np.nan) for column in BAR_COLUMNS}
+        values["volume"] = np.zeros(len(keys))
+        for column in ("open", "high", "low", "close", "volume"):
+            values[column][positions] = bars[column]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values["marketCap"][positions] = np.where(bars["cap_count"] > 0, bars["cap_sum"] / bars["cap_count"], np.nan)
+
+        if resolution in _INTRADAY_MS:
+            timestamps = pd.to_datetime(keys, unit="ms", utc=True).tz_convert(self.tz)
+        else:
+            timestamps = pd.to_datetime(keys, unit="ms").tz_localize(self.tz, ambiguous=np.ones(len(keys), dtype=bool), nonexistent="shift_forward")
+        return pd.DataFrame({"timestamp": timestamps, **values})
+
+
+# Rollups live in this module so they survive Streamlit reruns and are shared by all sessions
+_rollups = {}
+_rollups_lock = threading.Lock()
+
+
+def get_rollup(coin_id, granularity, tz=TIMEZONE):
+    """Return the rollup of a coin's points at a store granularity, creating it on first use"""
+    with _rollups_lock:
+        key = (coin_id, granularity, tz)
+        if key not in _rollups:
+            _rollups[key] = Rollup(coin_id, granularity, tz)
+        return _rollups[key]
+
+
+def load_bars(coin_id, start_ms, end_ms, granularity, resolution="1D", tz=TIMEZONE):
+    """Bars of a coin's points between two epoch-ms timestamps, reading only new points from the store"""
+    rollup = get_rollup(coin_id, granularity, tz)
+    rollup.refresh(start_ms, end_ms)
+    return rollup.bars(resolution, start_ms, end_ms)
@@ -0,0 +1,91 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from app import config, rollup, tracing
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """
+    Warm-up task run on its own background thread.
+
+    It runs once when the scheduler starts, then every 'interval' seconds and 'day_offset' seconds
+    after each local midnight, whichever comes first, so the first visitor of a new day finds the
+    new day's data already loaded. 'fn' returns a short summary shown in the sidebar.
+    """
+
+    def __init__(self, name, interval, fn, day_offset=None, tz=rollup.TIMEZONE):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self.day_offset = config.WARMUP_DAY_OFFSET_SECONDS if day_offset is None else day_offset
+        self.tz = tz
+        self.runs = 0
+        self.last_run = None
+        self.last_duration = None
+        self.last_result = None
+        self.last_error = None
+        self.next_run = time.time()
+
+    def schedule(self, now):
+        """Next run time (epoch seconds) after a run finished at 'now'"""
+        local = datetime.fromtimestamp(now, ZoneInfo(self.tz))
+        midnight = (local + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return min(now + self.interval, midnight.timestamp() + self.day_offset)
+
+    def run_once(self):
+        start = time.time()
+        with tracing.span(f"warmup.{self.name}"):
+            try:
+                self.last_result = self.fn()
+                self.last_error = None
+            except Exception as e:
+                # A failing upstream only delays the warm-up, the previous results keep being served
+                self.last_error = f"{type(e).__name__}: {e}"
+                logger.warning("Warm-up job %s failed: %s", self.name, e)
+        self.runs += 1
+        self.last_run = start
+        self.last_duration = time.time() - start
+        self.next_run = self.schedule(time.time())
+
+    def run_forever(self, stop):
+        while not stop.is_set():
+            stop.wait(max(0.0, self.next_run - time.time()))
+            if not stop.is_set():
+                self.run_once()
+
+    def status(self):
+        return {
+            "job": self.name,
+            "runs": self.runs,
+            "last_run": datetime.fromtimestamp(self.last_run).strftime("%H:%M:%S") if self.last_run else None,
+            "duration_s": round(self.last_duration, 1) if self.last_duration is not None else None,
+            "next_run": datetime.fromtimestamp(self.next_run).strftime("%H:%M:%S"),
+            "result": self.last_error or self.last_result,
+        }
+
+
+# The scheduler lives in this module so it is started once per process, not once per session or rerun
+_jobs = []
+_stop = threading.Event()
+_lock = threading.Lock()
+
+
+def start(jobs):
+    """Start the warm-up jobs on daemon threads, once per process (later calls are ignored)"""
+    with _lock:
+        if _jobs or not config.WARMUP:
+            return
+        _jobs.extend(jobs)
+        for job in _jobs:
+            threading.Thread(target=job.run_forever, args=(_stop,), daemon=True, name=f"warmup-{job.name}").start()
+
+
+def status():
+    """Rows describing every warm-up job, empty when the scheduler is off"""
+    with _lock:
+        return [job.status() for job in _jobs]
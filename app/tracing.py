@@ -0,0 +1,270 @@
+import contextvars
+import functools
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app import config
+
+# Upper bounds of the histogram buckets: span/upstream latency in seconds and payload size in bytes
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7)
+# Finished reruns kept for the debug panel
+RECENT_TRACES = 20
+
+# Trace of the current rerun and the innermost open span, carried into fetch stage threads
+_trace = contextvars.ContextVar("trace", default=None)
+_parent = contextvars.ContextVar("span_parent", default=None)
+_ids = itertools.count(1)
+
+_recent = deque(maxlen=RECENT_TRACES)
+_histograms = {}
+_counters = {}
+_metrics_lock = threading.Lock()
+_server = None
+
+
+class _NoSpan:
+    """Shared do-nothing span returned while tracing is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Trace:
+    """Spans of one rerun, from any thread that works for it"""
+
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def waterfall(self):
+        """Spans as rows of (name, parent, thread, start_ms, duration_ms, attrs), ordered by start"""
+        with self.lock:
+            spans = list(self.spans)
+        return sorted(
+            (
+                {
+                    "id": s.id,
+                    "name": s.name,
+                    "parent": s.parent,
+                    "thread": s.thread,
+                    "start_ms": (s.start - self.start) * 1000,
+                    "duration_ms": (s.end - s.start) * 1000,
+                    **s.attrs,
+                }
+                for s in spans
+            ),
+            key=lambda row: row["start_ms"],
+        )
+
+
+class Span:
+    """Timed block of a trace; attributes set on it end up in the waterfall"""
+
+    def __init__(self, name, trace, attrs):
+        self.id = next(_ids)
+        self.name = name
+        self.trace = trace
+        self.parent = _parent.get()
+        self.attrs = attrs
+        self.thread = threading.current_thread().name
+
+    def __enter__(self):
+        self.token = _parent.set(self.id)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        _parent.reset(self.token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        if self.trace is not None:
+            with self.trace.lock:
+                self.trace.spans.append(self)
+        observe("xrp_span_duration_seconds", self.end - self.start, LATENCY_BUCKETS, span=self.name)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+def span(name, **attrs):
+    """Context manager timing a block as a span of the current rerun (a shared no-op when tracing is off)"""
+    if not config.TRACING:
+        return _NO_SPAN
+    return Span(name, _trace.get(), attrs)
+
+
+def traced(name):
+    """Decorator timing every call of a function as a span"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not config.TRACING:
+                return fn(*args, **kwargs)
+            with Span(name, _trace.get(), {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def enabled():
+    return config.TRACING
+
+
+def start_trace(name):
+    """Begin the trace of a rerun in the current context, return it (None when tracing is off)"""
+    if not config.TRACING:
+        return None
+    if config.METRICS_PORT:
+        serve_metrics(config.METRICS_PORT)
+    trace = Trace(name)
+    _trace.set(trace)
+    _parent.set(None)
+    return trace
+
+
+def finish_trace(trace):
+    """Keep a finished rerun for the debug panel and refresh the metrics file"""
+    if trace is None:
+        return
+    _recent.append(trace)
+    if config.METRICS_FILE:
+        write_metrics(config.METRICS_FILE)
+
+
+def recent_traces():
+    return list(_recent)
+
+
+def propagate(fn):
+    """Bind fn to the current trace context so spans opened in another thread join this rerun"""
+    if not config.TRACING:
+        return fn
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def observe(metric, value, buckets, **labels):
+    """Add a value to a histogram"""
+    key = (metric, tuple(sorted(labels.items())))
+    with _metrics_lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {"buckets": buckets, "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                histogram["counts"][i] += 1
+        histogram["sum"] += value
+        histogram["count"] += 1
+
+
+def increment(metric, **labels):
+    key = (metric, tuple(sorted(labels.items())))
+    with _metrics_lock:
+        _counters[key] = _counters.get(key, 0) + 1
+
+
+def record_upstream(endpoint, status, elapsed, size):
+    """Metrics of one upstream call: latency, status code and response size"""
+    if not config.TRACING:
+        return
+    increment("xrp_upstream_responses", endpoint=endpoint, status=str(status))
+    observe("xrp_upstream_duration_seconds", elapsed, LATENCY_BUCKETS, endpoint=endpoint)
+    if size is not None:
+        observe("xrp_upstream_payload_bytes", size, SIZE_BUCKETS, endpoint=endpoint)
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}" if pairs else ""
+
+
+def render_metrics():
+    """All metrics in the OpenMetrics text format"""
+    from app import cache
+
+    with _metrics_lock:
+        histograms = {key: {**h, "counts": list(h["counts"])} for key, h in _histograms.items()}
+        counters = dict(_counters)
+
+    lines = []
+    for metric in sorted({metric for metric, _ in histograms}):
+        lines.append(f"# TYPE {metric} histogram")
+        for (name, labels), histogram in sorted(histograms.items()):
+            if name != metric:
+                continue
+            for bound, count in zip(histogram["buckets"], histogram["counts"]):
+                lines.append(f"{metric}_bucket{_labels(labels, le=repr(float(bound)))} {count}")
+            lines.append(f"{metric}_bucket{_labels(labels, le='+Inf')} {histogram['count']}")
+            lines.append(f"{metric}_sum{_labels(labels)} {histogram['sum']}")
+            lines.append(f"{metric}_count{_labels(labels)} {histogram['count']}")
+
+    for metric in sorted({metric for metric, _ in counters}):
+        lines.append(f"# TYPE {metric} counter")
+        for (name, labels), value in sorted(counters.items()):
+            if name == metric:
+                lines.append(f"{metric}_total{_labels(labels)} {value}")
+
+    # Response caches: lookups by outcome and the resulting hit ratio
+    cache_stats = cache.stats()
+    lines.append("# TYPE xrp_cache_lookups counter")
+    for name, stats in sorted(cache_stats.items()):
+        for outcome in ("hits", "stale", "misses", "coalesced"):
+            lines.append(f'xrp_cache_lookups_total{{cache="{name}",result="{outcome}"}} {stats[outcome]}')
+    lines.append("# TYPE xrp_cache_hit_ratio gauge")
+    for name, stats in sorted(cache_stats.items()):
+        if stats["hit_ratio"] is not None:
+            lines.append(f'xrp_cache_hit_ratio{{cache="{name}"}} {stats["hit_ratio"]}')
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path):
+    """Write the metrics atomically, for a node exporter textfile collector or a sidecar"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(render_metrics())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/openmetrics-text; version=1.0.0; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port):
+    """Start the /metrics endpoint once per process on a background thread"""
+    global _server
+    with _metrics_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, daemon=True, name="metrics").start()
+    return _server
@@ -0,0 +1,103 @@
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.utils.validation import check_is_fitted
+
+from app import features
+
+# Step names of the notebook pipelines the fused builder replaces
+ENG_STEPS = ["volatility_bin", "daily_return", "range_ratio", "rsi", "macd"]
+TRANSFORM_STEPS = ["vol_bin_encoder", "log_transform", "scaler"]
+
+
+class FusedFeatureBuilder(BaseEstimator, TransformerMixin):
+    """Single-pass replacement for the notebook's eng_pipeline followed by data_transform_pipeline"""
+
+    def __init__(self, scaled_features=None, log_features=None, feature_range=(0, 1)):
+        self.scaled_features = scaled_features
+        self.log_features = log_features
+        self.feature_range = feature_range
+
+    def _scaled_positions(self):
+        scaled = self.scaled_features if self.scaled_features is not None else features.SCALED_COLUMNS
+        return [features.FEATURE_COLUMNS.index(column) for column in scaled]
+
+    def _engineer(self, X):
+        log_features = self.log_features if self.log_features is not None else features.LOG_COLUMNS
+        columns = [X[column].to_numpy(dtype=np.float64) for column in features.RAW_COLUMNS]
+        matrix, keep = features.engineer(*columns, log_columns=log_features)
+        return matrix[keep], keep
+
+    def fit(self, X, y=None):
+        matrix, _ = self._engineer(X)
+        self.scale_, self.min_ = features.fit_min_max(matrix[:, self._scaled_positions()], self.feature_range)
+        return self
+
+    def transform(self, X):
+        check_is_fitted(self, ["scale_", "min_"])
+        matrix, keep = self._engineer(X)
+        features.apply_min_max(matrix, self._scaled_positions(), self.scale_, self.min_)
+        # Rows keep their original index labels, like the notebook's dropna()
+        return pd.DataFrame(matrix, index=X.index[keep], columns=features.FEATURE_COLUMNS)
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray(features.FEATURE_COLUMNS, dtype=object)
+
+    @classmethod
+    def from_pipelines(cls, eng_pipeline, transform_pipeline):
+        """Build a fitted builder from the notebook's fitted eng_pipeline and data_transform_pipeline"""
+        eng_steps = [name for name, _ in eng_pipeline.steps]
+        transform_steps = [name for name, _ in transform_pipeline.steps]
+        if eng_steps != ENG_STEPS or transform_steps != TRANSFORM_STEPS:
+            raise ValueError(f"Unexpected pipeline steps: {eng_steps} / {transform_steps}")
+
+        scaler = transform_pipeline.named_steps["scaler"]
+        builder = cls(
+            scaled_features=list(scaler.features),
+            log_features=list(transform_pipeline.named_steps["log_transform"].features),
+            feature_range=tuple(scaler.feature_range),
+        )
+        # Reuse the fitted parameters as-is so the output is bit-for-bit the same
+        builder.scale_ = np.array(scaler.scaler.scale_, dtype=np.float64)
+        builder.min_ = np.array(scaler.scaler.min_, dtype=np.float64)
+        return builder
+
+
+def compare_with_pipelines(builder, eng_pipeline, transform_pipeline, X):
+    """Return the largest absolute difference per feature between the builder and the notebook pipelines"""
+    from app.inference import _run_pipeline
+
+    expected = _run_pipeline(transform_pipeline, _run_pipeline(eng_pipeline, X))
+    actual = builder.transform(X)
+    if not expected.index.equals(actual.index):
+        raise AssertionError("Fused builder kept different rows than the notebook pipelines")
+
+    differences = {}
+    for column in features.FEATURE_COLUMNS:
+        a = actual[column].to_numpy()
+        e = expected[column].to_numpy(dtype=np.float64)
+        same_nan = np.isnan(a) == np.isnan(e)
+        diff = np.abs(np.where(np.isnan(a) | np.isnan(e), 0.0, a - e))
+        differences[column] = float(diff.max(initial=0.0)) if same_nan.all() else float("inf")
+    return differences
+
+
+if __name__ == "__main__":
+    from app import inference
+
+    parser = argparse.ArgumentParser(description="Check the fused feature builder against the notebook pipelines")
+    parser.add_argument("csv", help="Daily history CSV with open, high, low, close, volume and marketCap columns")
+    parser.add_argument("--sep", default=",", help="CSV separator (the raw Kaggle file uses ';')")
+    args = parser.parse_args()
+
+    artifacts = inference.load_pickled_artifacts()
+    history = pd.read_csv(args.csv, sep=args.sep)
+    X = inference._run_pipeline(artifacts["cleaning_pipeline"], history[features.RAW_COLUMNS])
+    builder = FusedFeatureBuilder.from_pipelines(artifacts["eng_pipeline"], artifacts["transform_pipeline"])
+    differences = compare_with_pipelines(builder, artifacts["eng_pipeline"], artifacts["transform_pipeline"], X)
+    for column, diff in differences.items():
+        print(f"{column:15s} max abs diff = {diff:.3g}")
+    sys.exit(0 if all(diff == 0.0 for diff in differences.values()) else 1)
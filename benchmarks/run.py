@@ -0,0 +1,312 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks import stub  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# Payload sizes of the micro-benchmarks: (days, granularity) as Coingecko serves them,
+# plus 365 days of hourly points as the largest frame the app could hold
+CASES = [(1, "5m"), (7, "hourly"), (30, "hourly"), (90, "hourly"), (365, "hourly"), (365, "daily")]
+REPEAT = 20
+# A median this much slower than the baseline is reported as a regression
+REGRESSION_RATIO = 1.2
+
+# Script run by AppTest to time the Ripple tab on its own
+RENDER_SCRIPT = f"""
+import sys
+sys.path.insert(0, {REPO_ROOT!r})
+from students import ripple_25548684
+ripple_25548684.render()
+"""
+
+
+def configure(stub_url, data_dir, rate_limit=None):
+    """Point the app at the stub and a scratch data folder; must run before any app module is imported"""
+    os.environ["COINGECKO_API_BASE"] = stub_url
+    os.environ["XRP_MODEL_API_URL"] = f"{stub_url}/predict/ripple"
+    os.environ["XRP_INFERENCE_MODE"] = "remote"
+    os.environ["XRP_DATA_DIR"] = data_dir
+    os.environ["XRP_BACKTEST_DIR"] = os.path.join(data_dir, "backtest")
+    # The stub has no quota, so by default the client-side limiter does not throttle the timings
+    os.environ["XRP_COINGECKO_RATE_LIMIT"] = str(rate_limit or 10 ** 6)
+    # Nor a history limit, so every History option of the Ripple tab can be timed
+    os.environ["XRP_COINGECKO_HISTORY_DAYS"] = str(10 * 365)
+    # Background warm-up would load data while the timings run
+    os.environ["XRP_WARMUP"] = "0"
+
+
+def measure(fn, repeat=REPEAT):
+    """Call fn 'repeat' times and return its timings in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return _summary(times)
+
+
+def _summary(times):
+    return {
+        "repeat": len(times),
+        "min_ms": min(times),
+        "median_ms": statistics.median(times),
+        "mean_ms": statistics.fmean(times),
+        "max_ms": max(times),
+    }
+
+
+def micro_benchmarks(repeat=REPEAT):
+    """Time parsing, merging, resampling, indicators and figure building for every payload size"""
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    from app import charts, ingest, rollup
+    from students import ripple_25548684
+
+    results = {}
+    end_ms = int(time.time() * 1000)
+    for days, granularity in CASES:
+        payload = json.dumps(stub.market_chart("ripple", end_ms - days * stub.DAY_MS, end_ms, granularity)).encode()
+        data = ingest.loads(payload)
+        points = ingest.parse_market_chart(data)
+        prices = points["price"]
+        timestamps = pd.to_datetime(points["timestamp"], unit="ms")
+
+        def resample():
+            series = rollup.Rollup("ripple", granularity)
+            series.ingest(points)
+            return series.bars("1D", int(points["timestamp"].iloc[0]), int(points["timestamp"].iloc[-1]))
+
+        def figure():
+            fig = go.Figure()
+            fig.add_trace(charts.line_trace(timestamps, prices, mode="lines", name="Price (USD)"))
+            fig.update_layout(template="plotly_dark", height=500)
+            # Serialisation is what st.plotly_chart spends its time on
+            return fig.to_json()
+
+        case = f"{days}d_{granularity}"
+        results[case] = {
+            "points": len(points),
+            "payload_bytes": len(payload),
+            "parse_json": measure(lambda: ingest.loads(payload), repeat),
+            "parse_points": measure(lambda: ingest.parse_market_chart(data), repeat),
+            # The previous parser (three frames and two merges), for comparison
+            "merge_frames": measure(lambda: ingest.merge_frames(data), repeat),
+            "ingest_bytes": measure(lambda: ingest.parse_market_chart_bytes(payload), repeat),
+            "resample_1d": measure(resample, repeat),
+            "calculate_rsi": measure(lambda: ripple_25548684.calculate_rsi(prices), repeat),
+            "calculate_macd": measure(lambda: ripple_25548684.calculate_macd(prices), repeat),
+            "figure_json": measure(figure, repeat),
+        }
+        print(f"{case:>12}  {len(points):>6} points  " + "  ".join(
+            f"{name}={stats['median_ms']:.2f}ms" for name, stats in results[case].items() if isinstance(stats, dict)
+        ))
+    return results
+
+
+def _timed_run(at):
+    start = time.perf_counter()
+    at.run()
+    elapsed = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(f"App raised during the benchmark: {at.exception[0].value}")
+    return elapsed
+
+
+def _indicator_box(at):
+    return next(box for box in at.selectbox if box.label == "Select Technical Indicator")
+
+
+def e2e_benchmarks(repeat=REPEAT, timeout=120):
+    """Time full reruns of main() and render() through Streamlit's AppTest"""
+    from streamlit.testing.v1 import AppTest
+
+    results = {}
+    at = AppTest.from_file(os.path.join(REPO_ROOT, "app", "main.py"), default_timeout=timeout)
+    results["main_cold"] = _summary([_timed_run(at)])
+    results["main_rerun"] = _summary([_timed_run(at) for _ in range(repeat)])
+
+    # Moving the days slider between two windows (the first visit of each window fetches it)
+    times = []
+    for i in range(repeat):
+        at.sidebar.select_slider[0].set_value(365 if i % 2 == 0 else 30)
+        times.append(_timed_run(at))
+    results["main_days_change"] = _summary(times)
+
+    # Switching between the Overview and Ripple sections
+    tabs = at.radio(key="active_tab").options
+    times = []
+    for i in range(repeat):
+        at.radio(key="active_tab").set_value(tabs[(i + 1) % len(tabs)])
+        times.append(_timed_run(at))
+    results["main_tab_switch"] = _summary(times)
+
+    # Switching the technical indicator of the Ripple tab (AppTest reruns the whole script for it)
+    at.radio(key="active_tab").set_value(tabs[1])
+    _timed_run(at)
+    options = _indicator_box(at).options
+    times = []
+    for i in range(repeat):
+        _indicator_box(at).set_value(options[(i + 1) % len(options)])
+        times.append(_timed_run(at))
+    results["main_indicator_change"] = _summary(times)
+
+    # The Ripple tab on its own, then changing its date
+    at = AppTest.from_string(RENDER_SCRIPT, default_timeout=timeout)
+    results["render_cold"] = _summary([_timed_run(at)])
+    results["render_rerun"] = _summary([_timed_run(at) for _ in range(repeat)])
+    today = datetime.now().date()
+    times = []
+    for i in range(repeat):
+        at.date_input[0].set_value(today - timedelta(days=i % 2 + 1))
+        times.append(_timed_run(at))
+    results["render_date_change"] = _summary(times)
+
+    for name, stats in results.items():
+        print(f"{name:>22}  median={stats['median_ms']:.1f}ms  max={stats['max_ms']:.1f}ms")
+    return results
+
+
+def memory_benchmark(sessions=8, days=365, timeout=120):
+    """
+    Memory held per Streamlit session: open 'sessions' sessions on the same history and keep them alive.
+
+    Each session shows the Overview for 'days' days, then the Ripple tab. Returns the traced Python
+    heap after every session; the growth per extra session is what concurrent viewers cost.
+    """
+    import gc
+    import tracemalloc
+
+    from streamlit.testing.v1 import AppTest
+
+    apps, held = [], []
+    tracemalloc.start()
+    for _ in range(sessions):
+        at = AppTest.from_file(os.path.join(REPO_ROOT, "app", "main.py"), default_timeout=timeout)
+        _timed_run(at)
+        at.sidebar.select_slider[0].set_value(days)
+        _timed_run(at)
+        at.radio(key="active_tab").set_value(at.radio(key="active_tab").options[1])
+        _timed_run(at)
+        apps.append(at)
+        gc.collect()
+        held.append(tracemalloc.get_traced_memory()[0])
+    tracemalloc.stop()
+
+    # The first session also pays for the shared data, the following ones only for themselves
+    growth = [after - before for before, after in zip(held, held[1:])]
+    result = {
+        "sessions": sessions,
+        "days": days,
+        "held_bytes": held,
+        "first_session_bytes": held[0],
+        "per_session_bytes": statistics.median(growth) if growth else None,
+    }
+    print(f"{'memory':>22}  first={held[0] / 1e6:.2f}MB  per extra session={(result['per_session_bytes'] or 0) / 1e6:.2f}MB")
+    return result
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(args):
+    from importlib.metadata import PackageNotFoundError, version
+
+    packages = {}
+    for name in ("pandas", "numpy", "plotly", "streamlit", "pyarrow"):
+        try:
+            packages[name] = version(name)
+        except PackageNotFoundError:
+            packages[name] = None
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "packages": packages,
+        "stub_data": stub.data_source(),
+        "latency_s": args.latency,
+        "repeat": args.repeat,
+    }
+
+
+def _medians(results):
+    """Flatten a results file into {"section/case/bench": median_ms}"""
+    medians = {}
+    for name, stats in results.get("e2e", {}).items():
+        medians[f"e2e/{name}"] = stats["median_ms"]
+    for case, benches in results.get("micro", {}).items():
+        for name, stats in benches.items():
+            if isinstance(stats, dict):
+                medians[f"micro/{case}/{name}"] = stats["median_ms"]
+    return medians
+
+
+def compare(baseline, results, ratio=REGRESSION_RATIO):
+    """Print the change of every median against a baseline run, return the regressed benchmarks"""
+    before, after = _medians(baseline), _medians(results)
+    regressions = []
+    print(f"\nAgainst {baseline['meta'].get('commit')} (regression above x{ratio}):")
+    if baseline["meta"].get("stub_data", "synthetic") != results["meta"]["stub_data"]:
+        print(f"Warning: the baseline ran on {baseline['meta'].get('stub_data', 'synthetic')} stub data, this run on {results['meta']['stub_data']}")
+    for name in sorted(before.keys() & after.keys()):
+        change = after[name] / before[name] if before[name] else float("inf")
+        flag = ""
+        if change > ratio:
+            regressions.append(name)
+            flag = "  <-- regression"
+        print(f"{name:>45}  {before[name]:9.2f}ms -> {after[name]:9.2f}ms  x{change:.2f}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard against the local stub server")
+    parser.add_argument("--latency", type=float, default=stub.DEFAULT_LATENCY, help="Stub latency per response in seconds")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="Timed repetitions of every benchmark")
+    parser.add_argument("--skip-micro", action="store_true", help="Only run the end-to-end timings")
+    parser.add_argument("--skip-e2e", action="store_true", help="Only run the micro-benchmarks")
+    parser.add_argument("--sessions", type=int, default=0, help="Also measure the memory of this many concurrent sessions")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Keep a Coingecko limit (calls per minute)")
+    parser.add_argument("--output", help="Results file (defaults to benchmarks/results/<commit>.json)")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    server = stub.start(latency=args.latency)
+    configure(f"http://127.0.0.1:{server.server_port}", tempfile.mkdtemp(prefix="xrp-bench-"), args.rate_limit)
+
+    results = {"meta": metadata(args)}
+    if not args.skip_micro:
+        results["micro"] = micro_benchmarks(args.repeat)
+    if not args.skip_e2e:
+        results["e2e"] = e2e_benchmarks(args.repeat)
+    if args.sessions:
+        results["memory"] = memory_benchmark(args.sessions)
+    server.shutdown()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{results['meta']['commit'] or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), results)
+        sys.exit(1 if regressions else 0)
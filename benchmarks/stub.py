@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+import numpy as np
+
+# Optional local recordings (python -m benchmarks.stub record): <coin>_<granularity>.json (market_chart
+# responses) and predict_ripple.json. They are not committed; without them the stub serves seeded random walks
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+DAY_MS = 24 * 60 * 60 * 1000
+# Point spacing and length of the series replayed for each granularity (the longest window Coingecko serves at it)
+STEP_MS = {"5m": 5 * 60 * 1000, "hourly": 60 * 60 * 1000, "daily": DAY_MS}
+RECORD_DAYS = {"5m": 1, "hourly": 90, "daily": 365}
+
+# Default added latency of every response in seconds (roughly a Coingecko round-trip)
+DEFAULT_LATENCY = 0.2
+
+_series = {}
+_series_lock = threading.Lock()
+
+
+def granularity_for_span(span_ms):
+    """Granularity Coingecko answers a window of this length with"""
+    if span_ms <= DAY_MS:
+        return "5m"
+    if span_ms <= 90 * DAY_MS:
+        return "hourly"
+    return "daily"
+
+
+def _synthetic(coin_id, granularity):
+    """Seeded random walk standing in for a recording that has not been made"""
+    n = RECORD_DAYS[granularity] * DAY_MS // STEP_MS[granularity]
+    rng = np.random.default_rng(zlib.crc32(f"{coin_id}/{granularity}".encode()))
+    base = 10 ** rng.uniform(-1, 4)
+    prices = base * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    volumes = base * 1e9 * rng.lognormal(0, 0.3, n)
+    market_caps = prices * 5e10
+    return prices, volumes, market_caps
+
+
+def data_source():
+    """'recorded' when local recordings are replayed, 'synthetic' (the default) otherwise"""
+    recorded = os.path.isdir(FIXTURE_DIR) and any(name.endswith(".json") for name in os.listdir(FIXTURE_DIR))
+    return "recorded" if recorded else "synthetic"
+
+
+def series(coin_id, granularity):
+    """Recorded (or synthetic) price, volume and market cap values replayed for a coin"""
+    with _series_lock:
+        if (coin_id, granularity) not in _series:
+            path = os.path.join(FIXTURE_DIR, f"{coin_id}_{granularity}.json")
+            if os.path.exists(path):
+                with open(path) as f:
+                    data = json.load(f)
+                _series[(coin_id, granularity)] = tuple(
+                    np.array([value for _, value in data[key]], dtype=np.float64)
+                    for key in ("prices", "total_volumes", "market_caps")
+                )
+            else:
+                _series[(coin_id, granularity)] = _synthetic(coin_id, granularity)
+        return _series[(coin_id, granularity)]
+
+
+def market_chart(coin_id, start_ms, end_ms, granularity=None):
+    """
+    Payload of market_chart/range for a window.
+
+    Timestamps follow the granularity Coingecko would pick for the window length unless one is given.
+    The recorded values are replayed by timestamp, so overlapping windows always agree on shared points.
+    """
+    granularity = granularity or granularity_for_span(end_ms - start_ms)
+    step = STEP_MS[granularity]
+    ts = np.arange(start_ms - start_ms % step + step, end_ms + 1, step, dtype=np.int64)
+    positions = (ts // step) % len(series(coin_id, granularity)[0])
+    return {
+        key: [[int(t), float(v)] for t, v in zip(ts, values[positions])]
+        for key, values in zip(("prices", "total_volumes", "market_caps"), series(coin_id, granularity))
+    }
+
+
+def markets(coin_ids, now_ms):
+    """Payload of /coins/markets built from the last day of each coin's hourly series"""
+    rows = []
+    for coin_id in coin_ids:
+        data = market_chart(coin_id, now_ms - 2 * DAY_MS, now_ms)
+        prices = np.array(data["prices"])[-24:, 1]
+        rows.append({
+            "id": coin_id,
+            "symbol": coin_id[:4],
+            "name": coin_id.title(),
+            "current_price": prices[-1],
+            "price_change_percentage_24h": (prices[-1] / prices[0] - 1) * 100,
+            "high_24h": prices.max(),
+            "low_24h": prices.min(),
+            "market_cap": data["market_caps"][-1][1],
+            "total_volume": data["total_volumes"][-1][1],
+            "last_updated": datetime.fromtimestamp(now_ms / 1000, timezone.utc).isoformat(),
+        })
+    return rows
+
+
+def prediction(date):
+    """Payload of /predict/ripple: the recorded one with the dates moved to the request"""
+    path = os.path.join(FIXTURE_DIR, "predict_ripple.json")
+    if os.path.exists(path):
+        with open(path) as f:
+            payload = json.load(f)
+    else:
+        payload = {"prediction": {"prediction": 0.6}}
+    predicted_date = datetime.strptime(date, "%Y-%m-%d") + timedelta(days=1)
+    payload["prediction"]["predicted_date"] = predicted_date.strftime("%Y-%m-%d")
+    return payload
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers the Coingecko and model endpoints used by the dashboard"""
+
+    latency = DEFAULT_LATENCY
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = dict(parse_qsl(url.query))
+        parts = url.path.rstrip("/").split("/")
+        now_ms = int(time.time() * 1000)
+
+        if url.path.endswith("/market_chart/range"):
+            body = market_chart(parts[-3], int(query["from"]) * 1000, int(query["to"]) * 1000)
+        elif url.path.endswith("/market_chart"):
+            body = market_chart(parts[-2], now_ms - int(float(query["days"]) * DAY_MS), now_ms)
+        elif url.path.endswith("/coins/markets"):
+            body = markets(query["ids"].split(","), now_ms)
+        elif url.path.endswith("/predict/ripple"):
+            body = prediction(query["date"])
+        else:
+            self.send_error(404)
+            return
+
+        payload = json.dumps(body).encode()
+        time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start(port=0, latency=DEFAULT_LATENCY):
+    """Serve the stub on a background thread, return the server (its port is server.server_port)"""
+    handler = type("Handler", (StubHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def record(coin_ids, model_url=None):
+    """Save live Coingecko payloads (and a model answer) as fixtures for every granularity"""
+    from app import config, http_client
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    headers = {"x-cg-demo-api-key": config.COINGECKO_API_KEY}
+    for coin_id in coin_ids:
+        for granularity, days in RECORD_DAYS.items():
+            url = f"{config.COINGECKO_API_BASE}/coins/{coin_id}/market_chart"
+            response = http_client.get("coingecko", url, params={"vs_currency": "usd", "days": days}, headers=headers)
+            response.raise_for_status()
+            with open(os.path.join(FIXTURE_DIR, f"{coin_id}_{granularity}.json"), "w") as f:
+                f.write(response.text)
+            print(f"Recorded {coin_id} {granularity} ({len(response.json()['prices'])} points)")
+
+    date = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    response = http_client.get("model", model_url or config.MODEL_API_URL, params={"date": date})
+    response.raise_for_status()
+    with open(os.path.join(FIXTURE_DIR, "predict_ripple.json"), "w") as f:
+        f.write(response.text)
+    print("Recorded predict_ripple")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Coingecko / model stub for benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="Serve the synthetic series (or the local recordings) over HTTP")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="Added latency per response in seconds")
+    record_parser = subparsers.add_parser("record", help="Record live payloads into benchmarks/fixtures (replayed instead of the synthetic series)")
+    record_parser.add_argument("coins", nargs="*", default=["ripple"], help="Coingecko ids to record")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.coins)
+    else:
+        server = start(args.port, args.latency)
+        print(f"Stub serving on http://127.0.0.1:{server.server_port} with {args.latency:.3f}s latency")
+        print(f"COINGECKO_API_BASE=http://127.0.0.1:{server.server_port} "
+              f"XRP_MODEL_API_URL=http://127.0.0.1:{server.server_port}/predict/ripple")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
@@ -2,156 +2,177 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-import requests
+from concurrent.futures import wait
 from datetime import datetime, timedelta
 
-# Coingecko API URL for price/volume data
-COINGECKO_API_URL = "https://api.coingecko.com/api/v3/coins/ripple/market_chart/range"
-# Model Prediction API URL
-MODEL_URL = "https://fastapi-25548684-at3-latest.onrender.com/predict/ripple"
+from app import backtest, cache, charts, config, fetch_stage, frames, http_client, indicators, inference, market_store, rollup, tracing
 
-def fetch_ripple_data(date, days_before = 29):
-    # Define the vs_currency
-    vs_currency="usd"
+# Model Prediction API URL
+MODEL_URL = config.MODEL_API_URL
+
+# Session state key of the analysis date picker
+DATE_KEY = "ripple_selected_date"
+# Session state key of the technical indicator selectbox
+INDICATOR_KEY = "ripple_indicator"
+# Number of past days that can be selected in the date picker
+DATE_RANGE_DAYS = 335
+
+# Session state key and choices of the history length shown before the date (days before it);
+# only the ones within the API key's history limit (config.COINGECKO_HISTORY_DAYS) are offered
+HISTORY_KEY = "ripple_history"
+HISTORY_OPTIONS = {"30 days": 29, "1 year": 364, "2 years": 729, "3 years": 1094}
+# Daily bars are aggregated from hourly points whatever the history length; long histories are
+# fetched as 90-day hourly windows in parallel and stored, so only new days are requested afterwards
+BAR_GRANULARITY = "hourly"
+# Seconds between two redraws of the partial price chart while a long history loads
+STREAM_INTERVAL = 0.5
+
+# Parts of the tab that rerun on their own (st.fragment is st.experimental_fragment before Streamlit 1.37)
+fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
+# Cache lifetime of a date: past days do not change any more, the current day gets new hourly candles
+def date_ttl(date, **kwargs):
+    return 24 * 60 * 60 if date < datetime.now().strftime("%Y-%m-%d") else 60 * 60
+
+# Function to build the daily bars of a window from the shared rollup (not cached, see fetch_ripple_data)
+def ripple_bars(date, days_before = 29):
+    # Define the coin id
     id = "ripple"
-    # Convert input date
-    target_date = datetime.strptime(date, "%Y-%m-%d")
-    start_date = target_date - timedelta(days = days_before) 
-    
-    # Convert to UNIX timestamps (seconds)
-    start_ts = int(start_date.timestamp())
-    end_ts = int((target_date + timedelta(days=1)).timestamp())
-
-    # Make the API request
-    headers = {"x-cg-demo-api-key": "CG-vwVud1BDECZZ8XoTFsN4RGhJ"}
-    params = {
-        "vs_currency": vs_currency,
-        "from": start_ts,
-        "to": end_ts
-    }
-    response = requests.get(COINGECKO_API_URL, headers=headers, params=params)
+    # Window from 'days_before' days before the date to the end of the date (UNIX milliseconds)
+    start_ms, end_ms = market_store.window_bounds(date, days_before)
 
-    # Check for error response
-    if response.status_code != 200:
-        raise Exception(f"Error fetching data from CoinGecko: {response.status_code}")
-    
-    # Fetch and process data
-    data = response.json()
-
-    # Convert lists to DataFrames
-    prices = pd.DataFrame(data.get("prices", []), columns=["timestamp", "price"])
-    volumes = pd.DataFrame(data.get("total_volumes", []), columns=["timestamp", "volume"])
-    market_caps = pd.DataFrame(data.get("market_caps", []), columns=["timestamp", "marketCap"])
-
-     # Merge into one DataFrame
-    df = prices.merge(volumes, on="timestamp").merge(market_caps, on="timestamp")
-
-    # Convert timestamp to datetime and set timezone to Australia/Sydney
-    df["timestamp"] = pd.to_datetime(df['timestamp'], unit='ms', utc=True)
-    df['timestamp'] = df['timestamp'].dt.tz_convert('Australia/Sydney')
-    
-    # Resample to daily OHLCVM
-    df_daily = df.set_index("timestamp").resample("1D").agg({
-        "price": ["first", "max", "min", "last"],
-        "volume": "sum",
-        "marketCap": "mean"
-    })
-
-    # Flatten MultiIndex columns
-    df_daily.columns = ["open", "high", "low", "close", "volume", "marketCap"]
-    df_daily = df_daily.reset_index()
-        
+    # Daily OHLCVM bars in Australia/Sydney time from the shared rollup (only new points are read from the store)
+    df_daily = rollup.load_bars(id, start_ms, end_ms, BAR_GRANULARITY, "1D", tz=rollup.TIMEZONE)
     return df_daily
 
+@tracing.traced("fetch_ripple_data")
+@cache.cached("ripple_data", ttl=date_ttl, maxsize=64, stale=config.STALE_SECONDS)
+def fetch_ripple_data(date, days_before = 29):
+    return ripple_bars(date, days_before)
+
 # Function to calculate Relative Strength Index (RSI)
-def calculate_rsi(prices, period=14):
+def calculate_rsi(prices, period=indicators.DASHBOARD_RSI_PERIOD):
     """Calculate Relative Strength Index"""
-    # Calculate price changes
-    delta = prices.diff()
-    # Separate gains and losses
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    # Calculate RSI
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    # Rolling means of gains and losses from the shared indicator engine (same values as pandas rolling)
+    rsi = indicators.RSI(period).batch(prices.to_numpy())
+    return pd.Series(rsi, index=prices.index, name=prices.name)
 
 # Function to calculate Moving Average Convergence Divergence (MACD)
-def calculate_macd(prices, fast=12, slow=26, signal=9):
+def calculate_macd(prices, fast=indicators.DASHBOARD_MACD_SPANS[0], slow=indicators.DASHBOARD_MACD_SPANS[1], signal=indicators.DASHBOARD_MACD_SPANS[2]):
     """Calculate MACD indicator"""
-    # Calculate EMAs - Exponential Moving Averages
-    exp1 = prices.ewm(span=fast, adjust=False).mean()
-    exp2 = prices.ewm(span=slow, adjust=False).mean()
-    # Calculate MACD line and Signal line
-    macd = exp1 - exp2
-    signal_line = macd.ewm(span=signal, adjust=False).mean()
-    # Plot MACD Histogram
-    histogram = macd - signal_line
-    return macd, signal_line, histogram
+    # Fast/slow/signal EMAs from the shared indicator engine (same values as pandas ewm)
+    macd, signal_line, histogram = indicators.MACD(fast, slow, signal).batch(prices.to_numpy())
+    return (
+        pd.Series(macd, index=prices.index, name=prices.name),
+        pd.Series(signal_line, index=prices.index, name=prices.name),
+        pd.Series(histogram, index=prices.index, name=prices.name),
+    )
+
+# Function to build the tab's frame once per date for all sessions: daily bars plus indicator columns
+@tracing.traced("fetch_ripple_analysis")
+@cache.cached("ripple_analysis", ttl=date_ttl, maxsize=64, stale=config.STALE_SECONDS)
+def fetch_ripple_analysis(date, days_before = 29):
+    """Daily bars of the date with RSI/MACD columns, as a read-only frame shared by every session"""
+    df_daily = fetch_ripple_data(date, days_before = days_before)
+    if df_daily is None or df_daily.empty:
+        return df_daily
+
+    with tracing.span("ripple.indicators"):
+        macd, signal, histogram = calculate_macd(df_daily['close'])
+        # Bars keep float64 (the prediction delta is shown to 3 decimals), derived columns are float32
+        columns = {name: frames.column_values(df_daily, name) for name in df_daily.columns}
+        columns.update({
+            'RSI': frames.compact(calculate_rsi(df_daily['close'])),
+            'MACD': frames.compact(macd),
+            'Signal': frames.compact(signal),
+            'MACD_Histogram': frames.compact(histogram),
+        })
+    return frames.view(columns)
 
 # Function to fetch model prediction
+@tracing.traced("fetch_model_prediction")
+@cache.cached("model_prediction", ttl=date_ttl, maxsize=512, stale=config.STALE_SECONDS)
 def fetch_model_prediction(date):
-    """Fetch model prediction for Ripple high price on given date"""
-    try:
-        params = {"date": date}
-        response = requests.get(MODEL_URL, params=params)
-        if response.status_code != 200:
-            return None
-        return response.json()["prediction"]
-    except Exception as e:
-        st.error(f"Exception during model prediction fetch: {e}")
+    """Fetch model prediction for Ripple high price on given date (errors are raised to the caller)"""
+    # Local mode runs the exported model in this process on the same daily frame the tab shows. The bars are
+    # sliced from the rollup without going through fetch_ripple_data's cache, so warming the predictions of
+    # every date does not evict the windows the tab has loaded
+    if config.INFERENCE_MODE == "local":
+        return inference.predict(date, ripple_bars(date, days_before = 29))
+
+    params = {"date": date}
+    response = http_client.get("model", MODEL_URL, params=params)
+    if response.status_code != 200:
         return None
+    return response.json()["prediction"]
+
+# Cache lifetime of a window of predictions: the one of its last date
+def window_ttl(start_date, end_date):
+    return date_ttl(end_date)
+
+# Function to fetch the predictions of a whole window from the prediction service (api/) in one call
+@tracing.traced("fetch_prediction_window")
+@cache.cached("prediction_window", ttl=window_ttl, maxsize=16, stale=config.STALE_SECONDS)
+def fetch_prediction_window(start_date, end_date):
+    """Predicted next-day highs of every date from start_date to end_date as a frame (None on an error status)"""
+    url = f"{config.PREDICTION_SERVICE_URL.rstrip('/')}/predict/ripple/range"
+    response = http_client.get("prediction_service", url, params={"start": start_date, "end": end_date})
+    if response.status_code != 200:
+        return None
+    return pd.DataFrame(response.json()["predictions"])
+
+# Function to read the stored walk-forward backtest (written by `python -m app.backtest`)
+@cache.cached("backtest_results", ttl=5 * 60, maxsize=1)
+def load_backtest():
+    """Load the backtest results of the Ripple model, None if no backtest has been run"""
+    return backtest.load_results("ripple")
+
+# Warm-up jobs (run by app.scheduler in the background, never by a session)
+def warm_latest():
+    """Load today's bars and indicators, and today's prediction, if they are missing or expired"""
+    date = datetime.now().strftime("%Y-%m-%d")
+    fetch_ripple_analysis.warm(date)
+    fetch_model_prediction.warm(date)
+    return f"Ripple {date}"
+
+def warm_predictions():
+    """Precompute the prediction of every date the date picker offers, newest first"""
+    today = datetime.now().date()
+    refreshed, failed = 0, 0
+    for offset in range(DATE_RANGE_DAYS + 1):
+        date = (today - timedelta(days = offset)).strftime("%Y-%m-%d")
+        try:
+            if fetch_model_prediction.warm(date):
+                refreshed += 1
+        except Exception:
+            # One failing date must not stop the others; it is retried on the next run
+            failed += 1
+    return f"{refreshed} refreshed, {failed} failed of {DATE_RANGE_DAYS + 1} dates"
+
+# Function to start the network calls of the tab in the background
+def start_fetches(selected_date, days_before):
+    """Start the market data and model prediction requests for the selected date and history length"""
+    date = selected_date.strftime("%Y-%m-%d")
+    start_date = (selected_date - timedelta(days = days_before)).strftime("%Y-%m-%d")
+    return {
+        "market": fetch_stage.submit(fetch_ripple_analysis, date, days_before = days_before),
+        # The model always predicts from the 30-day window it was trained on
+        "prediction": fetch_stage.submit(fetch_model_prediction, date),
+        # Predictions of every date shown, only when a prediction service is configured
+        "window": fetch_stage.submit(fetch_prediction_window, start_date, date) if config.PREDICTION_SERVICE_URL else None,
+    }
 
-# Main rendering function
-def render():
-    st.title("Ripple (XRP) Price Analysis and Prediction")
-    # Date picker
-    max_date = datetime.now()
-    min_date = max_date - timedelta(days = 335)
-    selected_date = st.date_input("Select a date for analysis (Optional - By Default it shows the current)", max_value=max_date, min_value=min_date)
-
-    # Check if date is within allowed range
-    if not (min_date.date() <= selected_date <= max_date.date()):
-        st.error(f"Please select a date within the allowed range: {min_date.date()} to {max_date.date()}.")
-        return  # Stop rendering if out of range
-
-    # Fetch data
-    with st.spinner("Fetching Ripple data..."):
-        df = fetch_ripple_data(selected_date.strftime("%Y-%m-%d"), days_before = 29)
-
-    if df is not None and not df.empty:
-                
-        st.markdown("---")
-
-        # Display header and metrics
-        st.markdown(f"### Technical Analysis for Ripple (XRP) up to {selected_date.strftime('%Y-%m-%d')}")
-
-        # Display key metrics
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Time Range", f"{len(df['timestamp'])} days")
-        with col2:
-            st.metric("Latest Price (USD)", f"${df['close'].iloc[-1]:,.2f}")
-        with col3:
-            st.metric("Period High (USD)", f"${df['high'].max():,.2f}")
-        with col4:
-            st.metric("Period Low (USD)", f"${df['low'].min():,.2f}")
-
-        st.markdown("---")
-
-        # Technical Indicators
-        st.subheader("📊 Technical Indicators")
-
-        # Calculate indicators
-        df['RSI'] = calculate_rsi(df['close'])
-        df['MACD'], df['Signal'], df['MACD_Histogram'] = calculate_macd(df['close'])
-
-        # Indicator selection
-        indicator = st.selectbox(
-            "Select Technical Indicator",
-            ["RSI (Relative Strength Index)", "MACD", "Candlestick Chart"]
-        )
-
+# Function to render the selected technical indicator (reruns on its own when the selectbox changes)
+@fragment
+def render_indicator(df):
+    """Draw the selected indicator from the already computed RSI/MACD columns of df"""
+    indicator = st.selectbox(
+        "Select Technical Indicator",
+        ["RSI (Relative Strength Index)", "MACD", "Candlestick Chart"],
+        key=INDICATOR_KEY
+    )
+
+    with tracing.span("ripple.indicator_chart", indicator=indicator):
         if indicator == "RSI (Relative Strength Index)":
             st.markdown("**RSI Analysis** - Measures momentum on a scale of 0-100")
             st.markdown("- **Above 70:** Overbought (potential sell signal)")
@@ -159,7 +180,7 @@ def render():
 
             fig_rsi = go.Figure()
             # Add RSI line
-            fig_rsi.add_trace(go.Scatter(x=df['timestamp'], y=df['RSI'], mode='lines', name='RSI'))
+            fig_rsi.add_trace(charts.line_trace(df['timestamp'], df['RSI'], mode='lines', name='RSI'))
 
              # Add overbought/oversold lines
             fig_rsi.add_hline(y=70, line_dash="dash", line_color="red", annotation_text="Overbought")
@@ -191,11 +212,11 @@ def render():
 
             fig_macd = go.Figure()
             # Add MACD and Signal lines
-            fig_macd.add_trace(go.Scatter(x=df['timestamp'], y=df['MACD'], mode='lines', name='MACD'))
-            fig_macd.add_trace(go.Scatter(x=df['timestamp'], y=df['Signal'], mode='lines', name='Signal Line'))
+            fig_macd.add_trace(charts.line_trace(df['timestamp'], df['MACD'], mode='lines', name='MACD'))
+            fig_macd.add_trace(charts.line_trace(df['timestamp'], df['Signal'], mode='lines', name='Signal Line'))
 
             # Add MACD Histogram
-            fig_macd.add_trace(go.Bar(x=df['timestamp'], y=df['MACD_Histogram'], name='MACD Histogram'))
+            fig_macd.add_trace(charts.bar_trace(df['timestamp'], df['MACD_Histogram'], name='MACD Histogram'))
 
             # Update layout
             fig_macd.update_layout(
@@ -235,6 +256,107 @@ def render():
                 height=500
             )
             st.plotly_chart(fig_candle, use_container_width=True)
+
+# Function to list the history lengths the API key can serve for a date
+def history_options(selected_date):
+    """Labels of HISTORY_OPTIONS whose window starts within the key's history limit (the shortest is always kept)"""
+    days_back = (datetime.now().date() - selected_date).days
+    labels = [label for label, days_before in HISTORY_OPTIONS.items() if days_back + days_before < config.COINGECKO_HISTORY_DAYS]
+    return labels or [next(iter(HISTORY_OPTIONS))]
+
+# Function to wait for the tab's frame while showing the part of a long history already stored
+def stream_history(future, selected_date, days_before):
+    """Return (frame, error) of the market future; until it is done, redraw the stored closes every STREAM_INTERVAL"""
+    start_ms, end_ms = market_store.window_bounds(selected_date.strftime("%Y-%m-%d"), days_before)
+    placeholder = st.empty()
+    shown = None
+    while not wait([future], timeout=STREAM_INTERVAL).done:
+        # Only redraw when another chunk has been stored
+        progress = market_store.load_progress("ripple", BAR_GRANULARITY)
+        if progress is None or progress == shown:
+            continue
+        shown = progress
+        points = market_store.read_stored("ripple", start_ms, end_ms, BAR_GRANULARITY)
+        with placeholder.container():
+            done, total = progress
+            st.progress(done / total, text=f"Loading Ripple history: {done} of {total} chunks")
+            if not points.empty:
+                fig_partial = go.Figure()
+                fig_partial.add_trace(charts.line_trace(pd.to_datetime(points['timestamp'], unit='ms'), points['price'], mode='lines', name='Price (USD)'))
+                fig_partial.update_layout(title="Price (loading)", template='plotly_dark', height=300)
+                st.plotly_chart(fig_partial, use_container_width=True, key=f"ripple_partial_{done}")
+    placeholder.empty()
+    return fetch_stage.resolve(future)
+
+# Main rendering function
+@tracing.traced("render")
+def render():
+    st.title("Ripple (XRP) Price Analysis and Prediction")
+    # Date picker
+    max_date = datetime.now()
+    min_date = max_date - timedelta(days = DATE_RANGE_DAYS)
+    selected_date = st.date_input("Select a date for analysis (Optional - By Default it shows the current)", max_value=max_date, min_value=min_date, key=DATE_KEY)
+
+    # Check if date is within allowed range
+    if not (min_date.date() <= selected_date <= max_date.date()):
+        st.error(f"Please select a date within the allowed range: {min_date.date()} to {max_date.date()}.")
+        return  # Stop rendering if out of range
+
+    # History shown before the date (the first visit of a long history fetches it in parallel chunks)
+    options = history_options(selected_date)
+    if st.session_state.get(HISTORY_KEY, options[0]) not in options:
+        # The chosen history reaches past the key's limit for this date: use the longest one that fits
+        st.session_state[HISTORY_KEY] = options[-1]
+    history = st.select_slider("History", options=options, key=HISTORY_KEY)
+    if len(options) < len(HISTORY_OPTIONS):
+        st.caption(f"Longer histories need a CoinGecko key with more than {config.COINGECKO_HISTORY_DAYS} days of history (XRP_COINGECKO_HISTORY_DAYS).")
+    days_before = HISTORY_OPTIONS[history]
+
+    # Start every request of the tab now, so they run while the earlier ones are drawn
+    fetches = start_fetches(selected_date, days_before)
+
+    # Wait for the market data, drawing what is already stored while a long history loads
+    with tracing.span("ripple.wait"), st.spinner("Fetching Ripple data..."):
+        df, error = stream_history(fetches["market"], selected_date, days_before)
+
+    if error is not None:
+        st.error(f"Error fetching Ripple data: {error}")
+
+    if df is not None and not df.empty:
+        # df is the read-only frame shared by all sessions (indicators included), it is not copied per session
+
+        st.markdown("---")
+
+        # Display header and metrics
+        st.markdown(f"### Technical Analysis for Ripple (XRP) up to {selected_date.strftime('%Y-%m-%d')}")
+
+        # Freshness of the bars: last daily candle and when they were computed (expired data is shown while it refreshes)
+        freshness = fetch_ripple_analysis.freshness(selected_date.strftime("%Y-%m-%d"), days_before)
+        if freshness is not None:
+            loaded_at, stale = freshness
+            st.caption(
+                f"🕒 Data as of {df['timestamp'].iloc[-1]:%Y-%m-%d} ({rollup.TIMEZONE}) · fetched {cache.describe_age(loaded_at)}"
+                + (" · refreshing in the background" if stale else "")
+            )
+
+        # Display key metrics
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Time Range", f"{len(df['timestamp'])} days")
+        with col2:
+            st.metric("Latest Price (USD)", f"${df['close'].iloc[-1]:,.2f}")
+        with col3:
+            st.metric("Period High (USD)", f"${df['high'].max():,.2f}")
+        with col4:
+            st.metric("Period Low (USD)", f"${df['low'].min():,.2f}")
+
+        st.markdown("---")
+
+        # Technical Indicators
+        st.subheader("📊 Technical Indicators")
+
+        # Indicator selection and chart (switching the indicator only reruns this part)
+        render_indicator(df)
         
         st.markdown("---")
 
@@ -242,24 +364,25 @@ def render():
         st.subheader("📈 Volume Analysis")
 
         # Color volume bars based on price movement
-        colors = ['green' if df['close'].iloc[i] >= df['open'].iloc[i] else 'red' for i in range(len(df))]
-
-        fig_volume = go.Figure()
-        fig_volume.add_trace(go.Bar(
-            x=df['timestamp'], 
-            y=df['volume'], 
-            name='Volume (USD)',
-            marker_color = colors
-        ))
-        fig_volume.update_layout(
-            title="Trading Volume Over Time",
-            xaxis_title="Date",
-            yaxis_title="Volume (USD)",
-            hovermode="x unified",
-            template='plotly_dark',
-            height=400
-        )
-        st.plotly_chart(fig_volume, use_container_width=True)
+        with tracing.span("ripple.volume_chart"):
+            colors = charts.up_down_colors(df['open'], df['close'])
+
+            fig_volume = go.Figure()
+            fig_volume.add_trace(charts.bar_trace(
+                df['timestamp'], 
+                df['volume'], 
+                name='Volume (USD)',
+                marker_color = colors
+            ))
+            fig_volume.update_layout(
+                title="Trading Volume Over Time",
+                xaxis_title="Date",
+                yaxis_title="Volume (USD)",
+                hovermode="x unified",
+                template='plotly_dark',
+                height=400
+            )
+            st.plotly_chart(fig_volume, use_container_width=True)
 
         # Volume statistics
         col1, col2, col3, col4 = st.columns(4)
@@ -277,8 +400,11 @@ def render():
         # Prediction
         st.subheader("🤖 Price(High) Prediction")
 
-        # Get the prediction for high on day + 1
-        prediction_high = fetch_model_prediction(selected_date.strftime("%Y-%m-%d"))
+        # Get the prediction for high on day + 1 (requested in parallel with the market data)
+        with tracing.span("ripple.prediction_wait"):
+            prediction_high, error = fetch_stage.resolve(fetches["prediction"])
+        if error is not None:
+            st.error(f"Exception during model prediction fetch: {error}")
         if prediction_high:
             # Display predictions
             col1, col2 = st.columns(2)
@@ -294,6 +420,80 @@ def render():
         
         st.markdown("---")
 
+        # Predicted vs actual highs of every date shown (one call to the prediction service)
+        if fetches["window"] is not None:
+            st.subheader("🎯 Predicted vs Actual High")
+
+            with tracing.span("ripple.window_wait"):
+                df_window, error = fetch_stage.resolve(fetches["window"])
+            if error is not None:
+                st.error(f"Error fetching the window's predictions: {error}")
+            elif df_window is None or df_window.empty:
+                st.warning("Window predictions unavailable")
+            else:
+                with tracing.span("ripple.window_chart"):
+                    # Predictions are drawn on the day they predict, in the bars' time zone
+                    predicted_at = pd.to_datetime(df_window["predicted_date"]).dt.tz_localize(rollup.TIMEZONE)
+
+                    fig_window = go.Figure()
+                    fig_window.add_trace(charts.line_trace(df['timestamp'], df['high'], mode='lines', name='Actual High'))
+                    fig_window.add_trace(charts.line_trace(predicted_at, df_window['prediction'], mode='lines', name='Predicted High'))
+                    fig_window.update_layout(
+                        title="Predicted vs Actual Next-Day High",
+                        xaxis_title="Date",
+                        yaxis_title="High (USD)",
+                        hovermode="x unified",
+                        template='plotly_dark',
+                        height=400
+                    )
+                    st.plotly_chart(fig_window, use_container_width=True)
+
+            st.markdown("---")
+
+        # Backtest
+        st.subheader("📉 Backtest (Walk-Forward)")
+
+        results = load_backtest()
+        if results is None or not results["rows"]:
+            st.info("No backtest results yet. Run `python -m app.backtest` to score the model over the date range.")
+        else:
+            # Display the accuracy over all scored dates
+            metrics = results["metrics"]
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Days Scored", metrics["days"])
+            with col2:
+                st.metric("RMSE (USD)", f"{metrics['rmse']:,.4f}")
+            with col3:
+                st.metric("MAPE", f"{metrics['mape']:.2f}%")
+            with col4:
+                st.metric("Hit Rate (Direction)", f"{metrics['hit_rate']:.1%}")
+
+            with tracing.span("ripple.backtest_chart"):
+                df_backtest = pd.DataFrame(results["rows"])
+                df_backtest["predicted_date"] = pd.to_datetime(df_backtest["predicted_date"])
+
+                fig_backtest = go.Figure()
+                fig_backtest.add_trace(charts.line_trace(df_backtest["predicted_date"], df_backtest["actual"], mode='lines', name='Actual High'))
+                fig_backtest.add_trace(charts.line_trace(df_backtest["predicted_date"], df_backtest["prediction"], mode='lines', name='Predicted High'))
+                # Mark the day predicted for the selected date
+                fig_backtest.add_vline(x=pd.Timestamp(selected_date + timedelta(days=1)), line_dash="dot", line_color="gray")
+                fig_backtest.update_layout(
+                    title="Predicted vs Actual Next-Day High",
+                    xaxis_title="Date",
+                    yaxis_title="High (USD)",
+                    hovermode="x unified",
+                    template='plotly_dark',
+                    height=400
+                )
+                st.plotly_chart(fig_backtest, use_container_width=True)
+
+            with st.expander("Accuracy per fold"):
+                st.dataframe(pd.DataFrame(results["folds"]), hide_index=True)
+            st.caption(f"Backtest generated {results['generated_at']}")
+
+        st.markdown("---")
+
         st.warning(
             "⚠️ Disclaimer: The information and predictions shown here are for educational purposes only. "
             "They **should not** be used for actual financial or investment decisions."
@@ -0,0 +1,21 @@
+import os
+
+import pandas as pd
+import pytest
+
+FIXTURE_CSV = os.path.join(os.path.dirname(__file__), "fixtures", "xrp_daily.csv")
+
+
+@pytest.fixture(scope="session")
+def history():
+    """240 synthetic daily XRP rows with a missing volume, a duplicated day and a volume spike"""
+    return pd.read_csv(FIXTURE_CSV)
+
+
+@pytest.fixture(scope="session")
+def notebook(history):
+    """The notebook's pipelines fitted on the fixture, as (cleaning, eng, transform, X_train, y_train)"""
+    pytest.importorskip("sklearn")
+    import notebook_pipeline
+
+    return notebook_pipeline.fit_pipelines(history)
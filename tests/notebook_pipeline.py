@@ -0,0 +1,223 @@
+"""
+The notebook's transformers and pipelines (36120-25SP-group17-25548684-AT3-experiment.ipynb),
+copied as-is so the tests can fit reference pipelines on the fixture instead of loading the pickles.
+"""
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler, OrdinalEncoder
+
+TARGET = "high_next_day"
+
+
+# Create a custom-transformer to handle null values
+class NumericImputerWrapper(BaseEstimator, TransformerMixin):
+    def __init__(self, features):
+        self.features = features
+        self.imputer = SimpleImputer(strategy="median")
+
+    def fit(self, X, y=None):
+        self.imputer.fit(X[self.features])
+        return self
+
+    def transform(self, X):
+        X_copy = X.copy()
+        X_copy[self.features] = self.imputer.transform(X_copy[self.features])
+        return X_copy
+
+
+# Create a custom-transformer to handle duplicates
+class CustomDuplicateHandler(BaseEstimator, TransformerMixin):
+    def __init__(self, reset_index=True):
+        self.reset_index = reset_index
+
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        if not isinstance(X, pd.DataFrame):
+            X = pd.DataFrame(X)
+        X_clean = X.drop_duplicates()
+        if self.reset_index:
+            X_clean = X_clean.reset_index(drop=True)
+        return X_clean
+
+
+# Create a custom-style transformer to handle outliers
+class OutlierHandler(BaseEstimator, TransformerMixin):
+    def __init__(self, features=None, factor=3.0):
+        self.features = features
+        self.factor = factor
+        self.bounds_ = {}
+
+    def fit(self, X, y=None):
+        X_df = pd.DataFrame(X)
+        feats = self.features if self.features is not None else X_df.columns
+
+        for feat in feats:
+            q1 = X_df[feat].quantile(0.25)
+            q3 = X_df[feat].quantile(0.75)
+            iqr = q3 - q1
+            lower = q1 - self.factor * iqr
+            upper = q3 + self.factor * iqr
+            self.bounds_[feat] = (lower, upper)
+        return self
+
+    def transform(self, X):
+        X_df = pd.DataFrame(X).copy()
+        for feat, (lower, upper) in self.bounds_.items():
+            X_df[feat] = np.clip(X_df[feat], lower, upper)
+        return X_df
+
+
+# Create a custom transformer to engineer the parkinson volatility
+class VolatilityBinEstimator(BaseEstimator, TransformerMixin):
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        X_copy = X.copy()
+        X_copy['volatility'] = (X_copy['high'] - X_copy['low']) / X_copy['close']
+        X_copy['volatility_bin'] = pd.cut(X_copy['volatility'], bins=[-np.inf, 0.02, 0.08, np.inf], labels=['low', 'medium', 'high'])
+        X_copy.drop(columns=['volatility'], inplace=True)
+        return X_copy
+
+
+# Create a custom transformer to engineer the daily return based on the closing prices
+class DailyReturnEstimator(BaseEstimator, TransformerMixin):
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        X_copy = X.copy()
+        X_copy['daily_return'] = X_copy['close'].pct_change()
+        return X_copy
+
+
+# Create a custom transformer to engineer the ratio of the closing price's range
+class RangeRatioEstimator(BaseEstimator, TransformerMixin):
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        X_copy = X.copy()
+        X_copy["range_ratio"] = (X_copy["close"] - X_copy["low"]) / (X_copy["high"] - X_copy["low"] + 1e-6)
+        return X_copy
+
+
+# Create a custom transformer to engineer the relative strength index
+class RelativeStrengthIndexEstimator(BaseEstimator, TransformerMixin):
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        X_copy = X.copy()
+        X_copy['delta'] = X_copy['close'].diff()
+        gain = (X_copy['delta'].where(X_copy['delta'] > 0, 0)).rolling(window=7).mean()
+        loss = (-X_copy['delta'].where(X_copy['delta'] < 0, 0)).rolling(window=7).mean()
+        rs = gain / loss
+        X_copy['rsi'] = 100 - (100 / (1 + rs))
+        return X_copy
+
+
+# Create a custom transformer to engineer the convergence and divergence of moving averages
+class MovingAverageConvergenceDivergenceEstimator(BaseEstimator, TransformerMixin):
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        X_copy = X.copy()
+        exp1 = X_copy['close'].ewm(span=6, adjust=False).mean()
+        exp2 = X_copy['close'].ewm(span=13, adjust=False).mean()
+        macd = exp1 - exp2
+        signal_line = macd.ewm(span=5, adjust=False).mean()
+        X_copy['macd_hist'] = macd - signal_line
+        X_copy.dropna(subset=['rsi', 'daily_return'], inplace=True)
+        return X_copy
+
+
+# Creating a custom transformer to ordinaly encode volatility_bins
+class VolatilityBinEncoder(BaseEstimator, TransformerMixin):
+    def __init__(self, feature='volatility_bin'):
+        self.feature = feature
+        self.encoder = OrdinalEncoder(categories=[['low', 'medium', 'high']])
+
+    def fit(self, X, y=None):
+        self.encoder.fit(X[[self.feature]])
+        return self
+
+    def transform(self, X):
+        X_copy = X.copy()
+        X_copy[self.feature] = self.encoder.transform(X_copy[[self.feature]])
+        return X_copy
+
+
+# Creating a custom transformer to log transform volume and marketCap due to large volatility
+class LogWrapper(BaseEstimator, TransformerMixin):
+    def __init__(self, features):
+        self.features = features
+
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        X_copy = X.copy()
+        for col in self.features:
+            if col in X_copy.columns:
+                X_copy[col] = np.log1p(X_copy[col].clip(lower=0))
+        return X_copy
+
+
+# Creating a custom transformer to scale the numerical features
+class MinMaxScalerWrapper(BaseEstimator, TransformerMixin):
+    def __init__(self, features, feature_range=(0, 1)):
+        self.features = features
+        self.feature_range = feature_range
+        self.scaler = MinMaxScaler(feature_range=feature_range)
+
+    def fit(self, X, y=None):
+        self.scaler.fit(X[self.features])
+        return self
+
+    def transform(self, X):
+        X_copy = X.copy()
+        X_copy[self.features] = self.scaler.transform(X_copy[self.features])
+        return X_copy
+
+
+def numerical_features(df):
+    return [column for column in df.columns if column != TARGET and pd.api.types.is_numeric_dtype(df[column])]
+
+
+def fit_pipelines(history):
+    """Fit the cleaning, eng and transform pipelines on a daily history like the notebook; return them with the training data"""
+    train = history[["open", "high", "low", "close", "volume", "marketCap"]].copy()
+    train[TARGET] = train["high"].shift(-1)
+
+    cleaning_pipeline = Pipeline(steps=[
+        ("imputer", NumericImputerWrapper(features=numerical_features(train))),
+        ("remove_duplicates", CustomDuplicateHandler(reset_index=True)),
+        ("outlier_handler_vol_cap", OutlierHandler(features=['volume', 'marketCap'], factor=6.0))
+    ])
+    train = cleaning_pipeline.fit_transform(train)
+
+    eng_pipeline = Pipeline([
+        ("volatility_bin", VolatilityBinEstimator()),
+        ("daily_return", DailyReturnEstimator()),
+        ("range_ratio", RangeRatioEstimator()),
+        ("rsi", RelativeStrengthIndexEstimator()),
+        ("macd", MovingAverageConvergenceDivergenceEstimator())
+    ])
+    train = eng_pipeline.fit_transform(train)
+    y = train.pop(TARGET)
+    X = train[y.notna()]
+
+    data_transform_pipeline = Pipeline([
+        ('vol_bin_encoder', VolatilityBinEncoder()),
+        ('log_transform', LogWrapper(features=['volume', 'marketCap'])),
+        ('scaler', MinMaxScalerWrapper(features=numerical_features(X)))
+    ])
+    X = data_transform_pipeline.fit_transform(X)
+    return cleaning_pipeline, eng_pipeline, data_transform_pipeline, X, y[y.notna()]
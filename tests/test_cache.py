@@ -0,0 +1,238 @@
+import threading
+import time
+
+import pytest
+
+from app import cache, fetch_stage
+
+
+class Clock:
+    """Stands in for time.monotonic so entries expire without waiting"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class Loader:
+    """Counts its calls and returns the next value (or None, or raises)"""
+
+    def __init__(self, *values):
+        self.values = list(values)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        value = self.values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def background(monkeypatch):
+    """Hold the background refreshes instead of running them, so a test decides when they finish"""
+    submitted = []
+    monkeypatch.setattr(fetch_stage, "submit", lambda fn, *args: submitted.append((fn, args)))
+    return submitted
+
+
+def run(submitted):
+    for fn, args in submitted:
+        try:
+            fn(*args)
+        except Exception:
+            pass
+    submitted.clear()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def test_fresh_entry_is_served_until_its_ttl(clock):
+    entries = cache.TTLCache("test", 8, ttl=10)
+    loader = Loader("a", "b")
+
+    assert entries.get_or_load("key", loader, 10) == "a"
+    clock.advance(9.9)
+    assert entries.get_or_load("key", loader, 10) == "a"
+    assert loader.calls == 1
+
+    # Without a stale window an expired entry is loaded again before it is returned
+    clock.advance(0.1)
+    assert entries.get_or_load("key", loader, 10) == "b"
+    assert loader.calls == 2
+    assert entries.stats()["hits"] == 1 and entries.stats()["misses"] == 2
+
+
+def test_concurrent_misses_load_once(clock):
+    entries = cache.TTLCache("test", 8, ttl=10)
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(entries.get_or_load("key", loader, 10))) for _ in range(8)]
+    threads[0].start()
+    wait_for(lambda: "key" in entries.inflight)
+    for thread in threads[1:]:
+        thread.start()
+    # Every other caller waits on the leader's request instead of starting its own
+    wait_for(lambda: entries.stats()["coalesced"] == 7)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+    assert entries.inflight == {}
+
+
+def test_concurrent_callers_share_the_leaders_error(clock):
+    entries = cache.TTLCache("test", 8, ttl=10)
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise ValueError("upstream down")
+
+    errors = []
+
+    def call():
+        try:
+            entries.get_or_load("key", failing, 10)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    threads[0].start()
+    wait_for(lambda: "key" in entries.inflight)
+    for thread in threads[1:]:
+        thread.start()
+    wait_for(lambda: entries.stats()["coalesced"] == 3)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(errors) == 4
+    # Nothing is cached, so the next call tries again
+    assert entries.get_or_load("key", Loader("value"), 10) == "value"
+
+
+def test_stale_entry_is_served_while_it_refreshes(clock, background):
+    entries = cache.TTLCache("test", 8, ttl=10, stale=30)
+    loader = Loader("old", "new")
+    entries.get_or_load("key", loader, 10)
+
+    clock.advance(15)
+    # Expired but within the stale window: the old value now, and a single refresh in the background
+    assert entries.get_or_load("key", loader, 10) == "old"
+    assert entries.get_or_load("key", loader, 10) == "old"
+    assert len(background) == 1 and loader.calls == 1
+    assert entries.freshness("key")[1] is True
+
+    run(background)
+    assert loader.calls == 2
+    assert entries.get_or_load("key", loader, 10) == "new"
+    assert entries.freshness("key")[1] is False
+    assert entries.stats()["stale"] == 2
+
+
+def test_failed_refresh_keeps_the_stale_entry(clock, background):
+    entries = cache.TTLCache("test", 8, ttl=10, stale=30)
+    loader = Loader("old", RuntimeError("upstream down"), "new")
+    entries.get_or_load("key", loader, 10)
+
+    clock.advance(15)
+    assert entries.get_or_load("key", loader, 10) == "old"
+    run(background)
+    assert entries.stats()["refresh_errors"] == 1
+
+    # Still served, and the next call starts another refresh
+    assert entries.get_or_load("key", loader, 10) == "old"
+    run(background)
+    assert entries.get_or_load("key", loader, 10) == "new"
+
+
+def test_entry_past_the_stale_window_is_loaded_again(clock, background):
+    entries = cache.TTLCache("test", 8, ttl=10, stale=30)
+    loader = Loader("old", "new")
+    entries.get_or_load("key", loader, 10)
+
+    clock.advance(40)
+    assert entries.get_or_load("key", loader, 10) == "new"
+    assert background == []
+
+
+def test_none_is_not_cached(clock):
+    entries = cache.TTLCache("test", 8, ttl=10)
+    loader = Loader(None, None, "value")
+
+    assert entries.get_or_load("key", loader, 10) is None
+    assert entries.get_or_load("key", loader, 10) is None
+    assert entries.get_or_load("key", loader, 10) == "value"
+    assert loader.calls == 3
+    assert entries.get_or_load("key", loader, 10) == "value"
+    assert loader.calls == 3
+
+    entries.put("other", None, 10)
+    assert entries.peek("other") is None and entries.freshness("other") is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    entries = cache.TTLCache("test", 2, ttl=10)
+    entries.get_or_load("a", Loader(1), 10)
+    entries.get_or_load("b", Loader(2), 10)
+    entries.get_or_load("a", Loader(), 10)
+    entries.get_or_load("c", Loader(3), 10)
+
+    assert list(entries.entries) == ["a", "c"]
+    assert entries.stats()["evictions"] == 1
+
+
+def test_decorator_keys_by_normalised_arguments(clock):
+    calls = []
+
+    @cache.cached("test_decorator", ttl=lambda date, days=30: 5 if days == 30 else 60)
+    def load(date, days=30):
+        calls.append((date, days))
+        return f"{date}/{days}"
+
+    try:
+        assert load("2025-10-01") == load("2025-10-01", 30) == load(date="2025-10-01", days=30)
+        assert calls == [("2025-10-01", 30)]
+
+        # The TTL is computed from the arguments
+        load("2025-10-01", days=90)
+        clock.advance(10)
+        load("2025-10-01")
+        load("2025-10-01", days=90)
+        assert calls == [("2025-10-01", 30), ("2025-10-01", 90), ("2025-10-01", 30)]
+
+        # warm() only loads missing or expired results
+        assert load.warm("2025-10-01", days=90) is False
+        clock.advance(60)
+        assert load.warm("2025-10-01", days=90) is True
+        assert len(calls) == 4
+    finally:
+        cache._caches.pop("test_decorator", None)
@@ -0,0 +1,174 @@
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from app import http_client
+
+URL = "https://upstream.test/coins/ripple/market_chart/range"
+
+
+class FakeTime:
+    """Stands in for the time module: sleep() advances the clock instead of waiting"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class ScriptedAdapter(BaseAdapter):
+    """Answers each request with the next scripted status (or raises the scripted exception)"""
+
+    def __init__(self, *replies):
+        super().__init__()
+        self.replies = list(replies)
+        self.requests = []
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        self.requests.append((request.url, timeout))
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        status, headers = reply if isinstance(reply, tuple) else (reply, {})
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = b"{}"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(http_client, "time", clock)
+    # Full jitter picks the top of the range, so the backoff delays are known
+    monkeypatch.setattr(http_client.random, "uniform", lambda low, high: high)
+    return clock
+
+
+@pytest.fixture
+def upstream(monkeypatch, clock):
+    """Install a session whose adapter replays the given replies, without a rate limit"""
+    def install(*replies):
+        adapter = ScriptedAdapter(*replies)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        monkeypatch.setattr(http_client, "_session", session)
+        monkeypatch.setattr(http_client, "_limiters", {})
+        return adapter
+    return install
+
+
+def test_rate_limited_and_failed_responses_are_retried(upstream, clock):
+    adapter = upstream(429, 503, 200)
+    response = http_client.get("coingecko", URL, params={"vs_currency": "usd"})
+
+    assert response.status_code == 200
+    assert len(adapter.requests) == 3
+    assert adapter.requests[0][1] == http_client.ENDPOINTS["coingecko"]["timeout"]
+    # Exponential backoff: 0.5 s, then 1 s
+    assert clock.sleeps == [0.5, 1.0]
+
+
+def test_last_response_is_returned_when_retries_run_out(upstream, clock):
+    retries = http_client.ENDPOINTS["coingecko"]["retries"]
+    adapter = upstream(*[500] * (retries + 1))
+
+    assert http_client.get("coingecko", URL).status_code == 500
+    assert len(adapter.requests) == retries + 1
+    assert clock.sleeps == [0.5, 1.0, 2.0]
+
+
+def test_backoff_is_capped(monkeypatch, upstream, clock):
+    monkeypatch.setitem(http_client.ENDPOINTS, "coingecko", {"timeout": (1, 1), "retries": 6})
+    upstream(*[502] * 6, 200)
+
+    assert http_client.get("coingecko", URL).status_code == 200
+    assert clock.sleeps == [0.5, 1.0, 2.0, 4.0, 8.0, 8.0]
+
+
+@pytest.mark.parametrize("status", [200, 400, 401, 404])
+def test_other_statuses_are_not_retried(upstream, clock, status):
+    adapter = upstream(status)
+    assert http_client.get("coingecko", URL).status_code == status
+    assert len(adapter.requests) == 1 and clock.sleeps == []
+
+
+@pytest.mark.parametrize("retry_after, delay", [
+    ("2", 2.0),
+    # Longer waits than the backoff cap are cut to it
+    ("120", http_client.BACKOFF_CAP),
+    # Only the number of seconds form is read; an HTTP date falls back to the backoff
+    ("Wed, 21 Oct 2015 07:28:00 GMT", 0.5),
+])
+def test_retry_after_header(upstream, clock, retry_after, delay):
+    upstream((429, {"Retry-After": retry_after}), 200)
+    assert http_client.get("coingecko", URL).status_code == 200
+    assert clock.sleeps == [delay]
+
+
+def test_connection_errors_are_retried_then_raised(upstream, clock):
+    upstream(requests.ConnectionError("reset"), requests.Timeout("read timed out"), 200)
+    assert http_client.get("coingecko", URL).status_code == 200
+    assert clock.sleeps == [0.5, 1.0]
+
+    retries = http_client.ENDPOINTS["model"]["retries"]
+    adapter = upstream(*[requests.ConnectionError("refused")] * (retries + 1))
+    with pytest.raises(requests.ConnectionError):
+        http_client.get("model", URL)
+    assert len(adapter.requests) == retries + 1
+
+
+def test_token_bucket_allows_a_burst_then_the_rate(clock):
+    bucket = http_client.TokenBucket(rate=0.5, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == []
+
+    # Then one token every 2 seconds
+    start = clock.now
+    for _ in range(5):
+        bucket.acquire()
+    assert clock.now - start == pytest.approx(10)
+
+    # An idle bucket refills up to its capacity, not beyond
+    clock.now += 60
+    sleeps = len(clock.sleeps)
+    for _ in range(3):
+        bucket.acquire()
+    assert len(clock.sleeps) == sleeps
+    bucket.acquire()
+    assert clock.sleeps[-1] == pytest.approx(2)
+
+
+def test_requests_wait_for_the_endpoint_limiter(monkeypatch, upstream, clock):
+    adapter = upstream(*[200] * 6)
+    # 30 calls per minute with a burst of 2
+    monkeypatch.setattr(http_client, "_limiters", {"coingecko": http_client.TokenBucket(rate=0.5, capacity=2)})
+
+    start = clock.now
+    for _ in range(6):
+        http_client.get("coingecko", URL)
+    assert len(adapter.requests) == 6
+    assert clock.now - start == pytest.approx(8)
+
+    # Endpoints without a limiter never wait
+    clock.sleeps.clear()
+    upstream(*[200] * 6)
+    for _ in range(6):
+        http_client.get("model", URL)
+    assert clock.sleeps == []
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import indicators
+
+SETTINGS = [
+    (indicators.DASHBOARD_RSI_PERIOD, indicators.DASHBOARD_MACD_SPANS),
+    (indicators.MODEL_RSI_PERIOD, indicators.MODEL_MACD_SPANS),
+]
+
+
+def reference_rsi(prices, period):
+    """The dashboard's original pandas RSI"""
+    delta = prices.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rs = gain / loss
+    return (100 - (100 / (1 + rs))).to_numpy()
+
+
+def reference_macd(prices, fast, slow, signal):
+    """The dashboard's original pandas MACD"""
+    macd = prices.ewm(span=fast, adjust=False).mean() - prices.ewm(span=slow, adjust=False).mean()
+    signal_line = macd.ewm(span=signal, adjust=False).mean()
+    return macd.to_numpy(), signal_line.to_numpy(), (macd - signal_line).to_numpy()
+
+
+def closes(n, seed=0):
+    """Random walk rounded to 4 decimals, so unchanged closes (zero deltas) occur"""
+    rng = np.random.default_rng(seed)
+    return pd.Series(np.round(0.5 * np.exp(np.cumsum(rng.normal(0, 0.02, n))), 4))
+
+
+def assert_matches(prices, rsi, macd, period, spans):
+    np.testing.assert_array_equal(rsi, reference_rsi(prices, period))
+    for actual, expected in zip(macd, reference_macd(prices, *spans)):
+        np.testing.assert_array_equal(actual, expected)
+
+
+@pytest.mark.parametrize("period, spans", SETTINGS)
+@pytest.mark.parametrize("n", [30, indicators.PANDAS_BATCH_MIN, 2000])
+def test_one_batch(n, period, spans):
+    prices = closes(n)
+    rsi = indicators.RSI(period).batch(prices.to_numpy())
+    macd = indicators.MACD(*spans).batch(prices.to_numpy())
+    assert_matches(prices, rsi, macd, period, spans)
+
+
+@pytest.mark.parametrize("period, spans", SETTINGS)
+@pytest.mark.parametrize("batched", [20, 500])
+def test_batch_then_updates(batched, period, spans):
+    # A batch of 500 is computed by pandas; the first update() has to rebuild the exact running state
+    prices = closes(batched + 200, seed=1)
+    rsi_indicator, macd_indicator = indicators.RSI(period), indicators.MACD(*spans)
+    rsi = list(rsi_indicator.batch(prices.to_numpy()[:batched]))
+    macd = [list(values) for values in macd_indicator.batch(prices.to_numpy()[:batched])]
+    for close in prices.to_numpy()[batched:]:
+        rsi.append(rsi_indicator.update(close))
+        for values, value in zip(macd, macd_indicator.update(close)):
+            values.append(value)
+    assert_matches(prices, np.array(rsi), [np.array(values) for values in macd], period, spans)
+
+
+@pytest.mark.parametrize("period, spans", SETTINGS)
+@pytest.mark.parametrize("sizes", [
+    [indicators.PANDAS_BATCH_MIN - 1, 1, 300],
+    [10, indicators.PANDAS_BATCH_MIN + 10],
+    [indicators.PANDAS_BATCH_MIN, indicators.PANDAS_BATCH_MIN, 5],
+])
+def test_batches_crossing_pandas_threshold(sizes, period, spans):
+    prices = closes(sum(sizes), seed=2)
+    rsi_indicator, macd_indicator = indicators.RSI(period), indicators.MACD(*spans)
+    rsi, macd, start = [], [], 0
+    for size in sizes:
+        chunk = prices.to_numpy()[start:start + size]
+        rsi.append(rsi_indicator.batch(chunk))
+        macd.append(macd_indicator.batch(chunk))
+        start += size
+    macd = [np.concatenate([chunk[i] for chunk in macd]) for i in range(3)]
+    assert_matches(prices, np.concatenate(rsi), macd, period, spans)
+
+
+@pytest.mark.parametrize("n", [40, 400])
+def test_missing_infinite_and_constant_closes(n):
+    prices = closes(n + 30, seed=3)
+    prices.iloc[5:9] = np.nan
+    prices.iloc[n // 2] = np.inf
+    prices.iloc[n // 2 + 3:n // 2 + 25] = prices.iloc[n // 2 + 3]
+    prices.iloc[n - 2:n] = np.nan
+
+    for period, spans in SETTINGS:
+        assert_matches(prices, indicators.RSI(period).batch(prices.to_numpy()), indicators.MACD(*spans).batch(prices.to_numpy()), period, spans)
+
+        # A batch ending on missing closes, then one close at a time: the EMA weight must have decayed
+        rsi_indicator, macd_indicator = indicators.RSI(period), indicators.MACD(*spans)
+        rsi = list(rsi_indicator.batch(prices.to_numpy()[:n]))
+        macd = [list(values) for values in macd_indicator.batch(prices.to_numpy()[:n])]
+        for close in prices.to_numpy()[n:]:
+            rsi.append(rsi_indicator.update(close))
+            for values, value in zip(macd, macd_indicator.update(close)):
+                values.append(value)
+        assert_matches(prices, np.array(rsi), [np.array(values) for values in macd], period, spans)
+
+
+@pytest.mark.parametrize("n", [20, 300])
+def test_all_missing_and_all_constant_closes(n):
+    for prices in (pd.Series(np.full(n, np.nan)), pd.Series(np.full(n, 0.5123))):
+        for period, spans in SETTINGS:
+            assert_matches(prices, indicators.RSI(period).batch(prices.to_numpy()), indicators.MACD(*spans).batch(prices.to_numpy()), period, spans)
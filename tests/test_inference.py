@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+from app import http_client, inference
+
+# Hosted model responses and the candles they were computed from, saved with
+# python -m app.inference <dates> --record tests/fixtures/remote_predictions.json
+RECORDING = os.path.join(os.path.dirname(__file__), "fixtures", "remote_predictions.json")
+TOLERANCE = 1e-6
+
+
+@pytest.fixture
+def local_artifacts():
+    try:
+        return inference.load_artifacts()
+    except (FileNotFoundError, ImportError) as e:
+        pytest.skip(f"Model artifacts not available in XRP_MODEL_DIR: {e}")
+
+
+@pytest.mark.skipif(not os.path.exists(RECORDING), reason="No recording of the hosted model (see RECORDING)")
+def test_local_predictions_match_recorded_hosted_model(local_artifacts):
+    for date, df_daily, remote in inference.load_recording(RECORDING):
+        local = inference.predict(date, df_daily)["prediction"]
+        assert inference.matches(local, remote, TOLERANCE), f"{date}: local={local} hosted={remote}"
+
+
+def test_matches_uses_relative_tolerance():
+    assert inference.matches(1.0, 1.0 + 5e-7)
+    assert not inference.matches(1.0, 1.0 + 5e-6)
+    assert inference.matches(2500.0, 2500.001)
+    assert not inference.matches(0.5, None)
+
+
+def test_recording_round_trips_candles_and_response(history, tmp_path, monkeypatch):
+    students = pytest.importorskip("students.ripple_25548684")
+    frame = history.iloc[:30].reset_index(drop=True)
+    frame["timestamp"] = pd.to_datetime(frame.pop("timeOpen")).dt.tz_localize("Australia/Sydney")
+
+    def fake_get(endpoint, url, params=None, headers=None):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"prediction": {"predicted_date": "%s", "prediction": 0.612345678901234}}' % params["date"].encode()
+        return response
+
+    monkeypatch.setattr(students, "fetch_ripple_data", lambda date, days_before=29: frame)
+    monkeypatch.setattr(http_client, "get", fake_get)
+    path = tmp_path / "remote_predictions.json"
+    inference.record_remote(["2025-10-01", "2025-10-02"], path)
+
+    rows = inference.load_recording(path)
+    assert [date for date, _, _ in rows] == ["2025-10-01", "2025-10-02"]
+    for _, df_daily, remote in rows:
+        assert remote == 0.612345678901234
+        for column in inference.FEATURE_COLUMNS:
+            np.testing.assert_array_equal(df_daily[column].to_numpy(), frame[column].to_numpy())
+        assert df_daily["timestamp"].equals(frame["timestamp"].dt.tz_convert("UTC"))
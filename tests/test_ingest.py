@@ -0,0 +1,85 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+import requests
+
+from app import ingest
+
+# A week of hourly market_chart/range points in CoinGecko's format, ending with the live point
+# (generated by benchmarks/stub.py, since this environment cannot reach CoinGecko)
+PAYLOAD = os.path.join(os.path.dirname(__file__), "fixtures", "market_chart_ripple_hourly.json")
+
+
+@pytest.fixture
+def raw():
+    with open(PAYLOAD, "rb") as f:
+        return f.read()
+
+
+@pytest.fixture(params=["orjson", "json"])
+def decoder(request, monkeypatch):
+    """Run a test with orjson (when installed) and with the standard library decoder"""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(ingest, "orjson", None)
+    return request.param
+
+
+def assert_same_frame(actual, expected):
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+    assert list(actual.columns) == ingest.COLUMNS
+
+
+def test_aligned_payload_matches_merge_frames(raw):
+    expected = ingest.merge_frames(json.loads(raw))
+    assert ingest._arrow_pairs(raw) is not None
+    assert_same_frame(ingest.parse_market_chart_bytes(raw), expected)
+    assert_same_frame(ingest.parse_market_chart(json.loads(raw)), expected)
+
+    response = requests.Response()
+    response._content = raw
+    assert_same_frame(ingest.parse_response(response), expected)
+
+
+def test_misaligned_series_are_joined_like_merge_frames(raw):
+    data = json.loads(raw)
+    # A volume missing and a market cap on its own timestamp: only the shared timestamps are kept
+    del data["total_volumes"][10]
+    data["market_caps"][20][0] += 1
+    body = json.dumps(data).encode()
+
+    expected = ingest.merge_frames(data)
+    assert len(expected) == len(data["prices"]) - 2
+    assert_same_frame(ingest.parse_market_chart_bytes(body), expected)
+    assert_same_frame(ingest.parse_market_chart(data), expected)
+
+
+def test_null_value_becomes_nan_like_merge_frames(raw):
+    data = json.loads(raw)
+    data["prices"][3][1] = None
+    body = json.dumps(data).encode()
+
+    parsed = ingest.parse_market_chart_bytes(body)
+    assert parsed["price"].isna().sum() == 1
+    assert_same_frame(parsed, ingest.merge_frames(data))
+    assert_same_frame(ingest.parse_market_chart(data), ingest.merge_frames(data))
+
+
+def test_fallback_decoder_matches_merge_frames(raw, decoder):
+    # The path taken when Arrow's reader rejects a body: orjson (or json) and the list parser
+    assert_same_frame(ingest.parse_market_chart(ingest.loads(raw)), ingest.merge_frames(json.loads(raw)))
+
+
+def test_empty_series_fall_back_to_an_empty_frame(raw, decoder):
+    # CoinGecko answers a window without data with empty lists, which Arrow reads as list<null>
+    data = json.loads(raw)
+    data["total_volumes"] = []
+    body = json.dumps(data).encode()
+
+    assert ingest._arrow_pairs(body) is None
+    parsed = ingest.parse_market_chart_bytes(body)
+    assert parsed.empty and list(parsed.columns) == ingest.COLUMNS
+    assert len(ingest.merge_frames(data)) == 0
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+xgb = pytest.importorskip("xgboost")
+
+from app import inference, portable
+from app.transformers import FusedFeatureBuilder
+
+
+@pytest.fixture(scope="module")
+def pickled(notebook):
+    """Artifacts as load_pickled_artifacts returns them, with a small model trained on the fixture"""
+    cleaning_pipeline, eng_pipeline, transform_pipeline, X_train, y_train = notebook
+    model = xgb.XGBRegressor(random_state=42, n_estimators=50, max_depth=5, learning_rate=0.05).fit(X_train, y_train)
+    return {
+        "cleaning_pipeline": cleaning_pipeline,
+        "eng_pipeline": eng_pipeline,
+        "transform_pipeline": transform_pipeline,
+        "model": model,
+        "features": FusedFeatureBuilder.from_pipelines(eng_pipeline, transform_pipeline),
+    }
+
+
+@pytest.fixture(scope="module")
+def exported(pickled, tmp_path_factory):
+    model_dir = tmp_path_factory.mktemp("portable")
+    portable.export(pickled, model_dir)
+    return model_dir
+
+
+def test_export_writes_portable_files(exported):
+    assert portable.exists(exported)
+    assert (exported / portable.MODEL_FILE).exists()
+
+
+def test_portable_features_match_pickled(history, pickled, exported):
+    loaded = portable.load(exported)
+    expected = inference.build_features(history, pickled)
+    actual = inference.build_features(history, loaded)
+
+    assert list(actual.columns) == list(expected.columns)
+    np.testing.assert_array_equal(actual.to_numpy(dtype=np.float64), expected.to_numpy(dtype=np.float64))
+
+
+def test_portable_predictions_match_pickled(history, pickled, exported):
+    # Every 30-day window the Ripple tab could predict from, including the duplicated and clipped days
+    frames = portable.windows(history)
+    expected, actual = portable.compare(pickled, portable.load(exported), frames)
+
+    assert len(actual) == len(frames)
+    np.testing.assert_array_equal(actual, expected)
@@ -0,0 +1,141 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import market_store, rollup
+
+# Hourly points a few minutes past the hour around Sydney's DST end (2025-04-06) and start
+# (2025-10-05), with missing hours, missing prices and volumes, and five months without points
+FIXTURE_CSV = os.path.join(os.path.dirname(__file__), "fixtures", "xrp_hourly.csv")
+HOUR_MS = rollup.HOUR_MS
+
+
+@pytest.fixture(scope="module")
+def points():
+    return pd.read_csv(FIXTURE_CSV)
+
+
+def reference_bars(points, resolution, tz=rollup.TIMEZONE):
+    """The dashboard's original pandas resample (daily_ohlcv), at any bar size"""
+    df = points.rename(columns={"market_cap": "marketCap"})
+    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms", utc=True)
+    if resolution in ("1D", "1W"):
+        # Calendar days and weeks (from Monday) of the local time zone
+        df["timestamp"] = df["timestamp"].dt.tz_convert(tz)
+        rule, kwargs = ("1D", {}) if resolution == "1D" else ("W-MON", {"label": "left", "closed": "left"})
+    else:
+        rule, kwargs = resolution, {}
+    bars = df.set_index("timestamp").resample(rule, **kwargs).agg({
+        "price": ["first", "max", "min", "last"],
+        "volume": "sum",
+        "marketCap": "mean",
+    })
+    bars.columns = rollup.BAR_COLUMNS
+    bars.index = bars.index.tz_convert(tz)
+    return bars.reset_index()
+
+
+def ingested(points):
+    series = rollup.Rollup("ripple", "hourly")
+    series.ingest(points)
+    return series
+
+
+def assert_bars_equal(actual, expected):
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True), check_exact=True)
+
+
+@pytest.mark.parametrize("resolution", rollup.RESOLUTIONS)
+def test_bars_match_resample(points, resolution):
+    series = ingested(points)
+    start, end = int(points["timestamp"].iloc[0]), int(points["timestamp"].iloc[-1])
+    assert_bars_equal(series.bars(resolution, start, end), reference_bars(points, resolution))
+
+
+@pytest.mark.parametrize("resolution", rollup.RESOLUTIONS)
+def test_bars_match_resample_on_windows_cutting_bars(points, resolution):
+    series = ingested(points)
+    timestamps = points["timestamp"].to_numpy()
+    rng = np.random.default_rng(0)
+    for _ in range(40):
+        # Window edges anywhere, usually inside a bar
+        start, end = np.sort(rng.integers(timestamps[0] - HOUR_MS, timestamps[-1] + HOUR_MS, 2))
+        window = points[(points["timestamp"] >= start) & (points["timestamp"] <= end)]
+        if window.empty:
+            continue
+        assert_bars_equal(series.bars(resolution, int(start), int(end)), reference_bars(window, resolution))
+
+
+def test_daily_and_weekly_bars_start_at_sydney_midnight(points):
+    series = ingested(points)
+    start, end = int(points["timestamp"].iloc[0]), int(points["timestamp"].iloc[-1])
+    daily = series.bars("1D", start, end)["timestamp"]
+    weekly = series.bars("1W", start, end)["timestamp"]
+
+    assert (daily.dt.hour == 0).all() and (daily.dt.minute == 0).all()
+    assert (weekly.dt.hour == 0).all() and (weekly.dt.weekday == 0).all()
+    # Clocks go back on 2025-04-06 (a 25-hour day) and forward on 2025-10-05 (a 23-hour day)
+    day_length = (daily.shift(-1) - daily).dt.total_seconds() / 3600
+    lengths = dict(zip(daily.dt.strftime("%Y-%m-%d"), day_length))
+    assert lengths["2025-04-05"] == 24 and lengths["2025-04-06"] == 25 and lengths["2025-04-07"] == 24
+    assert lengths["2025-10-04"] == 24 and lengths["2025-10-05"] == 23 and lengths["2025-10-06"] == 24
+
+    # 2025-04-05 13:05 UTC is 00:05 on the 6th in Sydney (AEDT, UTC+11): the point opens the 6th's bar
+    ts = pd.Timestamp("2025-04-05 13:05", tz="UTC").value // 10 ** 6
+    point = pd.DataFrame({"timestamp": [ts], "price": [1.5], "volume": [1.0], "market_cap": [2.0]})
+    bars = ingested(point).bars("1D", ts, ts)
+    assert bars["timestamp"].dt.strftime("%Y-%m-%d %H:%M").tolist() == ["2025-04-06 00:00"]
+
+
+@pytest.mark.parametrize("order", ["appended", "prepended", "gap_filled"])
+def test_incremental_ingest_matches_one_ingest(points, order):
+    bounds = np.linspace(0, len(points), 8).astype(int)
+    chunks = [points.iloc[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+    if order == "prepended":
+        chunks = chunks[::-1]
+    elif order == "gap_filled":
+        # Both ends first, then the chunks in between land inside the held range
+        chunks = [chunks[0], chunks[-1], chunks[3], chunks[1], chunks[5], chunks[2], chunks[4]]
+
+    series = rollup.Rollup("ripple", "hourly")
+    for chunk in chunks:
+        series.ingest(chunk)
+    start, end = int(points["timestamp"].iloc[0]), int(points["timestamp"].iloc[-1])
+    for resolution in rollup.RESOLUTIONS:
+        assert_bars_equal(series.bars(resolution, start, end), reference_bars(points, resolution))
+
+
+def test_refresh_keeps_distant_windows_as_separate_segments(points, monkeypatch):
+    reads = []
+
+    def load_range(coin_id, start_ms, end_ms, granularity):
+        reads.append((start_ms, end_ms))
+        return points[(points["timestamp"] >= start_ms) & (points["timestamp"] <= end_ms)].reset_index(drop=True)
+
+    monkeypatch.setattr(market_store, "load_range", load_range)
+    series = rollup.Rollup("ripple", "hourly")
+    day = market_store.DAY_MS
+    april = pd.Timestamp("2025-04-01", tz="UTC").value // 10 ** 6
+    october = pd.Timestamp("2025-10-01", tz="UTC").value // 10 ** 6
+
+    # An old window, then a recent one: the five months in between are never read
+    series.refresh(april, april + 7 * day)
+    series.refresh(october, october + 7 * day)
+    assert len(series.segments) == 2
+    assert all(end - start <= 7 * day for start, end in reads)
+
+    # A window inside a held segment reads nothing
+    reads.clear()
+    series.refresh(april + day, april + 6 * day)
+    assert reads == []
+
+    # A window spanning both reads the gap between the segments, which then merge
+    reads.clear()
+    series.refresh(april, october + 7 * day)
+    assert reads[0][0] > april + 6 * day and reads[0][1] == october
+    assert len(series.segments) == 1
+    window = points[(points["timestamp"] >= april) & (points["timestamp"] <= october + 7 * day)]
+    for resolution in rollup.RESOLUTIONS:
+        assert_bars_equal(series.bars(resolution, april, october + 7 * day), reference_bars(window, resolution))
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+
+from app import features, inference
+from app.transformers import FusedFeatureBuilder, compare_with_pipelines
+
+
+def cleaned(notebook, frame):
+    cleaning_pipeline = notebook[0]
+    return inference._run_pipeline(cleaning_pipeline, frame[features.RAW_COLUMNS])
+
+
+def test_fused_builder_matches_notebook_pipelines(history, notebook):
+    _, eng_pipeline, transform_pipeline, _, _ = notebook
+    builder = FusedFeatureBuilder.from_pipelines(eng_pipeline, transform_pipeline)
+
+    differences = compare_with_pipelines(builder, eng_pipeline, transform_pipeline, cleaned(notebook, history))
+    assert differences == {column: 0.0 for column in features.FEATURE_COLUMNS}
+
+
+def test_fused_builder_matches_notebook_pipelines_on_dashboard_windows(history, notebook):
+    # The Ripple tab predicts from 30 days, so the indicator warm-up rows are dropped in every window
+    _, eng_pipeline, transform_pipeline, _, _ = notebook
+    builder = FusedFeatureBuilder.from_pipelines(eng_pipeline, transform_pipeline)
+
+    for end in range(30, len(history) + 1, 7):
+        X = cleaned(notebook, history.iloc[end - 30:end].reset_index(drop=True))
+        differences = compare_with_pipelines(builder, eng_pipeline, transform_pipeline, X)
+        assert max(differences.values()) == 0.0, f"window ending at row {end}: {differences}"
+
+
+def test_fused_builder_fit_matches_notebook_scaler(history, notebook):
+    import notebook_pipeline
+
+    cleaning_pipeline, _, transform_pipeline, X_train, _ = notebook
+    scaler = transform_pipeline.named_steps["scaler"]
+    # Same training rows as the notebook: cleaned with the target column, without the last day (no target)
+    train = history[features.RAW_COLUMNS].assign(**{notebook_pipeline.TARGET: history["high"].shift(-1)})
+    train = cleaning_pipeline.transform(train)
+    train = train[train.pop(notebook_pipeline.TARGET).notna()]
+    builder = FusedFeatureBuilder(scaled_features=list(scaler.features)).fit(train)
+
+    np.testing.assert_array_equal(builder.scale_, scaler.scaler.scale_)
+    np.testing.assert_array_equal(builder.min_, scaler.scaler.min_)
+    assert builder.transform(train).index.equals(X_train.index)